@@ -0,0 +1,48 @@
+"""Expansion of bulk uploads (several images and/or zip archives) into items.
+
+Each item keeps its position in the upload and a loader for its bytes; zip
+members are only decompressed when the item is scheduled, and members whose
+declared size exceeds the per-image limit are never decompressed at all.
+"""
+import io
+import zipfile
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+ZIP_CONTENT_TYPES = {"application/zip", "application/x-zip-compressed"}
+
+
+@dataclass
+class BulkItem:
+    """One image of a bulk upload, numbered in upload order."""
+    index: int
+    filename: str
+    content_type: Optional[str]
+    load: Callable[[], bytes]
+    size: int
+
+
+class BulkUploadError(ValueError):
+    """An uploaded archive cannot be read."""
+
+
+def is_zip(filename: str, content_type: Optional[str]) -> bool:
+    return filename.lower().endswith(".zip") or (content_type or "") in ZIP_CONTENT_TYPES
+
+
+def expand_upload(filename: str, content_type: Optional[str], data: bytes, items: List[BulkItem]) -> None:
+    """Append the image(s) of one uploaded part to ``items``."""
+    if not is_zip(filename, content_type):
+        items.append(BulkItem(len(items), filename, content_type, lambda: data, len(data)))
+        return
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile as exc:
+        raise BulkUploadError(f"{filename} is not a readable zip archive") from exc
+    for info in archive.infolist():
+        base = info.filename.rsplit("/", 1)[-1]
+        if info.is_dir() or not base or base.startswith(".") or info.filename.startswith("__MACOSX/"):
+            continue
+        items.append(BulkItem(
+            len(items), info.filename, None, lambda info=info: archive.read(info), info.file_size,
+        ))
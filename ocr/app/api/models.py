@@ -32,6 +32,23 @@ class ErrorResponse(BaseModel):
     supported_formats: Optional[List[str]] = None
 
 
+class QueueStats(BaseModel):
+    """Worker executor load, reported for load-balancer routing."""
+    max_workers: int = 1
+    max_queue: int = 0
+    in_flight: int = 0
+    queue_depth: int = 0
+    completed: int = 0
+    rejected: int = 0
+    avg_wait_ms: float = 0.0
+    last_wait_ms: float = 0.0
+    avg_service_ms: float = 0.0
+    policy: str = "sjf"
+    ms_per_megapixel: float = 0.0
+    shed: int = 0
+    saturated: bool = False
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
     status: str = "healthy"
@@ -39,6 +56,11 @@ class HealthResponse(BaseModel):
     ocr_engine: str = "kiri-ocr"
     model_name: str = "mrrtmob/kiri-ocr"
     models_loaded: bool = True
+    queue: Optional[QueueStats] = None
+    result_cache: Optional[Dict[str, Any]] = None
+    near_duplicates: Optional[Dict[str, Any]] = None
+    jobs: Optional[Dict[str, int]] = None
+    pipeline_stages: Optional[Dict[str, Dict[str, int]]] = None
 
 
 class ConfigResponse(BaseModel):
@@ -47,5 +69,5 @@ class ConfigResponse(BaseModel):
     flag_review_threshold: float = 0.60
     max_upload_size_mb: int = 10
     ocr_engine: str = "kiri-ocr"
-    max_image_dimension: int = 4000
+    max_image_dimension: int = 8192
 
@@ -4,23 +4,52 @@ Supports two modes:
 - **Orchestrator mode** (preferred): full pipeline with preprocessing, layout
   analysis, table-aware extraction.
 - **Legacy engine mode**: direct engine → parser → formatter (fallback).
+
+Pipeline work runs on a bounded worker executor so the event loop stays free
+for health checks and uploads; when the queue is full requests are rejected
+with 503 + Retry-After.
+
+``/extract/batch`` takes many images (or zip archives of them) in one upload
+and streams one NDJSON line per image as each finishes. ``/jobs`` queues an
+extraction in the SQLite job store and returns its id straight away.
+``/extract/stream`` runs one image and reports each pipeline stage as a
+Server-Sent Event while it runs.
+
+Synchronous extractions carry a ``CancelToken``: work stops at the next
+stage or recognizer batch once the request deadline passes (504) or the
+client disconnects. They also accept the page ``corners`` found by the
+camera overlay, which the pipeline warps to instead of detecting the page.
 """
-import io
+import asyncio
+import json
 import logging
 import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
-from PIL import Image, UnidentifiedImageError
+from fastapi import APIRouter, File, Form, Header, HTTPException, Request, Response, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from PIL import UnidentifiedImageError
+from starlette.concurrency import run_in_threadpool
 
-from app.api.models import ConfigResponse, ExtractionResponse, HealthResponse
+from app.api.bulk import BulkItem, BulkUploadError, expand_upload
+from app.api.models import ConfigResponse, ExtractionResponse, HealthResponse, QueueStats
 from app.config import settings
 from app.pipeline.formatter import build_dynamic_universal, build_extraction_summary
+from app.pipeline.page import validate_corners
+from app.pipeline.preprocessor import ImageTooLargeError, plan_decode, probe_image
 from app.pipeline.text_parser import parse_prescription
+from app.runtime import metrics
+from app.runtime.cancellation import DEADLINE, DISCONNECTED, CancelToken, ExtractionCancelled
+from app.runtime.executor import QueueFullError
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1")
 _engine = None
 _orchestrator = None
+_executor = None
+_result_cache = None
+_job_store = None
+_job_runner = None
 
 ALLOWED_CONTENT_TYPES = {"image/png", "image/jpeg", "image/jpg", "image/webp"}
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "webp"}
@@ -36,19 +65,179 @@ def set_orchestrator(orchestrator) -> None:
     _orchestrator = orchestrator
 
 
-@router.post("/extract", response_model=ExtractionResponse)
-async def extract_prescription(file: UploadFile = File(...)) -> ExtractionResponse:
-    content_type = file.content_type or "application/octet-stream"
-    filename = file.filename or "upload"
-    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+def set_executor(executor) -> None:
+    global _executor
+    _executor = executor
+
+
+def set_result_cache(cache) -> None:
+    global _result_cache
+    _result_cache = cache
+
+
+def set_jobs(store, runner) -> None:
+    global _job_store, _job_runner
+    _job_store, _job_runner = store, runner
+
+
+def _run_pipeline(
+    image_bytes: bytes,
+    filename: str,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    cancel: Optional[CancelToken] = None,
+    corners: Optional[Any] = None,
+) -> Tuple[Any, float, Dict[str, Any]]:
+    """Blocking extraction: returns (parsed, processing_time_ms, pipeline_metadata).
+
+    ``on_event`` receives the orchestrator's per-stage progress events; the
+    legacy engine path emits none, checks ``cancel`` only before starting and
+    ignores ``corners``.
+    """
+    start = time.time()
+    # Prefer orchestrator (full pipeline) over direct engine
+    if _orchestrator is not None:
+        result = _orchestrator.extract(
+            image_bytes, filename=filename, on_event=on_event, cancel=cancel, corners=corners,
+        )
+        if not result.get("success"):
+            raise RuntimeError(result.get("message", "Pipeline extraction failed"))
+        return result["parsed"], result["processing_time_ms"], result.get("pipeline_metadata", {})
+
+    # Legacy fallback: direct engine → parser
+    if cancel is not None:
+        cancel.check("ocr")
+    full_text, line_results = _engine.extract(image_bytes)
+    parsed = parse_prescription(full_text, line_results)
+    return parsed, (time.time() - start) * 1000, {}
+
+
+async def _dispatch(fn, *args, cost: Optional[float] = None):
+    """Run blocking work on the bounded executor (or Starlette's pool if none).
+
+    ``cost`` (megapixels) lets the executor schedule shortest-job-first.
+    """
+    if _executor is None:
+        return await run_in_threadpool(fn, *args)
+    return await _executor.run(fn, *args, cost=cost)
+
+
+def _record_pipeline_metrics(processing_time_ms: float, pipeline_meta: Dict[str, Any]) -> None:
+    metrics.REQUEST_SECONDS.observe(processing_time_ms / 1000)
+    for stage, ms in pipeline_meta.get("stage_timings_ms", {}).items():
+        metrics.STAGE_SECONDS.observe(ms / 1000, stage=stage)
+    if pipeline_meta.get("near_duplicate"):
+        metrics.EXTRACTION_PATH.inc(path="near_duplicate")
+    elif pipeline_meta:
+        metrics.EXTRACTION_PATH.inc(path="table" if pipeline_meta.get("table_meds_used") else "line")
+    decoding = pipeline_meta.get("decoding")
+    if decoding and decoding["mode"] != "accurate":
+        metrics.DECODED_LINES.inc(decoding["lines"] - decoding["escalated"], tier="ctc")
+        metrics.DECODED_LINES.inc(decoding["escalated"], tier="accurate")
+    roi = pipeline_meta.get("roi")
+    if roi:
+        metrics.ROI_LINES.inc(roi["recognised"], decision="recognised")
+        metrics.ROI_LINES.inc(roi["skipped"], decision="skipped")
+        metrics.ROI_SAVED_SECONDS.inc(roi["saved_ms_est"] / 1000)
+
+
+def _collect_runtime_gauges() -> None:
+    if _executor is not None:
+        stats = _executor.stats()
+        metrics.IN_FLIGHT.set(stats["in_flight"])
+        metrics.QUEUE_DEPTH.set(stats["queue_depth"])
+    stage_stats = getattr(_orchestrator, "stage_stats", None)
+    if stage_stats is not None:
+        for stage, stats in stage_stats().items():
+            metrics.STAGE_QUEUE_DEPTH.set(stats["queue_depth"], stage=stage)
+            metrics.STAGE_BUSY_WORKERS.set(stats["busy"], stage=stage)
+    recognition_stats = getattr(_engine, "recognition_stats", None)
+    if recognition_stats is not None:
+        for stat, value in recognition_stats().items():
+            if stat != "recognize_ms":
+                metrics.RECOGNIZER_BATCHING.set(value, stat=stat)
+    if _result_cache is not None:
+        for event, value in _result_cache.stats().items():
+            if event.startswith(("hits_", "misses", "stores", "evictions")):
+                metrics.CACHE_EVENTS.set(value, event=event)
+
+
+metrics.registry.register_collector("routes", _collect_runtime_gauges)
+
+
+def _busy_exception(exc: QueueFullError) -> HTTPException:
+    detail = {
+        "success": False,
+        "error": "server_busy",
+        "message": "OCR workers are saturated, retry later.",
+        "queue_depth": exc.queue_depth,
+    }
+    if exc.projected_wait_ms is not None:
+        detail["projected_wait_ms"] = round(exc.projected_wait_ms)
+    return HTTPException(status_code=503, detail=detail, headers={"Retry-After": str(exc.retry_after_s)})
+
+
+def _cancelled_exception(exc: ExtractionCancelled) -> HTTPException:
+    metrics.REQUESTS.inc(outcome="cancelled")
+    metrics.CANCELLED.inc(reason=exc.reason, stage=exc.stage)
+    metrics.CANCELLED_SECONDS.inc(exc.elapsed_ms / 1000, reason=exc.reason)
+    if exc.reason == DEADLINE:
+        return HTTPException(status_code=504, detail={
+            "success": False,
+            "error": "deadline_exceeded",
+            "message": f"Request deadline passed during {exc.stage}.",
+        })
+    # Nobody reads this one; 499 keeps it apart from failures in access logs
+    return HTTPException(status_code=499, detail={
+        "success": False,
+        "error": "client_disconnected",
+        "message": f"Client disconnected during {exc.stage}.",
+    })
 
-    if content_type not in ALLOWED_CONTENT_TYPES and extension not in ALLOWED_EXTENSIONS:
+
+def _cancel_token(header_deadline_s: Optional[float]) -> CancelToken:
+    """Token for one request: the configured deadline, shortened by the header's."""
+    limits = [s for s in (settings.REQUEST_DEADLINE_S, header_deadline_s) if s]
+    return CancelToken.after(min(limits) if limits else None)
+
+
+async def _watch_disconnect(request: Request, cancel: CancelToken) -> None:
+    while not cancel.cancelled:
+        if await request.is_disconnected():
+            logger.info("Client disconnected, cancelling extraction")
+            cancel.cancel(DISCONNECTED)
+            return
+        await asyncio.sleep(settings.DISCONNECT_POLL_S)
+
+
+def _check_format(content_type: Optional[str], filename: str) -> str:
+    """Return the file extension; 422 unless the type or extension is an image we accept."""
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if (content_type or "application/octet-stream") not in ALLOWED_CONTENT_TYPES and extension not in ALLOWED_EXTENSIONS:
         raise HTTPException(status_code=422, detail={
             "success": False,
             "error": "unsupported_format",
             "message": "File format not supported. Use PNG, JPG/JPEG, or WebP.",
             "supported_formats": sorted(ALLOWED_CONTENT_TYPES),
         })
+    return extension
+
+
+def _parse_corners(raw: Optional[str]) -> Optional[List[List[float]]]:
+    """JSON ``[[x, y], ...]`` from the ``corners`` form field; 422 when malformed."""
+    if not raw:
+        return None
+    try:
+        points = json.loads(raw)
+        return [[float(x), float(y)] for x, y in points]
+    except (TypeError, ValueError) as exc:
+        raise _invalid_corners("corners must be a JSON list of [x, y] points") from exc
+
+
+def _invalid_corners(message: str) -> HTTPException:
+    return HTTPException(status_code=422, detail={"success": False, "error": "invalid_corners", "message": message})
+
+
+def _require_model() -> None:
     if _engine is None and _orchestrator is None:
         raise HTTPException(status_code=503, detail={
             "success": False,
@@ -56,7 +245,20 @@ async def extract_prescription(file: UploadFile = File(...)) -> ExtractionRespon
             "message": "Kiri-OCR model not loaded.",
         })
 
-    image_bytes = await file.read()
+
+async def _extract_image(
+    image_bytes: bytes, filename: str, extension: str,
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+    cancel: Optional[CancelToken] = None,
+    corners: Optional[List[List[float]]] = None,
+) -> Tuple[ExtractionResponse, Optional[str]]:
+    """Validate, run and format one image: ``(response, cache status)``.
+
+    Errors surface as ``HTTPException`` with the service's error details; the
+    cache status is ``"hit"``, ``"miss"`` or ``None`` when caching is off.
+    ``corners`` (pixels or 0-1 fractions of the image) are checked against
+    the probed size and replace page detection.
+    """
     if not image_bytes:
         raise HTTPException(status_code=400, detail={"success": False, "error": "empty_file", "message": "Uploaded file is empty."})
     if len(image_bytes) > settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024:
@@ -66,34 +268,51 @@ async def extract_prescription(file: UploadFile = File(...)) -> ExtractionRespon
             "message": f"File exceeds {settings.MAX_UPLOAD_SIZE_MB}MB limit.",
         })
 
-    start = time.time()
+    metrics.UPLOAD_BYTES.observe(len(image_bytes))
+
+    cache_key = None
+    if _result_cache is not None:
+        cache_key = _result_cache.key_for(image_bytes, json.dumps(corners) if corners else "")
+    if cache_key is not None:
+        cached = _result_cache.get(cache_key)
+        if cached is not None:
+            metrics.REQUESTS.inc(outcome="cache_hit")
+            return ExtractionResponse(**cached), "hit"
+
     try:
-        image = Image.open(io.BytesIO(image_bytes))
-        width, height = image.size
-        image_format = (image.format or extension or "unknown").lower()
+        probe = probe_image(image_bytes)
+        width, height = probe.width, probe.height
+        image_format = probe.format or extension or "unknown"
+        plan_decode(probe, settings.PREPROCESS_MAX_DIMENSION, settings.MAX_IMAGE_DIMENSION)
+    except ImageTooLargeError as exc:
+        metrics.REQUESTS.inc(outcome="invalid")
+        raise HTTPException(status_code=413, detail={
+            "success": False,
+            "error": "image_too_large",
+            "message": str(exc),
+        }) from exc
     except UnidentifiedImageError as exc:
+        metrics.REQUESTS.inc(outcome="invalid")
         raise HTTPException(status_code=422, detail={
             "success": False,
             "error": "invalid_image",
             "message": "Uploaded file is not a readable image.",
         }) from exc
+    metrics.IMAGE_MEGAPIXELS.observe(width * height / 1e6)
+
+    quad = None
+    if corners is not None:
+        try:
+            quad = validate_corners(corners, width, height)
+        except ValueError as exc:
+            metrics.REQUESTS.inc(outcome="invalid")
+            raise _invalid_corners(str(exc)) from exc
 
     try:
-        # Prefer orchestrator (full pipeline) over direct engine
-        if _orchestrator is not None:
-            result = _orchestrator.extract(image_bytes, filename=filename)
-            if not result.get("success"):
-                raise RuntimeError(result.get("message", "Pipeline extraction failed"))
-
-            parsed = result["parsed"]
-            processing_time_ms = result["processing_time_ms"]
-            pipeline_meta = result.get("pipeline_metadata", {})
-        else:
-            # Legacy fallback: direct engine → parser
-            full_text, line_results = _engine.extract(image_bytes)
-            parsed = parse_prescription(full_text, line_results)
-            processing_time_ms = (time.time() - start) * 1000
-            pipeline_meta = {}
+        parsed, processing_time_ms, pipeline_meta = await _dispatch(
+            _run_pipeline, image_bytes, filename, on_event, cancel, quad, cost=width * height / 1e6,
+        )
+        _record_pipeline_metrics(processing_time_ms, pipeline_meta)
 
         data = build_dynamic_universal(
             parsed,
@@ -105,10 +324,20 @@ async def extract_prescription(file: UploadFile = File(...)) -> ExtractionRespon
             preprocessing_applied=pipeline_meta.get("preprocessing_applied", []),
         )
         summary = build_extraction_summary(data, processing_time_ms)
-        return ExtractionResponse(success=True, data=data, extraction_summary=summary)
+        result = ExtractionResponse(success=True, data=data, extraction_summary=summary)
+        if cache_key is not None:
+            _result_cache.put(cache_key, result.model_dump())
+        metrics.REQUESTS.inc(outcome="ok")
+        return result, "miss" if cache_key is not None else None
+    except QueueFullError as exc:
+        metrics.REQUESTS.inc(outcome="rejected")
+        raise _busy_exception(exc) from exc
+    except ExtractionCancelled as exc:
+        raise _cancelled_exception(exc) from exc
     except HTTPException:
         raise
     except Exception as exc:
+        metrics.REQUESTS.inc(outcome="error")
         logger.exception("OCR extraction failed")
         raise HTTPException(status_code=500, detail={
             "success": False,
@@ -117,9 +346,302 @@ async def extract_prescription(file: UploadFile = File(...)) -> ExtractionRespon
         }) from exc
 
 
+@router.post("/extract", response_model=ExtractionResponse)
+async def extract_prescription(
+    request: Request,
+    response: Response,
+    file: UploadFile = File(...),
+    corners: Optional[str] = Form(None),
+    x_request_deadline: Optional[float] = Header(None, gt=0),
+) -> ExtractionResponse:
+    filename = file.filename or "upload"
+    extension = _check_format(file.content_type, filename)
+    _require_model()
+    points = _parse_corners(corners)
+
+    image_bytes = await file.read()
+    cancel = _cancel_token(x_request_deadline)
+    watcher = asyncio.create_task(_watch_disconnect(request, cancel))
+    try:
+        result, cache_status = await _extract_image(image_bytes, filename, extension, cancel=cancel, corners=points)
+    finally:
+        watcher.cancel()
+    if cache_status is not None:
+        response.headers["X-Cache"] = cache_status
+    if cache_status != "hit" and _executor is not None:
+        response.headers["X-Queue-Depth"] = str(_executor.stats()["queue_depth"])
+    return result
+
+
+@router.post("/extract/stream")
+async def extract_stream(
+    file: UploadFile = File(...),
+    corners: Optional[str] = Form(None),
+    x_request_deadline: Optional[float] = Header(None, gt=0),
+) -> StreamingResponse:
+    """Extract one image, streaming progress as Server-Sent Events.
+
+    A ``stage`` event is sent as each pipeline stage finishes (preprocess,
+    layout, ocr, table, parse) with the stage timings so far; the ``ocr``
+    event carries the parsed patient header as a partial result. The stream
+    ends with one ``result`` event (the usual extraction response plus
+    ``cache``) or one ``error`` event (``status_code`` plus error details).
+    Upload, format and malformed ``corners`` errors are rejected before the
+    stream starts.
+    """
+    filename = file.filename or "upload"
+    extension = _check_format(file.content_type, filename)
+    _require_model()
+    points = _parse_corners(corners)
+    image_bytes = await file.read()
+    return StreamingResponse(
+        _stream_extraction(image_bytes, filename, extension, _cancel_token(x_request_deadline), points),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def _stream_extraction(
+    image_bytes: bytes, filename: str, extension: str, cancel: CancelToken,
+    corners: Optional[List[List[float]]] = None,
+) -> AsyncIterator[str]:
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def on_event(event: Dict[str, Any]) -> None:
+        # Called on the worker thread: hand the event to the loop
+        loop.call_soon_threadsafe(events.put_nowait, event)
+
+    task = asyncio.create_task(_extract_image(image_bytes, filename, extension, on_event, cancel, corners))
+    try:
+        while not task.done():
+            getter = asyncio.ensure_future(events.get())
+            await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield _sse("stage", getter.result())
+            else:
+                getter.cancel()
+        # Let callbacks scheduled just before the task finished arrive first
+        await asyncio.sleep(0)
+        while not events.empty():
+            yield _sse("stage", events.get_nowait())
+        try:
+            result, cache_status = task.result()
+        except HTTPException as exc:
+            yield _sse("error", {"status_code": exc.status_code, **exc.detail})
+        except Exception as exc:
+            logger.exception("Streamed extraction failed")
+            yield _sse("error", {"status_code": 500, "success": False, "error": "extraction_failed", "message": str(exc)})
+        else:
+            yield _sse("result", {"cache": cache_status, **result.model_dump(mode="json")})
+    finally:
+        # Stream closed early (client went away): stop the worker too
+        cancel.cancel(DISCONNECTED)
+        task.cancel()
+
+
+@router.post("/extract/batch")
+async def extract_batch(files: List[UploadFile] = File(...)) -> StreamingResponse:
+    """Extract many images; streams NDJSON lines in completion order.
+
+    Each line carries the item's ``index`` (upload order, zip members
+    expanded in archive order) and ``filename``, then either the usual
+    extraction response or ``success: false`` with the error details and
+    ``status_code`` the single-image route would have returned. Failed items
+    do not stop the batch.
+    """
+    _require_model()
+    items: List[BulkItem] = []
+    total_bytes = 0
+    for upload in files:
+        data = await upload.read()
+        total_bytes += len(data)
+        if total_bytes > settings.BULK_MAX_UPLOAD_MB * 1024 * 1024:
+            raise HTTPException(status_code=413, detail={
+                "success": False,
+                "error": "batch_too_large",
+                "message": f"Batch upload exceeds {settings.BULK_MAX_UPLOAD_MB}MB limit.",
+            })
+        try:
+            expand_upload(upload.filename or "upload", upload.content_type, data, items)
+        except BulkUploadError as exc:
+            raise HTTPException(status_code=422, detail={
+                "success": False,
+                "error": "invalid_archive",
+                "message": str(exc),
+            }) from exc
+        if len(items) > settings.BULK_MAX_ITEMS:
+            raise HTTPException(status_code=413, detail={
+                "success": False,
+                "error": "batch_too_large",
+                "message": f"Batch exceeds {settings.BULK_MAX_ITEMS} images.",
+            })
+    if not items:
+        raise HTTPException(status_code=400, detail={"success": False, "error": "empty_batch", "message": "No images in upload."})
+
+    concurrency = settings.BULK_CONCURRENCY or (_executor.max_workers if _executor is not None else 1)
+    logger.info("Batch of %d images (%.1f MB), %d at a time", len(items), total_bytes / 1e6, concurrency)
+    return StreamingResponse(
+        _stream_batch(items, concurrency),
+        media_type="application/x-ndjson",
+        headers={"X-Batch-Items": str(len(items))},
+    )
+
+
+async def _stream_batch(items: List[BulkItem], concurrency: int) -> AsyncIterator[str]:
+    """Run items ``concurrency`` at a time, yielding each result line when it finishes.
+
+    Only that many items hold decoded bytes or an executor slot at once, so a
+    large archive neither floods the queue nor starves single-image requests
+    of admission.
+    """
+    slots = asyncio.Semaphore(max(1, concurrency))
+    cancel = CancelToken()
+
+    async def run(item: BulkItem) -> Dict[str, Any]:
+        async with slots:
+            return await _batch_item(item, cancel)
+
+    tasks = [asyncio.create_task(run(item)) for item in items]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield json.dumps(await finished, ensure_ascii=False) + "\n"
+    finally:
+        # Client went away mid-stream: drop the items that have not started
+        # and stop the running ones at their next check
+        cancel.cancel(DISCONNECTED)
+        for task in tasks:
+            task.cancel()
+
+
+async def _batch_item(item: BulkItem, cancel: Optional[CancelToken] = None) -> Dict[str, Any]:
+    head = {"index": item.index, "filename": item.filename}
+    try:
+        extension = _check_format(item.content_type, item.filename)
+        if item.size > settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024:
+            # Declared zip member size: reject without decompressing
+            raise HTTPException(status_code=413, detail={
+                "success": False,
+                "error": "file_too_large",
+                "message": f"File exceeds {settings.MAX_UPLOAD_SIZE_MB}MB limit.",
+            })
+        result, cache_status = await _extract_image(item.load(), item.filename, extension, cancel=cancel)
+    except HTTPException as exc:
+        return {**head, "status_code": exc.status_code, **exc.detail}
+    except Exception as exc:
+        logger.exception("Batch item %s failed", item.filename)
+        return {**head, "status_code": 500, "success": False, "error": "extraction_failed", "message": str(exc)}
+    return {**head, "status_code": 200, "cache": cache_status, **result.model_dump(mode="json")}
+
+
+@router.post("/jobs", status_code=202)
+async def submit_job(
+    file: UploadFile = File(...), callback_url: Optional[str] = Form(None),
+) -> JSONResponse:
+    """Queue an extraction; poll ``GET /jobs/{job_id}`` or wait for the callback."""
+    filename = file.filename or "upload"
+    _check_format(file.content_type, filename)
+    _require_model()
+    if _job_store is None:
+        raise HTTPException(status_code=503, detail={
+            "success": False,
+            "error": "jobs_disabled",
+            "message": "Asynchronous jobs are not enabled on this instance.",
+        })
+    if callback_url and not callback_url.startswith(("http://", "https://")):
+        raise HTTPException(status_code=422, detail={
+            "success": False,
+            "error": "invalid_callback_url",
+            "message": "callback_url must be an http(s) URL.",
+        })
+    image_bytes = await file.read()
+    if not image_bytes:
+        raise HTTPException(status_code=400, detail={"success": False, "error": "empty_file", "message": "Uploaded file is empty."})
+    if len(image_bytes) > settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024:
+        raise HTTPException(status_code=413, detail={
+            "success": False,
+            "error": "file_too_large",
+            "message": f"File exceeds {settings.MAX_UPLOAD_SIZE_MB}MB limit.",
+        })
+
+    job = await run_in_threadpool(_job_store.create, image_bytes, filename, callback_url or None)
+    if _job_runner is not None:
+        _job_runner.notify()
+    status_url = f"{router.prefix}/jobs/{job['job_id']}"
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job["job_id"], "status": job["status"], "status_url": status_url},
+        headers={"Location": status_url},
+    )
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> Dict[str, Any]:
+    job = await run_in_threadpool(_job_store.get, job_id) if _job_store is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail={
+            "success": False,
+            "error": "job_not_found",
+            "message": f"No job {job_id}.",
+        })
+    return job
+
+
+async def process_job(image_bytes: bytes, filename: str) -> Tuple[int, Dict[str, Any]]:
+    """``JobRunner`` hook: run one stored upload like ``/extract`` would.
+
+    A saturated executor is waited out (Retry-After) rather than failing the
+    job, since the client is not holding a connection open.
+    """
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    while True:
+        try:
+            result, _ = await _extract_image(image_bytes, filename, extension)
+            return 200, result.model_dump(mode="json")
+        except HTTPException as exc:
+            if exc.status_code != 503 or exc.detail.get("error") != "server_busy":
+                return exc.status_code, exc.detail
+            await asyncio.sleep(float(exc.headers.get("Retry-After", 1)))
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check() -> HealthResponse:
-    return HealthResponse(status="healthy" if _engine else "initializing", models_loaded=_engine is not None)
+    queue = QueueStats(**_executor.stats()) if _executor is not None else None
+    status = "healthy" if _engine else "initializing"
+    if queue is not None and queue.saturated:
+        status = "saturated"
+    cache = _result_cache.stats() if _result_cache is not None else None
+    near_dups = getattr(_orchestrator, "near_duplicates", None)
+    stage_stats = getattr(_orchestrator, "stage_stats", None)
+    # SQLite may wait on the store lock (a job upload or claim in progress)
+    jobs = await run_in_threadpool(_job_store.stats) if _job_store is not None else None
+    return HealthResponse(
+        status=status,
+        models_loaded=_engine is not None,
+        queue=queue,
+        result_cache=cache,
+        near_duplicates=near_dups.stats() if near_dups is not None else None,
+        pipeline_stages=stage_stats() if stage_stats is not None else None,
+        jobs=jobs,
+    )
+
+
+@router.get("/ready")
+async def readiness() -> JSONResponse:
+    """Load-balancer readiness probe: 503 while loading or saturated."""
+    queue = _executor.stats() if _executor is not None else None
+    ready = _engine is not None and not (queue and queue["saturated"])
+    return JSONResponse(status_code=200 if ready else 503, content={"ready": ready, "queue": queue})
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """Prometheus text exposition of pipeline, queue and cache metrics."""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
 
 
 @router.get("/config", response_model=ConfigResponse)
@@ -23,11 +23,136 @@ class Settings(BaseSettings):
     AUTO_ACCEPT_THRESHOLD: float = 0.80
     FLAG_REVIEW_THRESHOLD: float = 0.60
 
-    # Image processing
-    MAX_IMAGE_DIMENSION: int = 4000
+    # Image processing: largest decoded side; bigger JPEGs are DCT-reduced on
+    # decode to fit, anything else beyond it is rejected before decoding
+    MAX_IMAGE_DIMENSION: int = 8192
 
-    # Preprocessing
+    # OCR engine: "memory" feeds arrays straight to kiri-ocr, "file" uses the
+    # legacy temporary-JPEG round trip
+    OCR_INFERENCE_MODE: str = "memory"
+
+    # Runtime threading: ORT session options for the DB detector (0 threads =
+    # ORT default) and process-wide OpenCV/torch pools (unset = library
+    # default). Sweep with ``python -m benchmarks.autotune_runtime``.
+    ORT_INTRA_OP_THREADS: int = 0
+    ORT_INTER_OP_THREADS: int = 0
+    ORT_EXECUTION_MODE: str = "sequential"
+    ORT_GRAPH_OPTIMIZATION: str = "all"
+    ORT_ENABLE_MEM_ARENA: bool = True
+    ORT_ENABLE_MEM_PATTERN: bool = True
+    OPENCV_THREADS: Optional[int] = None
+    TORCH_THREADS: Optional[int] = None
+
+    # Model precision: "fp32" or "int8". The INT8 detector is an ONNX file
+    # made by ``python -m scripts.quantize_models``; the INT8 recognizer is
+    # quantized dynamically at load time. Gate with benchmarks.eval_quantized.
+    OCR_DETECTOR_PRECISION: str = "fp32"
+    OCR_DETECTOR_INT8_PATH: Optional[str] = None
+    OCR_RECOGNIZER_PRECISION: str = "fp32"
+
+    # Line decoding: "accurate" (attention decoder for every line), "fast"
+    # (CTC only) or "adaptive" (CTC, re-decoding lines below
+    # OCR_ESCALATE_CONFIDENCE or in the table region accurately)
+    OCR_DECODE_MODE: str = "accurate"
+    OCR_ESCALATE_CONFIDENCE: float = 0.90
+
+    # Recognizer batching: >1 encodes that many line crops per call, grouped
+    # into width buckets (px at model height) and padded only to the bucket;
+    # 1 keeps kiri's per-line, full-width input
+    OCR_RECOGNIZER_BATCH_SIZE: int = 1
+    OCR_RECOGNIZER_WIDTH_BUCKETS: str = "160,320,480,640"
+
+    # Tiled detection: >0 detects pages larger than this (px) as overlapping
+    # tiles at full resolution instead of one input downscaled to 960px, so
+    # PREPROCESS_MAX_DIMENSION can be raised for small print. Keep the tile
+    # at or below 960 and the overlap above the tallest text line.
+    # OCR_DETECTION_TILE_THREADS 0 = one per CPU.
+    OCR_DETECTION_TILE: int = 0
+    OCR_DETECTION_TILE_OVERLAP: int = 160
+    OCR_DETECTION_TILE_THREADS: int = 0
+
+    # Region-of-interest recognition: detected lines are assigned to layout
+    # regions first and only those in OCR_ROI_REGIONS are recognised, plus up
+    # to OCR_ROI_BUDGET others (taken alternately from the top and bottom of
+    # the page, where facility and prescriber are read). Memory mode only.
+    OCR_ROI_ENABLED: bool = False
+    OCR_ROI_REGIONS: str = "patient,clinical,table"
+    OCR_ROI_BUDGET: int = 6
+
+    # Bulk extraction (/extract/batch): limits per upload, and how many images
+    # run at once (0 = one per executor worker)
+    BULK_MAX_ITEMS: int = 500
+    BULK_MAX_UPLOAD_MB: int = 500
+    BULK_CONCURRENCY: int = 0
+
+    # Asynchronous jobs (/jobs): SQLite store path (keep it on a persistent
+    # volume so queued jobs survive restarts), jobs run at once (0 = one per
+    # executor worker), retention of finished jobs and callback delivery
+    JOBS_ENABLED: bool = True
+    JOBS_DB_PATH: str = "ocr_jobs.db"
+    JOBS_CONCURRENCY: int = 0
+    JOBS_RETENTION_S: int = 7 * 86400
+    JOBS_CALLBACK_TIMEOUT_S: float = 10.0
+    JOBS_CALLBACK_RETRIES: int = 3
+
+    # Worker executor: pipeline threads and how many requests may wait for one
+    OCR_WORKERS: int = 1
+    OCR_MAX_QUEUE: int = 8
+
+    # Queue order: "sjf" runs the cheapest waiting request first (cost =
+    # probed megapixels), each ms of waiting counting OCR_SJF_AGEING ms off
+    # its estimate; "fifo" keeps arrival order. OCR_MAX_QUEUE_WAIT_MS > 0
+    # sheds requests (503) whose projected queue wait exceeds it.
+    OCR_SCHEDULING: str = "sjf"
+    OCR_SJF_AGEING: float = 1.0
+    OCR_MAX_QUEUE_WAIT_MS: int = 0
+
+    # Cancellation: work stops at the next stage or recognizer batch once a
+    # request's deadline passes (REQUEST_DEADLINE_S, 0 = none; an
+    # X-Request-Deadline header in seconds can shorten it) or its client
+    # disconnects, polled every DISCONNECT_POLL_S.
+    REQUEST_DEADLINE_S: float = 0.0
+    DISCONNECT_POLL_S: float = 0.25
+
+    # Process pool: >0 forks that many inference workers sharing one loaded
+    # model (run a single uvicorn worker per node in this mode)
+    OCR_POOL_PROCESSES: int = 0
+    OCR_POOL_WORKER_THREADS: int = 1
+
+    # Extraction result cache (keyed by image-bytes hash + pipeline version);
+    # set RESULT_CACHE_DIR to keep entries across restarts
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MAX_ENTRIES: int = 256
+    RESULT_CACHE_TTL_S: int = 86400
+    RESULT_CACHE_DIR: Optional[str] = None
+    RESULT_CACHE_DISK_MAX_MB: int = 512
+
+    # Near-duplicate reuse: perceptual-hash match against recent submissions
+    # (Hamming distance over a 256-bit DCT hash). Opt-in.
+    NEAR_DUP_ENABLED: bool = False
+    NEAR_DUP_MAX_DISTANCE: int = 24
+    NEAR_DUP_MAX_ENTRIES: int = 512
+
+    # Preprocessing: "full" denoises at decode resolution; "fast" resizes first
+    # and skips/cheapens denoising on clean images
     PREPROCESS_MAX_DIMENSION: int = 3000
+    PREPROCESS_PROFILE: str = "full"
+    # Detect the sheet in phone photos, warp it upright and crop to the
+    # content before preprocessing. Corners sent by the client (``corners``
+    # form field) are always applied and skip detection.
+    PREPROCESS_RECTIFY: bool = False
+
+    # Threads per worker process for running independent pipeline stages
+    # (layout analysis alongside OCR); 0 runs every stage sequentially
+    PIPELINE_STAGE_THREADS: int = 2
+
+    # Stage-pipelined execution: per-stage worker threads joined by bounded
+    # hand-off queues so consecutive requests overlap (ignored in pool mode)
+    PIPELINE_STAGED: bool = False
+    PIPELINE_PREPROCESS_WORKERS: int = 1
+    PIPELINE_OCR_WORKERS: int = 1
+    PIPELINE_PARSE_WORKERS: int = 1
+    PIPELINE_HANDOFF_QUEUE: int = 2
 
     # Layout / row clustering
     ROW_Y_TOLERANCE: int = 15
@@ -7,10 +7,26 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.responses import JSONResponse as _JSONResponse
 
-from app.api.routes import router, set_engine, set_orchestrator
+from app.api.routes import (
+    get_metrics,
+    process_job,
+    router,
+    set_engine,
+    set_executor,
+    set_jobs,
+    set_orchestrator,
+    set_result_cache,
+)
 from app.config import settings
+from app.pipeline.cache import ResultCache, pipeline_version
+from app.pipeline.dedup import NearDuplicateIndex
 from app.pipeline.ocr_engine import KiriOCREngine
 from app.pipeline.orchestrator import PipelineOrchestrator
+from app.pipeline.roi import parse_regions
+from app.runtime.executor import BoundedExecutor
+from app.runtime.jobs import JobRunner, JobStore
+from app.runtime.stage_pipeline import StagePipeline
+from app.runtime.worker_pool import OrchestratorProcessPool
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
 logger = logging.getLogger(__name__)
@@ -23,15 +39,94 @@ class UnicodeJSONResponse(_JSONResponse):
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting OCR service...")
-    engine = KiriOCREngine()
+    pool_mode = settings.OCR_POOL_PROCESSES > 0
+    # In pool mode the parent only loads weights; workers warm up after fork
+    engine = KiriOCREngine(warmup=not pool_mode)
     set_engine(engine)
+    near_duplicates = None
+    if settings.NEAR_DUP_ENABLED:
+        near_duplicates = NearDuplicateIndex(
+            max_entries=settings.NEAR_DUP_MAX_ENTRIES,
+            max_distance=settings.NEAR_DUP_MAX_DISTANCE,
+        )
     orchestrator = PipelineOrchestrator(
         engine, max_dimension=settings.PREPROCESS_MAX_DIMENSION,
+        near_duplicates=near_duplicates,
+        preprocess_profile=settings.PREPROCESS_PROFILE,
+        rectify=settings.PREPROCESS_RECTIFY,
+        max_image_dimension=settings.MAX_IMAGE_DIMENSION,
+        stage_threads=settings.PIPELINE_STAGE_THREADS,
+        roi_regions=parse_regions(settings.OCR_ROI_REGIONS) if settings.OCR_ROI_ENABLED else None,
+        roi_budget=settings.OCR_ROI_BUDGET,
+    )
+    pool = None
+    workers = settings.OCR_WORKERS
+    if pool_mode:
+        engine.prefetch_detector()
+        pool = OrchestratorProcessPool(
+            orchestrator,
+            processes=settings.OCR_POOL_PROCESSES,
+            threads_per_worker=settings.OCR_POOL_WORKER_THREADS,
+        )
+        workers = settings.OCR_POOL_PROCESSES
+    staged = None
+    if settings.PIPELINE_STAGED and not pool_mode:
+        staged = StagePipeline(
+            orchestrator,
+            workers={
+                "preprocess": settings.PIPELINE_PREPROCESS_WORKERS,
+                "ocr": settings.PIPELINE_OCR_WORKERS,
+                "parse": settings.PIPELINE_PARSE_WORKERS,
+            },
+            queue_size=settings.PIPELINE_HANDOFF_QUEUE,
+        )
+        # Executor threads only wait on the pipeline; admit as many as it holds
+        workers = staged.capacity
+    set_orchestrator(pool or staged or orchestrator)
+    executor = BoundedExecutor(
+        max_workers=workers,
+        max_queue=settings.OCR_MAX_QUEUE,
+        policy=settings.OCR_SCHEDULING,
+        ageing=settings.OCR_SJF_AGEING,
+        max_wait_ms=settings.OCR_MAX_QUEUE_WAIT_MS,
+    )
+    set_executor(executor)
+    if settings.RESULT_CACHE_ENABLED:
+        set_result_cache(ResultCache(
+            version=pipeline_version(settings),
+            max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+            ttl_s=settings.RESULT_CACHE_TTL_S,
+            disk_dir=settings.RESULT_CACHE_DIR,
+            disk_max_mb=settings.RESULT_CACHE_DISK_MAX_MB,
+        ))
+    job_runner = None
+    if settings.JOBS_ENABLED:
+        job_store = JobStore(settings.JOBS_DB_PATH, retention_s=settings.JOBS_RETENTION_S)
+        job_runner = JobRunner(
+            job_store, process_job,
+            concurrency=settings.JOBS_CONCURRENCY or workers,
+            callback_timeout_s=settings.JOBS_CALLBACK_TIMEOUT_S,
+            callback_retries=settings.JOBS_CALLBACK_RETRIES,
+        )
+        set_jobs(job_store, job_runner)
+        job_runner.start()
+    logger.info(
+        "OCR service ready (orchestrator pipeline active, %d %s, queue %d)",
+        workers, "processes" if pool_mode else "threads", settings.OCR_MAX_QUEUE,
     )
-    set_orchestrator(orchestrator)
-    logger.info("OCR service ready (orchestrator pipeline active)")
     yield
     logger.info("Shutting down OCR service...")
+    if job_runner is not None:
+        await job_runner.stop()
+        set_jobs(None, None)
+        job_runner.store.close()
+    set_executor(None)
+    set_result_cache(None)
+    executor.shutdown(wait=False)
+    if pool is not None:
+        pool.shutdown()
+    if staged is not None:
+        staged.shutdown()
 
 
 app = FastAPI(
@@ -50,6 +145,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 app.include_router(router)
+# Conventional scrape path for Prometheus, alongside /api/v1/metrics
+app.add_api_route("/metrics", get_metrics, methods=["GET"], include_in_schema=False)
 
 
 @app.get("/")
@@ -0,0 +1,205 @@
+"""Content-addressed cache for extraction results.
+
+Keys are ``sha256(image_bytes)`` combined with a pipeline/config version, so
+byte-identical re-uploads (network retries, app restarts) return the stored
+``build_dynamic_universal`` payload without re-running the pipeline, while
+any change to pipeline code or relevant settings invalidates old entries.
+
+Two tiers:
+- in-memory LRU bounded by entry count and TTL
+- optional on-disk JSON tier (survives restarts) bounded by size and TTL
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever pipeline changes alter extraction output for the same bytes.
+PIPELINE_VERSION = "2"
+
+# Settings whose values change extraction output
+_VERSIONED_SETTINGS = (
+    "OCR_INFERENCE_MODE",
+    "OCR_DETECTOR_PRECISION",
+    "OCR_DETECTOR_INT8_PATH",
+    "OCR_RECOGNIZER_PRECISION",
+    "OCR_DECODE_MODE",
+    "OCR_ESCALATE_CONFIDENCE",
+    "OCR_RECOGNIZER_BATCH_SIZE",
+    "OCR_RECOGNIZER_WIDTH_BUCKETS",
+    "OCR_DETECTION_TILE",
+    "OCR_DETECTION_TILE_OVERLAP",
+    "OCR_ROI_ENABLED",
+    "OCR_ROI_REGIONS",
+    "OCR_ROI_BUDGET",
+    "MAX_IMAGE_DIMENSION",
+    "PREPROCESS_MAX_DIMENSION",
+    "PREPROCESS_PROFILE",
+    "PREPROCESS_RECTIFY",
+    "ROW_Y_TOLERANCE",
+    "ROW_Y_TOLERANCE_ADAPTIVE",
+    "ROW_Y_TOLERANCE_ADAPTIVE_FACTOR",
+)
+
+
+def pipeline_version(settings: Any, extra: Iterable[str] = ()) -> str:
+    """Short fingerprint of the pipeline version and output-affecting settings."""
+    parts = [PIPELINE_VERSION]
+    parts.extend(f"{name}={getattr(settings, name, None)}" for name in (*_VERSIONED_SETTINGS, *extra))
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:12]
+
+
+class ResultCache:
+    """Two-tier (memory LRU + optional disk) cache of extraction payloads."""
+
+    def __init__(
+        self,
+        version: str,
+        max_entries: int = 256,
+        ttl_s: float = 86400,
+        disk_dir: Optional[str] = None,
+        disk_max_mb: int = 512,
+    ):
+        self.version = version
+        self.max_entries = max(1, max_entries)
+        self.ttl_s = ttl_s
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_mb * 1024 * 1024
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits_memory": 0, "hits_disk": 0, "misses": 0, "stores": 0, "evictions": 0}
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def key_for(self, image_bytes: bytes, extra: str = "") -> str:
+        """Key for an image; ``extra`` covers request options that change the result."""
+        digest = hashlib.sha256(image_bytes)
+        if extra:
+            digest.update(b"|" + extra.encode())
+        return f"{digest.hexdigest()}-{self.version}"
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, payload = entry
+                if now - stored_at <= self.ttl_s:
+                    self._memory.move_to_end(key)
+                    self._counters["hits_memory"] += 1
+                    return payload
+                del self._memory[key]
+
+        payload = self._disk_get(key, now)
+        with self._lock:
+            if payload is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["hits_disk"] += 1
+            self._remember_locked(key, payload, now)
+        return payload
+
+    # Disk eviction scans the directory, so only run it every N stores
+    _DISK_EVICT_EVERY = 64
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember_locked(key, payload, now)
+            self._counters["stores"] += 1
+            evict = self._counters["stores"] % self._DISK_EVICT_EVERY == 1
+        self._disk_put(key, payload, evict)
+
+    def _remember_locked(self, key: str, payload: Dict[str, Any], now: float) -> None:
+        self._memory[key] = (now, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    # ------------------------------------------------------------------
+    # Disk tier
+    # ------------------------------------------------------------------
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _disk_get(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            if now - path.stat().st_mtime > self.ttl_s:
+                path.unlink(missing_ok=True)
+                return None
+            return json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Dropping unreadable cache entry %s: %s", path.name, e)
+            path.unlink(missing_ok=True)
+            return None
+
+    def _disk_put(self, key: str, payload: Dict[str, Any], evict: bool) -> None:
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Result cache disk write failed: %s", e)
+            return
+        if evict:
+            self._disk_evict()
+
+    def _disk_evict(self) -> None:
+        """Drop expired files, then oldest files until under the size budget."""
+        now = time.time()
+        files = []
+        for path in self.disk_dir.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - st.st_mtime > self.ttl_s:
+                path.unlink(missing_ok=True)
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            with self._lock:
+                self._counters["evictions"] += 1
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._counters["hits_memory"] + self._counters["hits_disk"]
+            lookups = hits + self._counters["misses"]
+            return {
+                **self._counters,
+                "entries": len(self._memory),
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "version": self.version,
+                "disk_enabled": self.disk_dir is not None,
+            }
@@ -0,0 +1,93 @@
+"""Perceptual-hash near-duplicate detection for repeated prescription photos.
+
+A DCT hash of the preprocessed grayscale is compared against a ring buffer
+of recent submissions with vectorised Hamming distance. When a new image is
+within ``max_distance`` bits of an earlier one (and has a similar aspect
+ratio), the earlier extraction is reused instead of re-running detection and
+recognition.
+
+The hash uses the 16x16 lowest DCT frequencies (256 bits) rather than the
+classic 8x8, so that two different patients on the same printed form are
+still told apart by their handwriting.
+"""
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 16                      # low-frequency block side → 256-bit hash
+_HASH_WORDS = HASH_SIZE * HASH_SIZE // 64
+
+
+def perceptual_hash(gray: np.ndarray, hash_size: int = HASH_SIZE) -> np.ndarray:
+    """DCT perceptual hash of a grayscale image, packed as uint64 words."""
+    small = cv2.resize(gray, (hash_size * 4, hash_size * 4), interpolation=cv2.INTER_AREA)
+    dct = cv2.dct(np.float32(small))
+    low = dct[:hash_size, :hash_size].flatten()
+    bits = low > np.median(low[1:])  # skip the DC term when picking the threshold
+    return np.packbits(bits).view(np.uint64)
+
+
+@dataclass
+class DuplicateMatch:
+    """A reusable earlier extraction."""
+    distance: int
+    payload: Any
+
+
+class NearDuplicateIndex:
+    """Fixed-size ring buffer of recent hashes with Hamming-distance lookup."""
+
+    def __init__(self, max_entries: int = 512, max_distance: int = 24, max_aspect_delta: float = 0.05):
+        self.max_entries = max(1, max_entries)
+        self.max_distance = max_distance
+        self.max_aspect_delta = max_aspect_delta
+        self._hashes = np.zeros((self.max_entries, _HASH_WORDS), dtype=np.uint64)
+        self._aspects = np.zeros(self.max_entries, dtype=np.float32)
+        self._payloads: list = [None] * self.max_entries
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+        self._lookups = 0
+        self._reused = 0
+
+    def lookup(self, phash: np.ndarray, size: Tuple[int, int]) -> Optional[DuplicateMatch]:
+        """Return the closest earlier payload within the threshold, if any."""
+        aspect = size[0] / max(size[1], 1)
+        with self._lock:
+            self._lookups += 1
+            if self._size == 0:
+                return None
+            hashes = self._hashes[:self._size]
+            distances = np.unpackbits((hashes ^ phash).view(np.uint8), axis=1).sum(axis=1)
+            distances[np.abs(self._aspects[:self._size] - aspect) > self.max_aspect_delta] = 1 << 16
+            best = int(np.argmin(distances))
+            distance = int(distances[best])
+            if distance > self.max_distance:
+                return None
+            self._reused += 1
+            return DuplicateMatch(distance=distance, payload=self._payloads[best])
+
+    def add(self, phash: np.ndarray, size: Tuple[int, int], payload: Any) -> None:
+        with self._lock:
+            slot = self._next
+            self._hashes[slot] = phash
+            self._aspects[slot] = size[0] / max(size[1], 1)
+            self._payloads[slot] = payload
+            self._next = (slot + 1) % self.max_entries
+            self._size = min(self._size + 1, self.max_entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": self._size,
+                "lookups": self._lookups,
+                "reused": self._reused,
+                "reuse_rate": round(self._reused / self._lookups, 3) if self._lookups else 0.0,
+                "max_distance": self.max_distance,
+            }
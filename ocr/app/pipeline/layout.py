@@ -5,11 +5,13 @@ bounding-box-based row reconstruction for table-aware extraction.
 """
 import logging
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import cv2
 import numpy as np
 
+from app.pipeline.pyramid import TABLE_SIDE, ImagePyramid
+
 logger = logging.getLogger(__name__)
 
 
@@ -141,13 +143,11 @@ def _detect_table_lines(gray: np.ndarray) -> bool:
     return has_lines
 
 
-def analyze_layout(gray: np.ndarray) -> LayoutResult:
-    """Analyze prescription layout and identify document regions.
+def estimate_regions(w: int, h: int) -> LayoutResult:
+    """Proportional region estimates for a ``w`` x ``h`` page (no pixel analysis).
 
-    Uses proportional heuristics that work across different prescription
-    formats (not hardcoded to any specific form).
+    Cheap enough to call before OCR, e.g. to know where the table will be.
     """
-    h, w = gray.shape
     result = LayoutResult(image_size=(w, h))
 
     # Proportional region estimates — work for typical prescription layouts
@@ -157,7 +157,37 @@ def analyze_layout(gray: np.ndarray) -> LayoutResult:
     result.table_region = (0, int(h * 0.28), w, int(h * 0.82))
     result.footer_region = (0, int(h * 0.75), w, h)
     result.date_region = (int(w * 0.4), int(h * 0.55), w, int(h * 0.75))
-    result.has_table_lines = _detect_table_lines(gray)
+    return result
+
+
+# First match wins where regions overlap
+REGION_ORDER = ("header", "patient", "clinical", "table", "footer")
+
+
+def assign_region(bbox: Sequence[int], layout: LayoutResult) -> str:
+    """Region holding the vertical centre of an ``[x, y, w, h]`` box, else ``"unassigned"``."""
+    if not bbox or len(bbox) < 4:
+        return "unassigned"
+    cy = bbox[1] + bbox[3] / 2.0
+    for name in REGION_ORDER:
+        region = getattr(layout, name + "_region")
+        if region is not None and region[1] <= cy <= region[3]:
+            return name
+    return "unassigned"
+
+
+def analyze_layout(gray: np.ndarray, pyramid: Optional[ImagePyramid] = None) -> LayoutResult:
+    """Analyze prescription layout and identify document regions.
+
+    Uses proportional heuristics that work across different prescription
+    formats (not hardcoded to any specific form). Table-line morphology runs
+    on a reduced pyramid level; pass the request's pyramid to share it.
+    """
+    h, w = gray.shape
+    result = estimate_regions(w, h)
+    if pyramid is None:
+        pyramid = ImagePyramid(gray)
+    result.has_table_lines = _detect_table_lines(pyramid.level(TABLE_SIDE))
 
     logger.info("Layout: size=%dx%d, table_lines=%s", w, h, result.has_table_lines)
     return result
@@ -0,0 +1,133 @@
+"""Width-bucketed batching of line crops for the recognizer.
+
+kiri's ``_preprocess_region`` resizes each line to the model height and pads
+it to the full model width (640px), one tensor per line, so a short dose
+column costs the encoder as much as a full-width line. Here crops keep their
+natural width at the model height and are grouped into width buckets; each
+batch is padded only to its widest member (at most the bucket width), with
+the same gray (128) kiri pads with. ``BatchStats`` reports how much of the encoded area is padding.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+PAD_VALUE = 128
+
+
+@dataclass
+class LineCrop:
+    """One detected line, resized to the model height (uint8, unpadded)."""
+    key: Any
+    pixels: np.ndarray
+
+    @property
+    def width(self) -> int:
+        return self.pixels.shape[1]
+
+
+@dataclass
+class BatchStats:
+    """Recognizer batching counters; ``merge`` accumulates across pages."""
+    lines: int = 0
+    batches: int = 0
+    content_pixels: int = 0
+    padded_pixels: int = 0
+    seconds: float = 0.0
+
+    @property
+    def padding_waste(self) -> float:
+        """Share of the encoded batch area that is padding."""
+        total = self.content_pixels + self.padded_pixels
+        return self.padded_pixels / total if total else 0.0
+
+    @property
+    def lines_per_s(self) -> float:
+        return self.lines / self.seconds if self.seconds else 0.0
+
+    def merge(self, other: "BatchStats") -> None:
+        self.lines += other.lines
+        self.batches += other.batches
+        self.content_pixels += other.content_pixels
+        self.padded_pixels += other.padded_pixels
+        self.seconds += other.seconds
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "lines": self.lines,
+            "batches": self.batches,
+            "padding_waste": round(self.padding_waste, 4),
+            "recognize_ms": round(self.seconds * 1000, 1),
+            "lines_per_s": round(self.lines_per_s, 1),
+        }
+
+
+def parse_buckets(spec: str, max_width: int) -> Tuple[int, ...]:
+    """``"160,320,480"`` -> sorted bucket widths, always ending at ``max_width``."""
+    widths = {int(w) for w in spec.split(",") if w.strip()} if spec else set()
+    if any(w <= 0 for w in widths):
+        raise ValueError(f"Invalid recognizer width buckets: {spec!r}")
+    return tuple(sorted({w for w in widths if w < max_width} | {max_width}))
+
+
+def crop_line(
+    gray: np.ndarray, box: Tuple[int, int, int, int], height: int, max_width: int, extra_padding: int = 5
+) -> Optional[np.ndarray]:
+    """Crop, polarity-normalise and resize one line like kiri, minus the padding.
+
+    Lines wider than ``max_width`` at the model height are cut at
+    ``max_width``, as kiri's resize does.
+    """
+    img_h, img_w = gray.shape[:2]
+    x, y, w, h = box
+    roi = gray[max(0, y - extra_padding):min(img_h, y + h + extra_padding),
+               max(0, x - extra_padding):min(img_w, x + w + extra_padding)]
+    if roi.size == 0:
+        return None
+    if np.mean(roi) < 127:
+        roi = 255 - roi
+    nw = max(1, int(round(roi.shape[1] * height / float(roi.shape[0]))))
+    resized = np.asarray(Image.fromarray(roi).resize((nw, height), Image.BILINEAR))
+    return resized[:, :max_width]
+
+
+@dataclass
+class Batch:
+    width: int
+    crops: List[LineCrop] = field(default_factory=list)
+
+
+def plan_batches(crops: Sequence[LineCrop], buckets: Sequence[int], batch_size: int) -> List[Batch]:
+    """Group crops into the narrowest bucket that fits, ``batch_size`` per batch.
+
+    Within a bucket crops are ordered by width so a batch that does not fill
+    its bucket is padded only to its widest member.
+    """
+    by_bucket: Dict[int, List[LineCrop]] = {w: [] for w in buckets}
+    for crop in crops:
+        by_bucket[next(w for w in buckets if crop.width <= w)].append(crop)
+    batches: List[Batch] = []
+    for members in by_bucket.values():
+        members.sort(key=lambda c: c.width)
+        for i in range(0, len(members), max(1, batch_size)):
+            chunk = members[i:i + batch_size]
+            batches.append(Batch(width=chunk[-1].width, crops=chunk))
+    return batches
+
+
+def to_tensor(batch: Batch, stats: Optional[BatchStats] = None):
+    """Stack a batch into a normalised ``[B, 1, H, W]`` float tensor."""
+    import torch
+
+    height = batch.crops[0].pixels.shape[0]
+    arr = np.full((len(batch.crops), 1, height, batch.width), PAD_VALUE, dtype=np.uint8)
+    for i, crop in enumerate(batch.crops):
+        arr[i, 0, :, :crop.width] = crop.pixels
+    if stats is not None:
+        content = sum(c.width for c in batch.crops) * height
+        stats.lines += len(batch.crops)
+        stats.batches += 1
+        stats.content_pixels += content
+        stats.padded_pixels += arr.size - content
+    return (torch.from_numpy(arr).float() / 255.0 - 0.5) / 0.5
@@ -1,15 +1,25 @@
 """Kiri-OCR engine wrapper — loads model once, provides extract method."""
+import copy
 import io
 import logging
 import os
 import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import List, Tuple
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
 
+import cv2
 import numpy as np
 from PIL import Image
 
+from app.pipeline.line_batching import BatchStats, LineCrop, crop_line, parse_buckets, plan_batches, to_tensor
+from app.pipeline.tiling import merge_tile_boxes, plan_tiles
+from app.runtime.cancellation import CancelToken
+from app.runtime.tuning import RuntimeTuning
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,6 +30,7 @@ class LineResult:
     confidence: float
     bbox: List[int] = field(default_factory=list)  # [x, y, w, h]
     line_number: int = 0
+    escalated: bool = False  # Re-decoded with the accurate decoder (adaptive mode)
 
 
 class KiriOCREngine:
@@ -33,11 +44,109 @@ class KiriOCREngine:
       - 'confidence': float (0-1)
       - 'det_confidence': float (0-1)
       - 'line_number': int
+
+    Two inference modes are supported:
+      - ``memory`` (default): the BGR array is handed straight to the DB
+        detector and the recognizer crops regions from the same buffer.
+      - ``file``: the legacy path that writes a temporary JPEG and lets
+        ``extract_text()`` decode it again from disk.
+
+    kiri builds the detector's ONNX Runtime session with default options; it
+    is rebuilt once with the ``RuntimeTuning`` session options (thread counts,
+    execution mode, graph optimisation, memory arena) before first use.
+
+    Either model can run in INT8: the detector from an ONNX file produced by
+    ``python -m scripts.quantize_models``, the recognizer by dynamic
+    quantization of its Linear layers at load time. Validate a variant with
+    ``python -m benchmarks.eval_quantized`` before enabling it.
+
+    Decode modes (memory mode only; the file path always decodes accurately):
+      - ``accurate``: kiri's greedy attention decoder for every line.
+      - ``fast``: CTC head only.
+      - ``adaptive``: CTC first; lines below ``escalate_confidence`` or inside
+        an escalation region (the table) are re-decoded accurately from the
+        same encoder output.
+
+    With ``recognizer_batch_size`` > 1 (memory mode) line crops keep their
+    natural width, are grouped into width buckets and encoded a batch at a
+    time; the attention decoder still runs per line. ``recognition_stats()``
+    reports lines, batches, padding waste and throughput.
+
+    A ``CancelToken`` passed to ``extract_from_numpy``/``extract_batch`` is
+    checked before each recognizer batch (each line when unbatched).
+
+    With ``detection_tile`` > 0 (memory mode, DB detector) pages larger than
+    one tile are detected as overlapping tiles at native resolution, run on
+    ``detection_tile_threads`` threads, and the boxes are merged across the
+    seams before recognition (see ``app.pipeline.tiling``).
+
+    ``select_lines`` (memory mode) is called with the detected ``(x, y, w, h)``
+    boxes and returns the indices to recognise; the others are skipped and
+    keep their detection numbering out of the results (see
+    ``app.pipeline.roi``).
     """
 
-    def __init__(self):
+    INFERENCE_MODES = ("memory", "file")
+    PRECISIONS = ("fp32", "int8")
+    DECODE_MODES = ("accurate", "fast", "adaptive")
+
+    def __init__(
+        self,
+        inference_mode: Optional[str] = None,
+        warmup: bool = True,
+        tuning: Optional[RuntimeTuning] = None,
+        detector_precision: Optional[str] = None,
+        recognizer_precision: Optional[str] = None,
+        decode_mode: Optional[str] = None,
+        escalate_confidence: Optional[float] = None,
+        recognizer_batch_size: Optional[int] = None,
+        width_buckets: Optional[str] = None,
+        detection_tile: Optional[int] = None,
+        detection_tile_overlap: Optional[int] = None,
+    ):
         # Set HF_TOKEN before loading so HuggingFace uses authenticated requests
         from app.config import settings
+        self.inference_mode = inference_mode or settings.OCR_INFERENCE_MODE
+        if self.inference_mode not in self.INFERENCE_MODES:
+            raise ValueError(f"Unknown OCR inference mode: {self.inference_mode}")
+        self.detector_precision = detector_precision or settings.OCR_DETECTOR_PRECISION
+        self.recognizer_precision = recognizer_precision or settings.OCR_RECOGNIZER_PRECISION
+        for precision in (self.detector_precision, self.recognizer_precision):
+            if precision not in self.PRECISIONS:
+                raise ValueError(f"Unknown model precision: {precision}")
+        self.detector_int8_path = settings.OCR_DETECTOR_INT8_PATH
+        self.decode_mode = decode_mode or settings.OCR_DECODE_MODE
+        if self.decode_mode not in self.DECODE_MODES:
+            raise ValueError(f"Unknown OCR decode mode: {self.decode_mode}")
+        self.escalate_confidence = (
+            settings.OCR_ESCALATE_CONFIDENCE if escalate_confidence is None else escalate_confidence
+        )
+        self.recognizer_batch_size = recognizer_batch_size or settings.OCR_RECOGNIZER_BATCH_SIZE
+        self._width_buckets_spec = width_buckets or settings.OCR_RECOGNIZER_WIDTH_BUCKETS
+        self._batch_stats = BatchStats()
+        self._stats_lock = threading.Lock()
+        self.detection_tile = settings.OCR_DETECTION_TILE if detection_tile is None else detection_tile
+        self.detection_tile_overlap = (
+            settings.OCR_DETECTION_TILE_OVERLAP if detection_tile_overlap is None else detection_tile_overlap
+        )
+        if self.detection_tile and self.detection_tile_overlap >= self.detection_tile:
+            raise ValueError("OCR_DETECTION_TILE_OVERLAP must be smaller than OCR_DETECTION_TILE")
+        self.detection_tile_threads = settings.OCR_DETECTION_TILE_THREADS or os.cpu_count() or 1
+        self._tile_pool: Optional[ThreadPoolExecutor] = None
+        self._tile_pool_pid: Optional[int] = None
+        self._tile_pool_lock = threading.Lock()
+        if self.detector_precision == "int8":
+            if not self.detector_int8_path:
+                raise ValueError("OCR_DETECTOR_INT8_PATH is required when OCR_DETECTOR_PRECISION=int8")
+            if not os.path.exists(self.detector_int8_path):
+                raise FileNotFoundError(
+                    f"INT8 detector not found at {self.detector_int8_path}; "
+                    "create it with python -m scripts.quantize_models"
+                )
+        self.tuning = tuning or RuntimeTuning.from_settings(settings)
+        self.tuning.apply_process_threads()
+        self._detector_tuned = False
+
         if settings.HF_TOKEN:
             os.environ.setdefault("HF_TOKEN", settings.HF_TOKEN)
             logger.info("HuggingFace token configured")
@@ -48,27 +157,107 @@ class KiriOCREngine:
         self._ocr = OCR(device="cpu", det_method="db", decode_method="accurate")
         elapsed = time.time() - start
         logger.info(f"Kiri-OCR model loaded in {elapsed:.1f}s")
+        if self.recognizer_precision == "int8":
+            self._quantize_recognizer()
+        self.width_buckets = parse_buckets(self._width_buckets_spec, self._ocr.cfg.IMG_W)
 
         # Warm up to force detector initialization
-        self._warmup()
+        if warmup:
+            self._warmup()
+
+    def prefetch_detector(self) -> None:
+        """Download the detector weights without creating an ONNX session.
+
+        Used before forking worker processes: ORT sessions own thread pools
+        that do not survive fork, so each worker builds its own session from
+        the cached (page-shared) model file.
+        """
+        repo_id = getattr(self._ocr, "repo_id", None)
+        if not repo_id:
+            return
+        try:
+            from huggingface_hub import hf_hub_download
+            hf_hub_download(repo_id=repo_id, filename="detector/DB/detector.onnx")
+        except Exception as e:
+            logger.warning(f"Detector prefetch skipped ({e})")
+
+    def apply_tuning(self, tuning: RuntimeTuning) -> None:
+        """Switch to new runtime options; the detector session is rebuilt."""
+        self.tuning = tuning
+        tuning.apply_process_threads()
+        self._detector_tuned = False
+        self._tune_detector()
+
+    def _quantize_recognizer(self) -> None:
+        """Swap in a dynamically INT8-quantized copy of the recognizer.
+
+        kiri caches loaded models per path/device, so the fp32 model is left
+        untouched for other engines in the process.
+
+        Only Linear layers outside the transformer layers are quantized
+        (``mem_proj``, the CTC, decoder and LM heads). Under inference mode
+        torch runs ``TransformerEncoderLayer`` through its fused fast path,
+        which reads ``linear1.weight`` as a tensor and fails on quantized
+        layers, where ``weight`` is a method.
+        """
+        import torch
+        from torch.ao.quantization import default_dynamic_qconfig, quantize_dynamic
+
+        start = time.time()
+        model = self._ocr.model
+        layer_types = (torch.nn.TransformerEncoderLayer, torch.nn.TransformerDecoderLayer)
+        layers = [name for name, module in model.named_modules() if isinstance(module, layer_types)]
+        spec = {
+            name: default_dynamic_qconfig
+            for name, module in model.named_modules()
+            if isinstance(module, torch.nn.Linear)
+            and not any(name.startswith(f"{layer}.") for layer in layers)
+        }
+        self._ocr.model = quantize_dynamic(model, spec, dtype=torch.qint8)
+        logger.info("Recognizer quantized to INT8 (%d linear layers) in %.1fs", len(spec), time.time() - start)
+
+    def _tune_detector(self) -> None:
+        """Recreate the DB detector's ORT session with the tuned options.
+
+        Also where the INT8 detector model replaces the fp32 one.
+        """
+        if self._detector_tuned:
+            return
+        db = getattr(self._ocr.detector, "db_detector", None)
+        model_path = getattr(db, "model_path", None)
+        if db is None or not model_path:
+            self._detector_tuned = True
+            return
+        if self.detector_precision == "int8":
+            model_path = self.detector_int8_path
+        import onnxruntime as ort
+        providers = db.session.get_providers()
+        db.session = ort.InferenceSession(
+            str(model_path), sess_options=self.tuning.session_options(), providers=providers,
+        )
+        db.input_name = db.session.get_inputs()[0].name
+        self._detector_tuned = True
+        logger.info("Detector session (%s, %s) tuned: %s", self.detector_precision, model_path, self.tuning)
+
+    def recognition_stats(self) -> Dict[str, float]:
+        """Cumulative batched-recognition counters since start-up."""
+        with self._stats_lock:
+            return self._batch_stats.as_dict()
 
     def _warmup(self) -> None:
         """Force-initialise the detector by running inference on a synthetic image."""
         logger.info("Warming up detector (pre-loading detector.onnx)...")
         start = time.time()
         try:
+            self._tune_detector()
             # White background with dark horizontal bars that mimic text lines
             arr = np.full((200, 320, 3), 255, dtype=np.uint8)
             for row_y in range(20, 180, 28):
                 arr[row_y:row_y + 10, 20:300] = 30  # dark bar
-            dummy = Image.fromarray(arr)
-            with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp:
-                dummy.save(tmp, format="JPEG", quality=90)
-                tmp_path = tmp.name
-            try:
-                self._ocr.extract_text(tmp_path)
-            finally:
-                os.unlink(tmp_path)
+            if self.inference_mode == "memory":
+                self._extract_in_memory(arr)
+            else:
+                self._extract_via_file(Image.fromarray(arr))
             elapsed = time.time() - start
             logger.info(f"Detector warmed up in {elapsed:.1f}s")
         except Exception as e:
@@ -92,38 +281,402 @@ class KiriOCREngine:
         Returns:
             (full_text, line_results)
         """
-        start = time.time()
         if img.mode != "RGB":
             img = img.convert("RGB")
+        if self.inference_mode == "memory":
+            return self.extract_from_numpy(cv2.cvtColor(np.asarray(img), cv2.COLOR_RGB2BGR))
+        return self._to_line_results(*self._timed(self._extract_via_file, img))
+
+    def extract_from_numpy(
+        self,
+        img_bgr: np.ndarray,
+        escalate_regions: Optional[List[Tuple[int, int, int, int]]] = None,
+        cancel: Optional[CancelToken] = None,
+        select_lines: Optional[Callable[[List[Tuple[int, int, int, int]]], Sequence[int]]] = None,
+    ) -> Tuple[str, List[LineResult]]:
+        """Run OCR on a preprocessed OpenCV BGR (or grayscale) numpy array.
+
+        ``escalate_regions`` ((x1, y1, x2, y2) boxes) force accurate decoding
+        of lines centred inside them in ``adaptive`` decode mode.
+        """
+        if self.inference_mode == "memory":
+            extract = partial(
+                self._extract_in_memory, escalate_regions=escalate_regions, cancel=cancel, select_lines=select_lines,
+            )
+            return self._to_line_results(*self._timed(extract, img_bgr))
+        if cancel is not None:
+            cancel.check("ocr")
+        rgb = img_bgr[:, :, ::-1] if len(img_bgr.shape) == 3 else np.stack([img_bgr] * 3, axis=-1)
+        return self.extract_from_pil(Image.fromarray(rgb))
+
+    def extract_batch(
+        self,
+        images: List[np.ndarray],
+        escalate_regions: Optional[List[Optional[List[Tuple[int, int, int, int]]]]] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> List[Tuple[str, List[LineResult]]]:
+        """Run OCR on several BGR arrays, pooling their lines into shared batches.
+
+        Detection runs per image; the line crops of all images are then
+        recognised together, so a stack of sparse pages fills recognizer
+        batches a single page would not. Returns ``(full_text, line_results)``
+        per image, in input order, with each image's lines in reading order.
+        ``escalate_regions`` optionally gives per-image regions, as for
+        ``extract_from_numpy``.
+
+        Without batching (file mode or ``recognizer_batch_size`` 1) images are
+        processed one after another.
+        """
+        regions = escalate_regions if escalate_regions is not None else [None] * len(images)
+        if len(regions) != len(images):
+            raise ValueError(f"escalate_regions has {len(regions)} entries for {len(images)} images")
+        if self.inference_mode != "memory" or self.recognizer_batch_size <= 1:
+            return [self.extract_from_numpy(img, r, cancel) for img, r in zip(images, regions)]
 
+        start = time.time()
+        pages, crops, force = [], [], {}
+        for page, img in enumerate(images):
+            if cancel is not None:
+                cancel.check("ocr")
+            boxes = self._detect(img, cancel)
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+            page_crops, page_force = self._line_crops(gray, boxes, regions[page], page)
+            pages.append(boxes)
+            crops.extend(page_crops)
+            force.update(page_force)
+        decoded = self._recognize_crops(crops, force, cancel)
+
+        outputs = []
+        for page, boxes in enumerate(pages):
+            results = self._line_dicts(boxes, decoded, page)
+            outputs.append((_join_lines(results), self._line_results(results)))
+        logger.info(
+            f"Kiri-OCR extracted {len(crops)} lines from {len(images)} images "
+            f"in {(time.time() - start) * 1000:.0f}ms (pooled batches)"
+        )
+        return outputs
+
+    # ------------------------------------------------------------------
+    # Inference paths
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _timed(fn, img) -> Tuple[Tuple[str, List[Dict]], float]:
+        start = time.time()
+        out = fn(img)
+        return out, (time.time() - start) * 1000
+
+    def _to_line_results(
+        self, out: Tuple[str, List[Dict]], elapsed_ms: float
+    ) -> Tuple[str, List[LineResult]]:
+        full_text, results = out
+        line_results = self._line_results(results)
+        logger.info(
+            f"Kiri-OCR extracted {len(line_results)} lines in {elapsed_ms:.0f}ms "
+            f"({self.inference_mode} mode, {self.decode_mode} decoding, "
+            f"{sum(l.escalated for l in line_results)} escalated)"
+        )
+        return full_text, line_results
+
+    @staticmethod
+    def _line_results(results: List[Dict]) -> List[LineResult]:
+        return [
+            LineResult(
+                text=r.get("text", ""),
+                confidence=r.get("confidence", 0.0),
+                bbox=r.get("box", []),
+                line_number=r.get("line_number", 0),
+                escalated=r.get("escalated", False),
+            )
+            for r in results
+        ]
+
+    def _extract_via_file(self, img: Image.Image) -> Tuple[str, List[Dict]]:
+        """Legacy path: JPEG round trip through a temporary file."""
         with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp:
             img.save(tmp, format="JPEG", quality=95)
             tmp_path = tmp.name
-
         try:
-            full_text, results = self._ocr.extract_text(tmp_path)
+            return self._ocr.extract_text(tmp_path)
         finally:
             os.unlink(tmp_path)
 
-        elapsed_ms = (time.time() - start) * 1000
+    def _extract_in_memory(
+        self,
+        img_bgr: np.ndarray,
+        escalate_regions: Optional[List[Tuple[int, int, int, int]]] = None,
+        cancel: Optional[CancelToken] = None,
+        select_lines: Optional[Callable[[List[Tuple[int, int, int, int]]], Sequence[int]]] = None,
+    ) -> Tuple[str, List[Dict]]:
+        """Detect and recognise directly on the in-memory array.
 
-        # Convert result dicts to LineResult objects
-        line_results = []
-        for r in results:
-            line_results.append(LineResult(
-                text=r.get("text", ""),
-                confidence=r.get("confidence", 0.0),
-                bbox=r.get("box", []),
-                line_number=r.get("line_number", 0),
-            ))
+        Mirrors ``OCR.process_document`` + ``OCR.extract_text`` from
+        kiri-ocr 0.2.15 without the file decode: the detector reads the BGR
+        buffer and the recognizer crops from a single grayscale conversion.
+        """
+        boxes = self._detect(img_bgr, cancel)
+        keep = set(select_lines([box for box, _ in boxes])) if select_lines is not None else None
+        gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY) if img_bgr.ndim == 3 else img_bgr
+        results = self._recognize(gray, boxes, escalate_regions, cancel, keep)
+        return _join_lines(results), results
 
-        logger.info(f"Kiri-OCR extracted {len(line_results)} lines in {elapsed_ms:.0f}ms")
-        return full_text, line_results
+    def _detect(
+        self, img_bgr: np.ndarray, cancel: Optional[CancelToken] = None
+    ) -> List[Tuple[Tuple[int, int, int, int], float]]:
+        """Run text-line detection, returning ``[((x, y, w, h), det_conf), ...]``."""
+        self._tune_detector()
+        detector = self._ocr.detector
+        db = getattr(detector, "db_detector", None)
+        if db is None:
+            text_boxes = detector.detect_lines_objects(img_bgr)
+        else:
+            # DBDetector.detect_text() copies its input; call the stages
+            # directly so the preprocessed buffer is read in place.
+            if self.detection_tile and max(img_bgr.shape[:2]) > self.detection_tile:
+                polys, scores = self._detect_tiled(db, img_bgr, cancel)
+            else:
+                polys, scores = db.detect(img_bgr, return_scores=True)
+            detected = db._sort_boxes_reading_order(list(zip(db._apply_smart_padding(polys), scores)))
+            text_boxes = detector._process_boxes_objects(detected, merge=False, skip_sort=True)
+        return [(tb.bbox, tb.confidence) for tb in text_boxes]
+
+    def _detect_tiled(self, db, img_bgr: np.ndarray, cancel: Optional[CancelToken] = None):
+        """DB detection over overlapping tiles, merged back into page polygons."""
+        start = time.perf_counter()
+        h, w = img_bgr.shape[:2]
+        tiles = plan_tiles(w, h, self.detection_tile, self.detection_tile_overlap)
+
+        def detect_tile(tile):
+            if cancel is not None:
+                cancel.check("ocr")
+            x1, y1, x2, y2 = tile
+            polys, scores = db.detect(img_bgr[y1:y2, x1:x2], return_scores=True)
+            # int32 like the detector's own polygons: OpenCV 4.x rejects
+            # int64 points in kiri's boundingRect/minAreaRect calls
+            return [((np.asarray(p) + (x1, y1)).astype(np.int32), s) for p, s in zip(polys, scores)]
+
+        # ONNX Runtime releases the GIL, so tiles run in parallel on one session
+        detections = list(self._get_tile_pool().map(detect_tile, tiles))
+        polys, scores = merge_tile_boxes(tiles, detections)
+        logger.info(
+            "Detected %d boxes (%d before seam merge) in %d tiles of a %dx%d page in %.0fms",
+            len(polys), sum(len(d) for d in detections), len(tiles), w, h, (time.perf_counter() - start) * 1000,
+        )
+        return polys, scores
+
+    def _get_tile_pool(self) -> ThreadPoolExecutor:
+        # Per process, like the orchestrator's stage pool: threads do not
+        # survive a fork into OrchestratorProcessPool workers
+        with self._tile_pool_lock:
+            if self._tile_pool is None or self._tile_pool_pid != os.getpid():
+                self._tile_pool = ThreadPoolExecutor(
+                    max_workers=self.detection_tile_threads, thread_name_prefix="ocr-tile"
+                )
+                self._tile_pool_pid = os.getpid()
+            return self._tile_pool
+
+    def _recognize(
+        self,
+        gray: np.ndarray,
+        boxes: List[Tuple[Tuple[int, int, int, int], float]],
+        escalate_regions: Optional[List[Tuple[int, int, int, int]]] = None,
+        cancel: Optional[CancelToken] = None,
+        keep: Optional[Set[int]] = None,
+    ) -> List[Dict]:
+        """Recognise ``boxes`` (only the indices in ``keep`` when given)."""
+        import torch
+
+        if self.recognizer_batch_size > 1:
+            return self._recognize_batched(gray, boxes, escalate_regions, cancel, keep)
+        two_tier = self.decode_mode != "accurate" and self._has_ctc_head()
+        results: List[Dict] = []
+        with torch.inference_mode():
+            for i, (box, det_conf) in enumerate(boxes, 1):
+                if keep is not None and i - 1 not in keep:
+                    continue
+                if cancel is not None:
+                    cancel.check("ocr")
+                tensor = self._ocr._preprocess_region(gray, box, extra_padding=5)
+                if tensor is None:
+                    continue
+                escalated = False
+                try:
+                    if two_tier:
+                        force = self.decode_mode == "adaptive" and _centre_in(box, escalate_regions)
+                        text, confidence, escalated = self._decode_two_tier(tensor, force)
+                    else:
+                        text, confidence = self._ocr.recognize_region(tensor)
+                except Exception as e:
+                    logger.debug(f"Recognition failed for line {i}: {e}")
+                    continue
+                results.append({
+                    "box": [int(v) for v in box],
+                    "text": text,
+                    "confidence": float(confidence),
+                    "det_confidence": float(det_conf),
+                    "line_number": i,
+                    "escalated": escalated,
+                })
+        return results
+
+    def _recognize_batched(
+        self,
+        gray: np.ndarray,
+        boxes: List[Tuple[Tuple[int, int, int, int], float]],
+        escalate_regions: Optional[List[Tuple[int, int, int, int]]] = None,
+        cancel: Optional[CancelToken] = None,
+        keep: Optional[Set[int]] = None,
+    ) -> List[Dict]:
+        crops, force = self._line_crops(gray, boxes, escalate_regions, keep=keep)
+        return self._line_dicts(boxes, self._recognize_crops(crops, force, cancel))
+
+    def _line_crops(
+        self,
+        gray: np.ndarray,
+        boxes: List[Tuple[Tuple[int, int, int, int], float]],
+        escalate_regions: Optional[List[Tuple[int, int, int, int]]] = None,
+        page: int = 0,
+        keep: Optional[Set[int]] = None,
+    ) -> Tuple[List[LineCrop], Dict[Tuple[int, int], bool]]:
+        """Unpadded crops keyed ``(page, line_number)``, plus forced escalations."""
+        cfg = self._ocr.cfg
+        crops, force = [], {}
+        for i, (box, _) in enumerate(boxes, 1):
+            if keep is not None and i - 1 not in keep:
+                continue
+            pixels = crop_line(gray, box, cfg.IMG_H, cfg.IMG_W)
+            if pixels is not None:
+                crops.append(LineCrop(key=(page, i), pixels=pixels))
+                force[(page, i)] = self.decode_mode == "adaptive" and _centre_in(box, escalate_regions)
+        return crops, force
+
+    @staticmethod
+    def _line_dicts(
+        boxes: List[Tuple[Tuple[int, int, int, int], float]],
+        decoded: Dict[Tuple[int, int], Tuple[str, float, bool]],
+        page: int = 0,
+    ) -> List[Dict]:
+        """Line result dicts for one page's boxes, in detection order."""
+        results: List[Dict] = []
+        for i, (box, det_conf) in enumerate(boxes, 1):
+            if (page, i) not in decoded:
+                continue
+            text, confidence, escalated = decoded[(page, i)]
+            results.append({
+                "box": [int(v) for v in box],
+                "text": text,
+                "confidence": float(confidence),
+                "det_confidence": float(det_conf),
+                "line_number": i,
+                "escalated": escalated,
+            })
+        return results
+
+    def _recognize_crops(
+        self, crops: List[LineCrop], force: Dict, cancel: Optional[CancelToken] = None
+    ) -> Dict[object, Tuple[str, float, bool]]:
+        """Recognise crops in width-bucketed batches: ``{key: (text, conf, escalated)}``.
+
+        Crops whose batch fails are left out, like failed lines in the
+        per-line path.
+        """
+        import torch
+
+        page = BatchStats()
+        start = time.perf_counter()
+        decoded: Dict[object, Tuple[str, float, bool]] = {}
+        ocr = self._ocr
+        with torch.inference_mode():
+            for batch in plan_batches(crops, self.width_buckets, self.recognizer_batch_size):
+                if cancel is not None:
+                    cancel.check("ocr")
+                try:
+                    mem = ocr.model.encode(to_tensor(batch, page).to(ocr.device))
+                    ctc_logits = ocr.model.ctc_head(mem) if self._has_ctc_head() else None
+                    for row, crop in enumerate(batch.crops):
+                        decoded[crop.key] = self._decode_encoded(
+                            mem[row:row + 1],
+                            None if ctc_logits is None else ctc_logits[row:row + 1],
+                            force.get(crop.key, False),
+                        )
+                except Exception as e:
+                    logger.debug(f"Recognition failed for batch of {len(batch.crops)} lines: {e}")
+        page.seconds = time.perf_counter() - start
+        with self._stats_lock:
+            self._batch_stats.merge(page)
+        logger.info(
+            "Recognised %d lines in %d batches (%.0f%% padding, %.1f lines/s)",
+            page.lines, page.batches, page.padding_waste * 100, page.lines_per_s,
+        )
+        return decoded
+
+    def _has_ctc_head(self) -> bool:
+        return bool(getattr(self._ocr.cfg, "USE_CTC", False)) and hasattr(self._ocr.model, "ctc_head")
+
+    def _decode_two_tier(self, tensor, force: bool) -> Tuple[str, float, bool]:
+        """CTC decode, escalating to the attention decoder when needed.
+
+        The encoder runs once; escalation only adds the decoder pass, and
+        gives the same result ``recognize_region`` would in accurate mode.
+        """
+        ocr = self._ocr
+        mem = ocr.model.encode(tensor.to(ocr.device))
+        return self._decode_encoded(mem, ocr.model.ctc_head(mem), force)
+
+    def _decode_encoded(self, mem, ctc_logits, force: bool) -> Tuple[str, float, bool]:
+        """Decode one line from its encoder output per ``decode_mode``."""
+        from kiri_ocr.model import beam_decode_one_batched, compute_ctc_confidence
+
+        ocr = self._ocr
+        escalated = False
+        if self.decode_mode != "accurate" and ctc_logits is not None:
+            confidence, text, _ = compute_ctc_confidence(ctc_logits, ocr.tokenizer)
+            if self.decode_mode == "fast" or (not force and confidence >= self.escalate_confidence):
+                return text, confidence, False
+            escalated = True
+        text, confidence = beam_decode_one_batched(
+            ocr.model, ocr.model.mem_proj(mem), ocr.tokenizer, self._greedy_cfg(), ctc_logits_1=ctc_logits,
+        )
+        return text, confidence, escalated
+
+    def _greedy_cfg(self):
+        """Copy of the model config with BEAM=1 (kiri's "accurate" decoder).
+
+        kiri toggles ``cfg.BEAM`` in place around each call, which races
+        between threads; a private copy avoids that.
+        """
+        cfg = getattr(self, "_greedy_cfg_cache", None)
+        if cfg is None:
+            cfg = copy.copy(self._ocr.cfg)
+            cfg.BEAM = 1
+            self._greedy_cfg_cache = cfg
+        return cfg
+
+
+def _centre_in(box: Tuple[int, int, int, int], regions: Optional[List[Tuple[int, int, int, int]]]) -> bool:
+    """Whether the centre of an (x, y, w, h) box lies in any (x1, y1, x2, y2) region."""
+    if not regions:
+        return False
+    cx, cy = box[0] + box[2] / 2.0, box[1] + box[3] / 2.0
+    return any(x1 <= cx <= x2 and y1 <= cy <= y2 for x1, y1, x2, y2 in regions)
 
-    def extract_from_numpy(self, img_bgr: np.ndarray) -> Tuple[str, List[LineResult]]:
-        """Run OCR on a preprocessed OpenCV BGR numpy array."""
-        from PIL import Image as _PILImage
-        rgb = img_bgr[:, :, ::-1] if len(img_bgr.shape) == 3 else np.stack([img_bgr] * 3, axis=-1)
-        pil_img = _PILImage.fromarray(rgb)
-        return self.extract_from_pil(pil_img)
 
+def _join_lines(results: List[Dict]) -> str:
+    """Group line results into text lines the same way ``OCR.extract_text`` does."""
+    lines: List[str] = []
+    current: List[str] = []
+    prev_cy: Optional[float] = None
+    prev_h = 0
+    for res in results:
+        y, h = res["box"][1], res["box"][3]
+        cy = y + h / 2
+        if prev_cy is not None and abs(cy - prev_cy) < max(h, prev_h) * 0.8:
+            current.append(res["text"])
+        else:
+            if current:
+                lines.append(" ".join(current))
+            current = [res["text"]]
+        prev_cy, prev_h = cy, h
+    if current:
+        lines.append(" ".join(current))
+    return "\n".join(lines)
@@ -2,146 +2,375 @@
 
 Flow:
     1. Preprocess image (denoise, CLAHE, sharpen, deskew, resize)
-    2. Analyze layout (detect regions, table lines)
-    3. Run full-image Kiri-OCR
+    2. Analyze layout (detect regions, table lines)   } run concurrently,
+    3. Run full-image Kiri-OCR                         } joined before step 4
     4. Assign OCR lines to layout regions by bbox overlap
     5. Cluster table-region lines into rows
     6. Attempt structured table medication parsing
     7. Fall back to line-wise heuristic parsing if table extraction fails
     8. Parse header/footer metadata from region-assigned lines
     9. Format output
+
+When a NearDuplicateIndex is attached, step 3 onwards is skipped for images
+whose perceptual hash matches a recent submission; the earlier extraction is
+reused.
 """
+import copy
 import logging
+import os
+import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple
-
-from app.pipeline.layout import BBox, LayoutResult, TableRowReconstructor, analyze_layout
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.pipeline.dedup import DuplicateMatch, NearDuplicateIndex, perceptual_hash
+from app.pipeline.layout import (
+    REGION_ORDER,
+    BBox,
+    LayoutResult,
+    TableRowReconstructor,
+    analyze_layout,
+    assign_region,
+    estimate_regions,
+)
 from app.pipeline.ocr_engine import KiriOCREngine, LineResult
 from app.pipeline.preprocessor import PreprocessResult, preprocess
+from app.pipeline.pyramid import HASH_SIDE
+from app.pipeline.roi import RegionSelector
 from app.pipeline.text_parser import (
     ParsedPrescription,
+    parse_patient_header,
     parse_prescription,
     parse_table_medications,
     _fill_default_time_slots,
 )
+from app.runtime.cancellation import CancelToken, ExtractionCancelled
 
 logger = logging.getLogger(__name__)
 
 
+class StageTimer:
+    """Records wall-clock milliseconds spent in consecutive pipeline stages."""
+
+    def __init__(self):
+        self.timings_ms: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.timings_ms[stage] = round((now - self._last) * 1000, 2)
+        self._last = now
+
+    def timed(self, stage: str, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` and record its own duration (for stages run concurrently)."""
+        t0 = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            self.timings_ms[stage] = round((time.perf_counter() - t0) * 1000, 2)
+
+    def restart(self) -> None:
+        """Start the next lap from now."""
+        self._last = time.perf_counter()
+
+
+@dataclass
+class ExtractionJob:
+    """Per-request state handed from one pipeline stage to the next."""
+    image_bytes: bytes
+    filename: str = ""
+    start: float = field(default_factory=time.time)
+    timer: StageTimer = field(default_factory=StageTimer)
+    prep: Optional[PreprocessResult] = None
+    phash: Optional[np.ndarray] = None
+    layout: Optional[LayoutResult] = None
+    full_text: str = ""
+    line_results: List[LineResult] = field(default_factory=list)
+    result: Optional[Dict[str, Any]] = None  # Set once the job is finished
+    on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+    cancel: Optional[CancelToken] = None
+    roi: Optional[Dict[str, Any]] = None  # RegionSelector report (ROI mode)
+    corners: Optional[np.ndarray] = None  # Client page corners, original pixels
+
+    def emit(self, stage: str, **data: Any) -> None:
+        """Report a finished stage to ``on_event`` (progress streaming)."""
+        if self.on_event is None:
+            return
+        event = {
+            "stage": stage,
+            "elapsed_ms": round((time.time() - self.start) * 1000, 1),
+            "stage_timings_ms": dict(self.timer.timings_ms),
+            **data,
+        }
+        try:
+            self.on_event(event)
+        except Exception:
+            logger.exception("Progress listener failed")
+
+
 class PipelineOrchestrator:
     """Full OCR extraction pipeline using Kiri-OCR."""
 
-    def __init__(self, engine: KiriOCREngine, max_dimension: int = 3000):
+    def __init__(
+        self,
+        engine: KiriOCREngine,
+        max_dimension: int = 3000,
+        near_duplicates: Optional[NearDuplicateIndex] = None,
+        preprocess_profile: str = "full",
+        max_image_dimension: Optional[int] = None,
+        stage_threads: int = 2,
+        roi_regions: Optional[Sequence[str]] = None,
+        roi_budget: int = 0,
+        rectify: bool = False,
+    ):
         self.engine = engine
+        # ROI mode: recognise only lines in these layout regions (+ budget)
+        self.roi_regions = tuple(roi_regions) if roi_regions else None
+        self.roi_budget = roi_budget
         self.max_dimension = max_dimension
-
-    def extract(self, image_bytes: bytes, filename: str = "") -> Dict[str, Any]:
+        self.max_image_dimension = max_image_dimension
+        self.preprocess_profile = preprocess_profile
+        self.rectify = rectify
+        self.near_duplicates = near_duplicates
+        self.stage_threads = stage_threads
+        self._stage_pool: Optional[ThreadPoolExecutor] = None
+        self._stage_pool_pid: Optional[int] = None
+        self._stage_pool_lock = threading.Lock()
+
+    def _run_concurrently(self, stages: Dict[str, Callable[[], Any]], timer: StageTimer) -> Dict[str, Any]:
+        """Run independent stages in parallel and join; each stage is timed.
+
+        The first stage runs on the calling thread, the rest on the stage pool.
+        OpenCV and ONNX Runtime release the GIL, so these genuinely overlap.
+        """
+        names = list(stages)
+        if self.stage_threads <= 0 or len(names) == 1:
+            results = {name: timer.timed(name, stages[name]) for name in names}
+        else:
+            pool = self._get_stage_pool()
+            futures = {name: pool.submit(timer.timed, name, stages[name]) for name in names[1:]}
+            results = {names[0]: timer.timed(names[0], stages[names[0]])}
+            for name, future in futures.items():
+                results[name] = future.result()
+        timer.restart()
+        return results
+
+    def _get_stage_pool(self) -> ThreadPoolExecutor:
+        # Created lazily and per process: threads do not survive a fork into
+        # OrchestratorProcessPool workers
+        with self._stage_pool_lock:
+            if self._stage_pool is None or self._stage_pool_pid != os.getpid():
+                self._stage_pool = ThreadPoolExecutor(
+                    max_workers=self.stage_threads, thread_name_prefix="ocr-stage"
+                )
+                self._stage_pool_pid = os.getpid()
+            return self._stage_pool
+
+    STAGES = ("preprocess", "ocr", "parse")
+
+    def extract(
+        self,
+        image_bytes: bytes,
+        filename: str = "",
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+        cancel: Optional[CancelToken] = None,
+        corners: Optional[np.ndarray] = None,
+    ) -> Dict[str, Any]:
         """Run the full extraction pipeline.
 
         Returns a dict with: success, data (parsed prescription + metadata),
-        processing_time_ms, and pipeline_metadata.
+        processing_time_ms, and pipeline_metadata. ``on_event`` is called on
+        the worker thread as each stage finishes (preprocess, layout, ocr,
+        table, parse) with the stage timings so far and, where available,
+        partial results. ``cancel`` is checked before each stage and between
+        recognizer batches; a cancelled extraction raises
+        ``ExtractionCancelled``. ``corners`` (validated page corners from the
+        client) are warped to before preprocessing.
         """
-        start = time.time()
-
+        job = ExtractionJob(image_bytes, filename, on_event=on_event, cancel=cancel, corners=corners)
+        for stage in self.STAGES:
+            self.run_stage(stage, job)
+            if job.result is not None:
+                break
+        return job.result
+
+    def run_stage(self, stage: str, job: ExtractionJob) -> None:
+        """Advance ``job`` through one of ``STAGES``.
+
+        Sets ``job.result`` when the job is finished — after the last stage,
+        on a near-duplicate hit or on failure. Time spent between stages (e.g.
+        in a StagePipeline hand-off queue) is not attributed to any stage.
+        """
+        job.timer.restart()
         try:
-            # Layer 1: Preprocess
-            prep = preprocess(image_bytes, max_dimension=self.max_dimension)
-            logger.info("Preprocessing complete: %s", prep.quality.preprocessing_applied)
-
-            # Layer 2: Layout analysis
-            layout = analyze_layout(prep.gray)
-
-            # Layer 3: OCR on preprocessed image
-            full_text, line_results = self.engine.extract_from_numpy(prep.color)
-            logger.info("OCR complete: %d lines extracted", len(line_results))
-
-            # Layer 4: Region assignment + table extraction
-            section_lines = self._assign_to_regions(line_results, layout)
-            table_lines = section_lines.get("table", [])
-
-            # Layer 5: Table-aware medication parsing
-            table_meds = self._extract_table_medications(table_lines, layout)
-
-            # Layer 6: Full prescription parsing (metadata + medications)
-            parsed = parse_prescription(full_text, line_results)
-
-            # Prefer table-extracted medications when a table region was detected
-            # Table extraction is more reliable since it uses structural layout
-            # (row clustering + content-based cell classification)
-            if table_meds:
-                parsed.medications = table_meds
-                logger.info("Using table-extracted medications: %d items", len(table_meds))
-
-            processing_time_ms = (time.time() - start) * 1000
-
-            return {
-                "success": True,
-                "parsed": parsed,
-                "full_text": full_text,
-                "line_results": line_results,
-                "processing_time_ms": processing_time_ms,
-                "pipeline_metadata": {
-                    "preprocessing_applied": prep.quality.preprocessing_applied,
-                    "quality_report": {
-                        "is_blurry": prep.quality.is_blurry,
-                        "blur_score": prep.quality.blur_score,
-                        "is_dark": prep.quality.is_dark,
-                        "is_bright": prep.quality.is_bright,
-                        "mean_brightness": prep.quality.mean_brightness,
-                        "skew_angle": prep.quality.skew_angle,
-                    },
-                    "layout": {
-                        "has_table_lines": layout.has_table_lines,
-                        "image_size": layout.image_size,
-                    },
-                    "section_line_counts": {k: len(v) for k, v in section_lines.items()},
-                    "table_meds_used": table_meds is not None and len(table_meds) > 0,
-                },
-            }
+            if job.cancel is not None:
+                job.cancel.check(stage)
+            getattr(self, "_stage_" + stage)(job)
+        except ExtractionCancelled as exc:
+            exc.elapsed_ms = (time.time() - job.start) * 1000
+            logger.info("%s after %.0fms", exc, exc.elapsed_ms)
+            raise
         except Exception as exc:
-            processing_time_ms = (time.time() - start) * 1000
             logger.exception("Pipeline extraction failed")
-            return {
+            job.result = {
                 "success": False,
                 "message": str(exc),
-                "processing_time_ms": processing_time_ms,
+                "processing_time_ms": (time.time() - job.start) * 1000,
             }
 
+    def _stage_preprocess(self, job: ExtractionJob) -> None:
+        timer = job.timer
+
+        # Layer 1: Preprocess
+        prep = job.prep = preprocess(
+            job.image_bytes, max_dimension=self.max_dimension,
+            profile=self.preprocess_profile, max_image_dimension=self.max_image_dimension,
+            rectify=self.rectify, corners=job.corners,
+        )
+        logger.info("Preprocessing complete: %s", prep.quality.preprocessing_applied)
+        timer.lap("preprocess")
+        job.emit(
+            "preprocess",
+            processed_size=list(prep.quality.processed_size),
+            preprocessing_applied=prep.quality.preprocessing_applied,
+        )
+
+        if self.near_duplicates is not None:
+            job.phash = perceptual_hash(prep.pyramid.level(HASH_SIDE))
+            match = self.near_duplicates.lookup(job.phash, prep.quality.processed_size)
+            timer.lap("dedup")
+            if match is not None:
+                job.result = self._reuse_duplicate(match, prep, job.start, timer)
+                job.emit("dedup", near_duplicate=True)
+
+    def _stage_ocr(self, job: ExtractionJob) -> None:
+        prep = job.prep
+
+        # Layers 2 + 3: OCR on the preprocessed image, layout analysis alongside.
+        # Layout isn't ready yet, so the table region to decode accurately
+        # (adaptive decoding) comes from the proportional estimate.
+        # The regions are proportional, so ROI line selection can use the same
+        # estimate to pick lines before layout analysis finishes.
+        h, w = prep.gray.shape[:2]
+        regions = estimate_regions(w, h)
+        selector = RegionSelector(regions, self.roi_regions, self.roi_budget) if self.roi_regions else None
+
+        def ocr():
+            out = self.engine.extract_from_numpy(
+                prep.color, escalate_regions=[regions.table_region], cancel=job.cancel, select_lines=selector,
+            )
+            if selector is not None:
+                selector.finished()
+            return out
+
+        stages = self._run_concurrently({
+            "ocr": ocr,
+            "layout": lambda: analyze_layout(prep.gray, prep.pyramid),
+        }, job.timer)
+        job.full_text, job.line_results = stages["ocr"]
+        job.layout = stages["layout"]
+        logger.info("OCR complete: %d lines extracted", len(job.line_results))
+        if selector is not None:
+            job.roi = selector.report()
+            logger.info(
+                "ROI recognition: %d of %d lines skipped (%.0f%%), ~%.0fms saved",
+                job.roi["skipped"], job.roi["detected"], job.roi["skipped_share"] * 100, job.roi["saved_ms_est"],
+            )
+        job.emit("layout", has_table_lines=job.layout.has_table_lines)
+        if job.on_event is not None:  # the partial parse is only worth it for a listener
+            job.emit(
+                "ocr",
+                lines=len(job.line_results),
+                partial={"patient": parse_patient_header(job.full_text, job.line_results)},
+                **({"roi": job.roi} if job.roi is not None else {}),
+            )
+
+    def _stage_parse(self, job: ExtractionJob) -> None:
+        timer, prep, layout = job.timer, job.prep, job.layout
+        full_text, line_results = job.full_text, job.line_results
+
+        # Layer 4: Region assignment + table extraction
+        section_lines = self._assign_to_regions(line_results, layout)
+        table_lines = section_lines.get("table", [])
+
+        # Layer 5: Table-aware medication parsing
+        table_meds = self._extract_table_medications(table_lines, layout)
+        timer.lap("table")
+        job.emit("table", table_medications=len(table_meds or []))
+
+        # Layer 6: Full prescription parsing (metadata + medications)
+        parsed = parse_prescription(full_text, line_results)
+        timer.lap("parse")
+
+        # Prefer table-extracted medications when a table region was detected
+        # Table extraction is more reliable since it uses structural layout
+        # (row clustering + content-based cell classification)
+        if table_meds:
+            parsed.medications = table_meds
+            logger.info("Using table-extracted medications: %d items", len(table_meds))
+
+        processing_time_ms = (time.time() - job.start) * 1000
+
+        result = {
+            "success": True,
+            "parsed": parsed,
+            "full_text": full_text,
+            "line_results": line_results,
+            "processing_time_ms": processing_time_ms,
+            "pipeline_metadata": {
+                "preprocessing_applied": prep.quality.preprocessing_applied,
+                "stage_timings_ms": timer.timings_ms,
+                "quality_report": {
+                    "is_blurry": prep.quality.is_blurry,
+                    "blur_score": prep.quality.blur_score,
+                    "is_dark": prep.quality.is_dark,
+                    "is_bright": prep.quality.is_bright,
+                    "mean_brightness": prep.quality.mean_brightness,
+                    "skew_angle": prep.quality.skew_angle,
+                },
+                "layout": {
+                    "has_table_lines": layout.has_table_lines,
+                    "image_size": layout.image_size,
+                },
+                "section_line_counts": {k: len(v) for k, v in section_lines.items()},
+                "table_meds_used": table_meds is not None and len(table_meds) > 0,
+                "decoding": {
+                    "mode": getattr(self.engine, "decode_mode", "accurate"),
+                    "lines": len(line_results),
+                    "escalated": sum(getattr(l, "escalated", False) for l in line_results),
+                },
+            },
+        }
+        if job.roi is not None:
+            result["pipeline_metadata"]["roi"] = job.roi
+        if job.phash is not None:
+            self.near_duplicates.add(job.phash, prep.quality.processed_size, result)
+        job.result = result
+        job.emit("parse", medications=len(parsed.medications))
+
+    def _reuse_duplicate(
+        self, match: DuplicateMatch, prep: PreprocessResult, start: float, timer: StageTimer
+    ) -> Dict[str, Any]:
+        """Return a copy of an earlier extraction for a near-duplicate image."""
+        result = copy.deepcopy(match.payload)
+        meta = result["pipeline_metadata"]
+        meta["preprocessing_applied"] = prep.quality.preprocessing_applied
+        meta["stage_timings_ms"] = timer.timings_ms
+        meta["near_duplicate"] = {"reused": True, "distance": match.distance}
+        result["processing_time_ms"] = (time.time() - start) * 1000
+        logger.info("Reusing near-duplicate extraction (hamming distance %d)", match.distance)
+        return result
+
     def _assign_to_regions(
         self, lines: List[LineResult], layout: LayoutResult
     ) -> Dict[str, List[LineResult]]:
         """Assign OCR lines to layout regions based on bbox vertical overlap."""
-        sections: Dict[str, List[LineResult]] = {
-            "header": [], "patient": [], "clinical": [],
-            "table": [], "footer": [], "unassigned": [],
-        }
-
-        region_map = [
-            ("header", layout.header_region),
-            ("patient", layout.patient_region),
-            ("clinical", layout.clinical_region),
-            ("table", layout.table_region),
-            ("footer", layout.footer_region),
-        ]
-
+        sections: Dict[str, List[LineResult]] = {name: [] for name in (*REGION_ORDER, "unassigned")}
         for line in lines:
-            if not line.bbox or len(line.bbox) < 4:
-                sections["unassigned"].append(line)
-                continue
-
-            line_cy = line.bbox[1] + line.bbox[3] / 2.0
-            assigned = False
-            for region_name, region_bbox in region_map:
-                if region_bbox is None:
-                    continue
-                _, ry1, _, ry2 = region_bbox
-                if ry1 <= line_cy <= ry2:
-                    sections[region_name].append(line)
-                    assigned = True
-                    break
-            if not assigned:
-                sections["unassigned"].append(line)
-
+            sections[assign_region(line.bbox, layout)].append(line)
         return sections
 
     # Footer patterns — lines that are NOT medication data
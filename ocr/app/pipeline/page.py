@@ -0,0 +1,156 @@
+"""Page boundary detection, perspective rectification and content cropping.
+
+Phone photos of prescriptions include tabletop, hands and wide margins that
+every later step (denoise, CLAHE, detection, recognition) would otherwise
+pay for. Right after decoding:
+
+- ``detect_page_quad`` finds the sheet on a coarse pyramid level as the
+  largest convex four-corner contour of the edge map, accepted only when
+  its sides actually run along edges (a text block's hull does not);
+- ``warp_page`` maps that quad (or corners supplied by the client's camera
+  overlay) onto an upright rectangle sized from the quad's edges;
+- ``content_bbox`` finds the ink bounding box so blank margins are cropped.
+"""
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from app.pipeline.pyramid import CROP_SIDE, PAGE_SIDE, ImagePyramid
+
+logger = logging.getLogger(__name__)
+
+MIN_PAGE_AREA = 0.2  # Smallest quad accepted as the page, as a share of the frame
+FULL_FRAME_AREA = 0.95  # Quads covering more of the frame are not worth warping
+MIN_EDGE_SUPPORT = 0.6  # Share of the quad outline that must lie on detected edges
+CROP_MARGIN = 0.02  # Margin kept around the content, as a share of the long side
+MIN_CROP_GAIN = 0.05  # Skip content crops that would remove less area than this
+
+
+def order_corners(points: Sequence[Sequence[float]]) -> np.ndarray:
+    """Four points as float32 ``[top-left, top-right, bottom-right, bottom-left]``."""
+    pts = np.asarray(points, dtype=np.float32).reshape(4, 2)
+    s = pts.sum(axis=1)
+    d = pts[:, 1] - pts[:, 0]
+    return np.array([pts[np.argmin(s)], pts[np.argmin(d)], pts[np.argmax(s)], pts[np.argmax(d)]], dtype=np.float32)
+
+
+def validate_corners(corners: Sequence[Sequence[float]], width: int, height: int) -> np.ndarray:
+    """Client corners (pixels, or fractions 0-1 of the image) as ordered pixel corners.
+
+    Raises ValueError when they are not four points inside the image that
+    enclose a reasonable convex area.
+    """
+    pts = np.asarray(corners, dtype=np.float32)
+    if pts.shape != (4, 2) or not np.isfinite(pts).all():
+        raise ValueError("corners must be four [x, y] points")
+    if (pts <= 1.0).all():
+        pts = pts * np.array([width, height], dtype=np.float32)
+    if (pts < 0).any() or (pts[:, 0] > width).any() or (pts[:, 1] > height).any():
+        raise ValueError(f"corners must lie inside the {width}x{height} image")
+    quad = order_corners(pts)
+    if not cv2.isContourConvex(quad.reshape(-1, 1, 2)) or cv2.contourArea(quad) < 0.05 * width * height:
+        raise ValueError("corners must enclose a convex area covering at least 5% of the image")
+    return quad
+
+
+def detect_page_quad(gray: np.ndarray, pyramid: Optional[ImagePyramid] = None) -> Optional[np.ndarray]:
+    """Ordered page corners in ``gray`` pixels, or ``None`` when no sheet stands out."""
+    small = (pyramid or ImagePyramid(gray)).level(PAGE_SIDE)
+    scale = gray.shape[1] / small.shape[1]
+    edges = cv2.Canny(cv2.GaussianBlur(small, (5, 5), 0), 50, 150)
+    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    frame = small.shape[0] * small.shape[1]
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+        hull = cv2.convexHull(contour)
+        area = cv2.contourArea(hull)
+        if area < MIN_PAGE_AREA * frame:
+            break
+        approx = cv2.approxPolyDP(hull, 0.02 * cv2.arcLength(hull, True), True)
+        if len(approx) != 4 or not cv2.isContourConvex(approx):
+            continue
+        if area > FULL_FRAME_AREA * frame:
+            return None
+        quad = order_corners(approx.reshape(4, 2))
+        if _edge_support(edges, quad) < MIN_EDGE_SUPPORT:
+            continue
+        return quad * scale
+    return None
+
+
+def _edge_support(edges: np.ndarray, quad: np.ndarray, samples: int = 50) -> float:
+    """Share of points sampled along the quad outline that fall on an edge."""
+    h, w = edges.shape[:2]
+    hits = total = 0
+    for a, b in zip(quad, np.roll(quad, -1, axis=0)):
+        for t in np.linspace(0.0, 1.0, samples, endpoint=False):
+            x, y = (a + (b - a) * t).round().astype(int)
+            total += 1
+            hits += bool(edges[min(max(y, 0), h - 1), min(max(x, 0), w - 1)])
+    return hits / total
+
+
+def warp_page(img: np.ndarray, quad: np.ndarray) -> np.ndarray:
+    """Perspective-correct the ``quad`` region of ``img`` to an upright rectangle."""
+    tl, tr, br, bl = quad
+    width = int(round(max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl))))
+    height = int(round(max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr))))
+    dst = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(quad.astype(np.float32), dst)
+    return cv2.warpPerspective(img, matrix, (width, height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+
+
+def content_bbox(gray: np.ndarray, pyramid: Optional[ImagePyramid] = None) -> Optional[Tuple[int, int, int, int]]:
+    """``(x1, y1, x2, y2)`` around the ink plus a margin, or ``None`` if cropping is not worth it."""
+    small = (pyramid or ImagePyramid(gray)).level(CROP_SIDE)
+    scale = gray.shape[1] / small.shape[1]
+    ink = cv2.adaptiveThreshold(small, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 25, 15)
+    ink = cv2.morphologyEx(ink, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))  # drop specks
+    # Page borders and shadows left by the warp are not content
+    band = max(2, int(0.01 * min(small.shape[:2])))
+    ink[:band], ink[-band:], ink[:, :band], ink[:, -band:] = 0, 0, 0, 0
+    rows = np.nonzero((ink > 0).sum(axis=1) >= 3)[0]
+    cols = np.nonzero((ink > 0).sum(axis=0) >= 3)[0]
+    if len(rows) == 0 or len(cols) == 0:
+        return None
+
+    h, w = gray.shape[:2]
+    margin = CROP_MARGIN * max(h, w)
+    x1 = max(0, int(cols[0] * scale - margin))
+    y1 = max(0, int(rows[0] * scale - margin))
+    x2 = min(w, int((cols[-1] + 1) * scale + margin))
+    y2 = min(h, int((rows[-1] + 1) * scale + margin))
+    if (x2 - x1) * (y2 - y1) > (1 - MIN_CROP_GAIN) * w * h:
+        return None
+    return x1, y1, x2, y2
+
+
+def rectify_page(
+    color: np.ndarray, corners: Optional[np.ndarray] = None, detect: bool = True, crop: bool = True
+) -> Tuple[np.ndarray, List[str]]:
+    """Warp to the page (given ``corners`` or a detected quad) and crop to content.
+
+    Returns the new image and the steps applied, for ``preprocessing_applied``.
+    """
+    applied: List[str] = []
+    gray = cv2.cvtColor(color, cv2.COLOR_BGR2GRAY) if color.ndim == 3 else color
+    pyramid = ImagePyramid(gray)
+    quad, source = corners, "client"
+    if quad is None and detect:
+        quad, source = detect_page_quad(gray, pyramid), "detected"
+    if quad is not None:
+        color = warp_page(color, quad)
+        gray = cv2.cvtColor(color, cv2.COLOR_BGR2GRAY) if color.ndim == 3 else color
+        pyramid = ImagePyramid(gray)
+        applied.append(f"page_warp({source})")
+    if crop:
+        bbox = content_bbox(gray, pyramid)
+        if bbox is not None:
+            x1, y1, x2, y2 = bbox
+            color = np.ascontiguousarray(color[y1:y2, x1:x2])
+            applied.append(f"content_crop({x2 - x1}x{y2 - y1})")
+    if applied:
+        logger.info("Page rectification: %s, now %dx%d", applied, color.shape[1], color.shape[0])
+    return color, applied
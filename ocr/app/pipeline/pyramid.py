@@ -0,0 +1,43 @@
+"""Grayscale image pyramid shared by the analysis steps of one request.
+
+Page detection, quality metrics, skew estimation, table-line detection and
+perceptual hashing only need a coarse view of the page. Each step asks for
+the level that suits it; levels are built once with ``cv2.pyrDown`` (each
+from the previous one) and reused by every later caller.
+"""
+from typing import List
+
+import cv2
+import numpy as np
+
+# Long-side budgets for each consumer. Blur and table-line thresholds were
+# tuned on ~1280px phone photos, so those stay close to that scale.
+QUALITY_SIDE = 1600
+TABLE_SIDE = 1600
+SKEW_SIDE = 1024
+BRIGHTNESS_SIDE = 256
+HASH_SIDE = 256
+PAGE_SIDE = 512
+CROP_SIDE = 1024
+
+_MIN_SIDE = 32
+
+
+class ImagePyramid:
+    """Lazily built Gaussian pyramid; level 0 is the image it was given."""
+
+    def __init__(self, gray: np.ndarray):
+        self.levels: List[np.ndarray] = [gray]
+
+    @property
+    def base(self) -> np.ndarray:
+        return self.levels[0]
+
+    def level(self, max_side: int) -> np.ndarray:
+        """Return the largest level whose long side is at most ``max_side``."""
+        while max(self.levels[-1].shape[:2]) > max_side and min(self.levels[-1].shape[:2]) >= 2 * _MIN_SIDE:
+            self.levels.append(cv2.pyrDown(self.levels[-1]))
+        for lvl in self.levels:
+            if max(lvl.shape[:2]) <= max_side:
+                return lvl
+        return self.levels[-1]
@@ -635,6 +635,22 @@ def _fill_default_time_slots(med: ParsedMedication) -> None:
         med.afternoon_dose = 1.0
 
 
+def _line_texts(full_text: str, line_results: List[Any]) -> List[str]:
+    lines = [getattr(line, "text", "").strip() for line in line_results if getattr(line, "text", "").strip()]
+    if not lines and full_text:
+        lines = [part.strip() for part in full_text.splitlines() if part.strip()]
+    return lines
+
+
+def parse_patient_header(full_text: str, line_results: List[Any]) -> dict:
+    """Patient fields only (id, name, name_khmer, age, gender).
+
+    Cheap enough to report as a partial result before the medications are
+    parsed; ``parse_prescription`` extracts the same values.
+    """
+    return _extract_patient_info(_line_texts(full_text, line_results))
+
+
 def parse_prescription(full_text: str, line_results: List[Any]) -> ParsedPrescription:
     """Parse OCR output into a structured prescription object.
 
@@ -642,9 +658,7 @@ def parse_prescription(full_text: str, line_results: List[Any]) -> ParsedPrescri
     it extracts metadata from header/footer lines and medication rows from
     OCR line items without assuming a single fixed layout.
     """
-    lines = [getattr(line, "text", "").strip() for line in line_results if getattr(line, "text", "").strip()]
-    if not lines and full_text:
-        lines = [part.strip() for part in full_text.splitlines() if part.strip()]
+    lines = _line_texts(full_text, line_results)
 
     patient = _extract_patient_info(lines)
     diagnoses = _extract_diagnoses(lines)
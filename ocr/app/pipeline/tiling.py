@@ -0,0 +1,114 @@
+"""Overlapping tiles for text detection on large pages.
+
+kiri's DB detector shrinks its input so the longest side is at most 960px,
+so on a high-resolution scan small print is detected from a heavily
+downscaled probability map. Tiling instead runs the detector on
+overlapping tiles at native resolution (each tile is one bounded ONNX
+input) and merges the boxes back into page coordinates.
+
+A text line crossing a seam comes back as pieces from both tiles, and a line
+inside an overlap band is found twice. Boxes from neighbouring tiles that
+meet inside their shared band and overlap vertically by at least half the
+smaller height are treated as the same line and replaced by their union.
+Boxes from the same tile are never merged: the detector already separated
+them.
+"""
+import math
+from itertools import combinations
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Rect = Tuple[int, int, int, int]  # x1, y1, x2, y2
+Detection = Tuple[np.ndarray, float]  # (4, 2) polygon, score
+
+
+def plan_tiles(width: int, height: int, tile: int, overlap: int) -> List[Rect]:
+    """Tiles of at most ``tile`` px covering the page, neighbours sharing >= ``overlap`` px.
+
+    Tiles are spread evenly so edge tiles are full-size instead of slivers.
+    """
+    if overlap >= tile:
+        raise ValueError(f"Tile overlap ({overlap}) must be smaller than the tile ({tile})")
+
+    def starts(length: int) -> List[int]:
+        if length <= tile:
+            return [0]
+        n = math.ceil((length - overlap) / (tile - overlap))
+        return [round(i * (length - tile) / (n - 1)) for i in range(n)]
+
+    return [
+        (x, y, min(x + tile, width), min(y + tile, height))
+        for y in starts(height)
+        for x in starts(width)
+    ]
+
+
+def merge_tile_boxes(
+    tiles: Sequence[Rect], detections: Sequence[Sequence[Detection]], min_overlap: float = 0.5
+) -> Tuple[List[np.ndarray], List[float]]:
+    """Merge per-tile detections (already in page coordinates) across seams.
+
+    Returns ``(polygons, scores)`` like ``DBDetector.detect``, as int32
+    points. Unmerged boxes keep their (possibly rotated) polygon; merged ones
+    become the axis-aligned union with the best score.
+    """
+    polys = [np.asarray(poly, dtype=np.int32) for tile_dets in detections for poly, _ in tile_dets]
+    scores = [float(score) for tile_dets in detections for _, score in tile_dets]
+    rects = [_bounds(poly) for poly in polys]
+    by_tile, i = [], 0
+    for tile_dets in detections:
+        by_tile.append(range(i, i + len(tile_dets)))
+        i += len(tile_dets)
+
+    parent = list(range(len(polys)))
+
+    def find(k: int) -> int:
+        while parent[k] != k:
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    for a, b in combinations(range(len(tiles)), 2):
+        band = _intersection(tiles[a], tiles[b])
+        if band is None:
+            continue
+        near_a = [k for k in by_tile[a] if _intersection(rects[k], band)]
+        near_b = [k for k in by_tile[b] if _intersection(rects[k], band)]
+        for ka in near_a:
+            for kb in near_b:
+                if _same_line(rects[ka], rects[kb], min_overlap):
+                    parent[find(ka)] = find(kb)
+
+    groups = {}
+    for k in range(len(polys)):
+        groups.setdefault(find(k), []).append(k)
+    out_polys, out_scores = [], []
+    for members in groups.values():
+        if len(members) == 1:
+            out_polys.append(polys[members[0]])
+        else:
+            x1 = min(rects[k][0] for k in members)
+            y1 = min(rects[k][1] for k in members)
+            x2 = max(rects[k][2] for k in members)
+            y2 = max(rects[k][3] for k in members)
+            out_polys.append(np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.int32))
+        out_scores.append(max(scores[k] for k in members))
+    return out_polys, out_scores
+
+
+def _bounds(poly: np.ndarray) -> Rect:
+    pts = np.asarray(poly).reshape(-1, 2)
+    return int(pts[:, 0].min()), int(pts[:, 1].min()), int(pts[:, 0].max()), int(pts[:, 1].max())
+
+
+def _intersection(a: Rect, b: Rect) -> Optional[Rect]:
+    x1, y1, x2, y2 = max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3])
+    return (x1, y1, x2, y2) if x1 < x2 and y1 < y2 else None
+
+
+def _same_line(a: Rect, b: Rect, min_overlap: float) -> bool:
+    if min(a[2], b[2]) <= max(a[0], b[0]):
+        return False
+    overlap_y = min(a[3], b[3]) - max(a[1], b[1])
+    return overlap_y >= min_overlap * min(a[3] - a[1], b[3] - b[1])
@@ -0,0 +1 @@
+"""Runtime module for OCR request execution."""
@@ -0,0 +1,69 @@
+"""Cooperative cancellation of in-flight extractions.
+
+A ``CancelToken`` is handed down the pipeline with a request. Long-running
+code calls ``check(stage)`` at safe points — between pipeline stages and
+between recognizer batches — and gets ``ExtractionCancelled`` once the
+request's deadline has passed or ``cancel()`` was called (client went away).
+Nothing is interrupted mid-stage; the worker just stops at the next check.
+
+Deadlines are ``time.monotonic()`` values, which forked workers share with
+the parent on Linux, so ``OrchestratorProcessPool`` can pass them across.
+"""
+import threading
+import time
+from typing import Optional
+
+DEADLINE, DISCONNECTED = "deadline", "disconnected"
+
+
+class ExtractionCancelled(Exception):
+    """Raised by ``CancelToken.check``; ``stage`` is where work stopped."""
+
+    def __init__(self, reason: str, stage: str):
+        super().__init__(reason, stage)
+        self.reason = reason
+        self.stage = stage
+        self.elapsed_ms = 0.0  # Pipeline time spent before the check, set by the orchestrator
+
+    def __str__(self) -> str:
+        return f"Extraction cancelled ({self.reason}) at {self.stage}"
+
+
+class CancelToken:
+    """Deadline and/or explicit cancellation flag shared across threads."""
+
+    def __init__(self, deadline: Optional[float] = None):
+        self.deadline = deadline
+        self._cancelled = threading.Event()
+        self._reason: Optional[str] = None
+
+    @classmethod
+    def after(cls, seconds: Optional[float]) -> "CancelToken":
+        """Token expiring ``seconds`` from now (no deadline when falsy)."""
+        return cls(time.monotonic() + seconds if seconds else None)
+
+    def cancel(self, reason: str = DISCONNECTED) -> None:
+        if not self._cancelled.is_set():
+            self._reason = reason
+            self._cancelled.set()
+
+    @property
+    def reason(self) -> Optional[str]:
+        """Why work should stop, or ``None`` while it may continue."""
+        if self._cancelled.is_set():
+            return self._reason
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return DEADLINE
+        return None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.reason is not None
+
+    def remaining_s(self) -> Optional[float]:
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    def check(self, stage: str) -> None:
+        reason = self.reason
+        if reason is not None:
+            raise ExtractionCancelled(reason, stage)
@@ -0,0 +1,226 @@
+"""Bounded worker executor that keeps pipeline work off the asyncio loop.
+
+Preprocessing, layout analysis and model inference are CPU-bound; OpenCV,
+ONNX Runtime and torch release the GIL, so a small thread pool is enough to
+keep uvicorn's event loop responsive. Admission is bounded: once
+``max_workers + max_queue`` jobs are pending, new work is rejected
+immediately with a Retry-After hint instead of piling up.
+
+Waiting jobs are scheduled shortest-job-first. Callers pass a cost (the
+request's header-probed megapixels); service time per unit of cost is
+learned from completed jobs. Ageing keeps large jobs from starving: every
+millisecond a job waits counts ``ageing`` ms off its estimate. With
+``max_wait_ms`` set, a job whose projected queue wait exceeds it is shed
+at once rather than queued.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from app.runtime.metrics import QUEUE_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("sjf", "fifo")
+
+
+class QueueFullError(Exception):
+    """Raised when the executor cannot admit more work."""
+
+    def __init__(self, retry_after_s: int, queue_depth: int, projected_wait_ms: Optional[float] = None):
+        super().__init__(f"OCR queue full ({queue_depth} waiting)")
+        self.retry_after_s = retry_after_s
+        self.queue_depth = queue_depth
+        self.projected_wait_ms = projected_wait_ms
+
+
+@dataclass(order=True)
+class _Job:
+    # Fixed at submission: est_ms + ageing * submitted_ms orders jobs exactly
+    # as est_ms - ageing * waited_ms would at any later instant
+    key: float
+    seq: int
+    est_ms: float = field(compare=False)
+    cost: Optional[float] = field(compare=False)
+    submitted: float = field(compare=False)
+    fn: Callable[..., Any] = field(compare=False)
+    args: tuple = field(compare=False)
+    kwargs: dict = field(compare=False)
+    future: Future = field(compare=False, default_factory=Future)
+    started: float = field(compare=False, default=0.0)
+
+
+class BoundedExecutor:
+    """Thread pool with a bounded, cost-ordered admission queue and wait-time accounting."""
+
+    # Smoothing factor for the moving averages of wait and service time
+    _EWMA_ALPHA = 0.2
+
+    def __init__(
+        self,
+        max_workers: int = 1,
+        max_queue: int = 8,
+        policy: str = "sjf",
+        ageing: float = 1.0,
+        max_wait_ms: float = 0.0,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown scheduling policy: {policy}")
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.policy = policy
+        self.ageing = ageing
+        self.max_wait_ms = max_wait_ms
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ocr-worker")
+        self._lock = threading.Lock()
+        self._queue: List[_Job] = []
+        self._seq = itertools.count()
+        self._in_service: Dict[int, _Job] = {}
+        self._pending = 0      # queued + running
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._shed = 0
+        self._avg_wait_ms = 0.0
+        self._avg_service_ms = 0.0
+        self._last_wait_ms = 0.0
+        self._ms_per_cost = 0.0
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    async def run(self, fn: Callable[..., Any], *args: Any, cost: Optional[float] = None, **kwargs: Any) -> Any:
+        """Run ``fn`` on a worker thread, raising QueueFullError when saturated.
+
+        ``cost`` (megapixels for OCR requests) orders the queue under the
+        ``sjf`` policy; jobs without one are estimated at the average
+        service time.
+        """
+        job = self._admit(fn, args, kwargs, cost)
+        # One pool task per job; each runs whichever job is first in line
+        self._pool.submit(self._run_next)
+        return await asyncio.wrap_future(job.future)
+
+    def _admit(self, fn: Callable[..., Any], args: tuple, kwargs: dict, cost: Optional[float]) -> _Job:
+        now = time.perf_counter()
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                queued = self._pending - self._running
+                raise QueueFullError(self._retry_after_locked(), queued)
+            est_ms = self._estimate_ms_locked(cost)
+            key = now * 1000 if self.policy == "fifo" else est_ms + self.ageing * now * 1000
+            job = _Job(key, next(self._seq), est_ms, cost, now, fn, args, kwargs)
+            if self.max_wait_ms > 0:
+                projected = self._projected_wait_ms_locked(job, now)
+                if projected > self.max_wait_ms:
+                    self._rejected += 1
+                    self._shed += 1
+                    raise QueueFullError(
+                        max(1, math.ceil((projected - self.max_wait_ms) / 1000)),
+                        self._pending - self._running,
+                        projected_wait_ms=projected,
+                    )
+            heapq.heappush(self._queue, job)
+            self._pending += 1
+        return job
+
+    def _estimate_ms_locked(self, cost: Optional[float]) -> float:
+        if cost and self._ms_per_cost:
+            return cost * self._ms_per_cost
+        return self._avg_service_ms
+
+    def _projected_wait_ms_locked(self, job: _Job, now: float) -> float:
+        """Work ahead of ``job`` (queued before it plus what is left of running jobs), per worker."""
+        if self._running < self.max_workers and not self._queue:
+            return 0.0
+        ahead = sum(j.est_ms for j in self._queue if j < job)
+        remaining = sum(
+            max(0.0, j.est_ms - (now - j.started) * 1000) for j in self._in_service.values()
+        )
+        return (ahead + remaining) / self.max_workers
+
+    def _run_next(self) -> None:
+        with self._lock:
+            job = heapq.heappop(self._queue)
+        if not job.future.set_running_or_notify_cancel():
+            # Caller gave up while queued
+            with self._lock:
+                self._pending -= 1
+            return
+        try:
+            job.future.set_result(self._invoke(job))
+        except BaseException as exc:
+            job.future.set_exception(exc)
+
+    def _invoke(self, job: _Job) -> Any:
+        started = time.perf_counter()
+        wait_ms = (started - job.submitted) * 1000
+        with self._lock:
+            self._running += 1
+            self._last_wait_ms = wait_ms
+            self._avg_wait_ms = self._ewma(self._avg_wait_ms, wait_ms)
+            job.started = started
+            self._in_service[job.seq] = job
+        QUEUE_WAIT_SECONDS.observe(wait_ms / 1000)
+        try:
+            return job.fn(*job.args, **job.kwargs)
+        finally:
+            service_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._in_service.pop(job.seq, None)
+                self._running -= 1
+                self._pending -= 1
+                self._completed += 1
+                self._avg_service_ms = self._ewma(self._avg_service_ms, service_ms)
+                if job.cost:
+                    self._ms_per_cost = self._ewma(self._ms_per_cost, service_ms / job.cost)
+
+    def _ewma(self, current: float, sample: float) -> float:
+        if current == 0.0:
+            return sample
+        return (1 - self._EWMA_ALPHA) * current + self._EWMA_ALPHA * sample
+
+    def _retry_after_locked(self) -> int:
+        """Estimate seconds until a slot frees up (at least 1)."""
+        queued = self._pending - self._running
+        waves = (queued + self.max_workers) / self.max_workers
+        return max(1, math.ceil(waves * self._avg_service_ms / 1000))
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    @property
+    def saturated(self) -> bool:
+        with self._lock:
+            return self._pending >= self.max_workers + self.max_queue
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._running,
+                "queue_depth": self._pending - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._avg_wait_ms, 1),
+                "last_wait_ms": round(self._last_wait_ms, 1),
+                "avg_service_ms": round(self._avg_service_ms, 1),
+                "policy": self.policy,
+                "ms_per_megapixel": round(self._ms_per_cost, 1),
+                "shed": self._shed,
+                "saturated": self._pending >= self.max_workers + self.max_queue,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
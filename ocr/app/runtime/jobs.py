@@ -0,0 +1,280 @@
+"""Asynchronous extraction jobs backed by a local SQLite store.
+
+``POST /api/v1/jobs`` stores the upload and returns immediately; a
+``JobRunner`` on the event loop claims queued jobs oldest first, runs them
+through the same path as ``/extract`` and records the outcome. Jobs left
+``running`` by a crash or restart are re-queued on start-up, so accepted
+work is not lost. When a job carries a callback URL, its final status
+document is POSTed there (retried with backoff).
+
+Uploads are kept only until their job finishes; finished jobs are purged
+after ``retention_s``. Start-up re-queues every running job and re-sends
+callbacks that were never delivered, so give each service process its own
+store. Store calls run on worker threads: SQLite waits on locks and moves
+upload BLOBs, which must not stall the event loop.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import urllib.request
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    callback_url TEXT,
+    image BLOB,
+    result TEXT,
+    error TEXT,
+    callback_status TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+# (status code, payload): payload is the extraction response on 200, else error details
+JobOutcome = Tuple[int, Dict[str, Any]]
+
+
+class JobStore:
+    """SQLite table of jobs, shared by the routes and the runner."""
+
+    def __init__(self, path: str, retention_s: float = 7 * 86400):
+        self.path = path
+        self.retention_s = retention_s
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def create(self, image_bytes: bytes, filename: str, callback_url: Optional[str] = None) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, filename, callback_url, image, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, filename, callback_url, image_bytes, now),
+            )
+            self._db.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (SUCCEEDED, FAILED, now - self.retention_s),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Public status document of a job, or ``None`` if unknown."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, status, filename, callback_url, result, error, callback_status, "
+                "created_at, started_at, finished_at FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "filename": row["filename"],
+            "callback_url": row["callback_url"],
+            "callback_status": row["callback_status"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": json.loads(row["error"]) if row["error"] else None,
+        }
+
+    def claim_next(self) -> Optional[Tuple[str, str, bytes]]:
+        """Mark the oldest queued job running: ``(id, filename, image)`` or ``None``."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT id, filename, image FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                    (QUEUED,),
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?", (RUNNING, time.time(), row["id"]),
+                    )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return (row["id"], row["filename"], bytes(row["image"])) if row is not None else None
+
+    def finish(self, job_id: str, status_code: int, payload: Dict[str, Any]) -> None:
+        ok = status_code == 200
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, image = NULL, finished_at = ? WHERE id = ?",
+                (
+                    SUCCEEDED if ok else FAILED,
+                    json.dumps(payload, ensure_ascii=False) if ok else None,
+                    None if ok else json.dumps({"status_code": status_code, **payload}, ensure_ascii=False),
+                    time.time(),
+                    job_id,
+                ),
+            )
+
+    def set_callback_status(self, job_id: str, status: str) -> None:
+        with self._lock:
+            self._db.execute("UPDATE jobs SET callback_status = ? WHERE id = ?", (status, job_id))
+
+    def pending_callbacks(self) -> List[str]:
+        """Finished jobs whose callback was never attempted to completion."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) AND callback_url IS NOT NULL "
+                "AND callback_status IS NULL ORDER BY finished_at",
+                (SUCCEEDED, FAILED),
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def requeue_interrupted(self) -> int:
+        """Put jobs left ``running`` by a previous process back in the queue."""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?", (QUEUED, RUNNING),
+            )
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)}
+        counts.update({status: n for status, n in rows})
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class JobRunner:
+    """Runs queued jobs on the event loop, ``concurrency`` at a time.
+
+    ``process(image_bytes, filename)`` returns a ``JobOutcome``; it is the
+    same code path as the synchronous route, so jobs share its executor,
+    result cache and metrics.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        process: Callable[[bytes, str], Awaitable[JobOutcome]],
+        concurrency: int = 1,
+        poll_s: float = 1.0,
+        callback_timeout_s: float = 10.0,
+        callback_retries: int = 3,
+    ):
+        self.store = store
+        self.process = process
+        self.concurrency = max(1, concurrency)
+        self.poll_s = poll_s
+        self.callback_timeout_s = callback_timeout_s
+        self.callback_retries = callback_retries
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._running: set = set()
+        self._redeliveries: set = set()
+
+    def start(self) -> None:
+        requeued = self.store.requeue_interrupted()
+        if requeued:
+            logger.info("Re-queued %d interrupted jobs", requeued)
+        pending = self.store.pending_callbacks()
+        if pending:
+            logger.info("Re-sending %d undelivered job callbacks", len(pending))
+        for job_id in pending:
+            task = asyncio.create_task(self._callback(job_id))
+            self._redeliveries.add(task)
+            task.add_done_callback(self._redeliveries.discard)
+        self._task = asyncio.create_task(self._loop())
+
+    def notify(self) -> None:
+        """Wake the runner after a job was submitted."""
+        self._wake.set()
+
+    async def stop(self) -> None:
+        """Stop claiming jobs; running ones are cancelled and re-queued on next start."""
+        tasks = [t for t in (self._task, *self._running, *self._redeliveries) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _loop(self) -> None:
+        slots = asyncio.Semaphore(self.concurrency)
+        while True:
+            await slots.acquire()
+            claimed = await asyncio.to_thread(self.store.claim_next)
+            if claimed is None:
+                slots.release()
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_s)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            task = asyncio.create_task(self._run(*claimed))
+            self._running.add(task)
+
+            def done(t: asyncio.Task) -> None:
+                self._running.discard(t)
+                slots.release()
+
+            task.add_done_callback(done)
+
+    async def _run(self, job_id: str, filename: str, image_bytes: bytes) -> None:
+        try:
+            status_code, payload = await self.process(image_bytes, filename)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.exception("Job %s failed", job_id)
+            status_code, payload = 500, {"success": False, "error": "extraction_failed", "message": str(exc)}
+        await asyncio.to_thread(self.store.finish, job_id, status_code, payload)
+        logger.info("Job %s finished with status %d", job_id, status_code)
+        await self._callback(job_id)
+
+    async def _callback(self, job_id: str) -> None:
+        """POST the job's status document to its callback URL, if any.
+
+        ``callback_status`` stays NULL until delivery succeeds or gives up,
+        so callbacks interrupted by a crash are re-sent by ``start()``.
+        """
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None or not job["callback_url"]:
+            return
+        delivered = await self._deliver(job)
+        await asyncio.to_thread(self.store.set_callback_status, job_id, "delivered" if delivered else "failed")
+
+    async def _deliver(self, job: Dict[str, Any]) -> bool:
+        body = json.dumps(job, ensure_ascii=False).encode()
+        for attempt in range(self.callback_retries + 1):
+            if attempt:
+                await asyncio.sleep(min(30, 2 ** attempt))
+            try:
+                await asyncio.to_thread(self._post, job["callback_url"], body)
+                return True
+            except Exception as exc:
+                logger.warning("Callback for job %s failed (attempt %d): %s", job["job_id"], attempt + 1, exc)
+        return False
+
+    def _post(self, url: str, body: bytes) -> None:
+        request = urllib.request.Request(url, data=body, method="POST", headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.callback_timeout_s) as response:
+            response.read()
@@ -0,0 +1,202 @@
+"""Minimal Prometheus-style metrics registry for the OCR service.
+
+Implements just enough of the text exposition format (counters, gauges,
+histograms with labels) to avoid pulling in prometheus_client. Metrics are
+module-level objects on a process-wide ``registry``; values that already
+live elsewhere (executor queue, caches) are sampled at scrape time through
+registered collectors.
+"""
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Latency buckets in seconds, tuned for 10 ms … 60 s OCR requests
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+MEGAPIXEL_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 12.0, 16.0, 24.0, 48.0)
+
+
+def _fmt_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_fmt_labels(self.label_names, k)} {_fmt_value(v)}" for k, v in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}  # bucket counts + [sum, count]
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            if idx < len(self.buckets):
+                series[idx] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return int(series[-1]) if series else 0
+
+    def _bucket_line(self, key: LabelValues, le: str, value: float) -> str:
+        labels = _fmt_labels(self.label_names, key, 'le="%s"' % le)
+        return f"{self.name}_bucket{labels} {_fmt_value(value)}"
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for key, series in items:
+            cumulative = 0.0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                lines.append(self._bucket_line(key, _fmt_value(bound), cumulative))
+            lines.append(self._bucket_line(key, "+Inf", series[-1]))
+            lines.append(f"{self.name}_sum{_fmt_labels(self.label_names, key)} {_fmt_value(series[-2])}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.label_names, key)} {_fmt_value(series[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and scrape-time collectors; renders the text format."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: Dict[str, Callable[[], None]] = {}
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help_text, labels, buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, name: str, fn: Callable[[], None]) -> None:
+        """Register a callback that refreshes gauges right before rendering."""
+        self._collectors[name] = fn
+
+    def unregister_collector(self, name: str) -> None:
+        self._collectors.pop(name, None)
+
+    def render(self) -> str:
+        for fn in list(self._collectors.values()):
+            fn()
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUESTS = registry.counter("ocr_requests_total", "Extraction requests by outcome.", ("outcome",))
+REQUEST_SECONDS = registry.histogram("ocr_request_duration_seconds", "End-to-end pipeline time per request.")
+STAGE_SECONDS = registry.histogram("ocr_stage_duration_seconds", "Pipeline stage latency.", ("stage",))
+QUEUE_WAIT_SECONDS = registry.histogram("ocr_queue_wait_seconds", "Time a job waited for a worker.")
+IMAGE_MEGAPIXELS = registry.histogram(
+    "ocr_image_megapixels", "Uploaded image size in megapixels.", buckets=MEGAPIXEL_BUCKETS,
+)
+UPLOAD_BYTES = registry.histogram(
+    "ocr_upload_bytes", "Uploaded file size in bytes.",
+    buckets=(64e3, 256e3, 512e3, 1e6, 2e6, 4e6, 8e6, 16e6),
+)
+EXTRACTION_PATH = registry.counter(
+    "ocr_extraction_path_total", "Medication extraction path used (table or line).", ("path",),
+)
+DECODED_LINES = registry.counter(
+    "ocr_decoded_lines_total", "Recognised lines by decoder tier (ctc or accurate).", ("tier",),
+)
+RECOGNIZER_BATCHING = registry.gauge(
+    "ocr_recognizer_batching",
+    "Batched recognition since start-up (lines, batches, padding_waste, lines_per_s).", ("stat",),
+)
+ROI_LINES = registry.counter(
+    "ocr_roi_lines_total", "Detected lines in ROI mode by decision (recognised or skipped).", ("decision",),
+)
+ROI_SAVED_SECONDS = registry.counter(
+    "ocr_roi_saved_seconds_total", "Estimated recognition time saved by skipping out-of-region lines.",
+)
+CANCELLED = registry.counter(
+    "ocr_cancelled_total", "Extractions abandoned mid-pipeline, by reason and stage reached.", ("reason", "stage"),
+)
+CANCELLED_SECONDS = registry.counter(
+    "ocr_cancelled_work_seconds_total", "Pipeline time spent on extractions that were then cancelled.", ("reason",),
+)
+IN_FLIGHT = registry.gauge("ocr_in_flight", "Jobs currently running on a worker.")
+QUEUE_DEPTH = registry.gauge("ocr_queue_depth", "Jobs waiting for a worker.")
+STAGE_QUEUE_DEPTH = registry.gauge(
+    "ocr_stage_queue_depth", "Jobs waiting in a pipeline stage's hand-off queue.", ("stage",),
+)
+STAGE_BUSY_WORKERS = registry.gauge("ocr_stage_busy_workers", "Pipeline stage workers currently busy.", ("stage",))
+CACHE_EVENTS = registry.gauge("ocr_result_cache_events", "Result cache counters.", ("event",))
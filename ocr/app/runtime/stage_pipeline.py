@@ -0,0 +1,107 @@
+"""Stage-pipelined execution of the OCR pipeline.
+
+Each orchestrator stage (preprocess → ocr → parse) gets its own worker pool,
+connected by bounded hand-off queues, so consecutive requests overlap: while
+request N is in the recognizer, request N+1 can be preprocessing and request
+N-1 parsing. A full queue blocks the stage in front of it, which propagates
+back-pressure to the BoundedExecutor admitting requests.
+
+``StagePipeline.extract`` has the same signature as
+``PipelineOrchestrator.extract``, so the HTTP layer dispatches to it
+unchanged. Per-stage queue depth and busy workers are exposed via
+``stage_stats()`` and the ``ocr_stage_queue_depth`` / ``ocr_stage_busy_workers``
+gauges to show which stage is the bottleneck.
+"""
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.pipeline.orchestrator import ExtractionJob
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class StagePipeline:
+    """Run orchestrator stages on per-stage threads joined by bounded queues."""
+
+    def __init__(self, orchestrator, workers: Optional[Dict[str, int]] = None, queue_size: int = 2):
+        self.orchestrator = orchestrator
+        self.engine = getattr(orchestrator, "engine", None)
+        self.near_duplicates = getattr(orchestrator, "near_duplicates", None)
+        self.stages: Tuple[str, ...] = tuple(orchestrator.STAGES)
+        workers = workers or {}
+        self.workers = {stage: max(1, workers.get(stage, 1)) for stage in self.stages}
+        self.queue_size = max(1, queue_size)
+        self._queues = {stage: queue.Queue(maxsize=self.queue_size) for stage in self.stages}
+        self._lock = threading.Lock()
+        self._busy = {stage: 0 for stage in self.stages}
+        self._processed = {stage: 0 for stage in self.stages}
+        self._threads: List[threading.Thread] = []
+        for stage in self.stages:
+            for i in range(self.workers[stage]):
+                thread = threading.Thread(
+                    target=self._work, args=(stage,), name=f"ocr-{stage}-{i}", daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    @property
+    def capacity(self) -> int:
+        """Jobs the pipeline holds at once (running plus queued)."""
+        return sum(self.workers.values()) + self.queue_size * len(self.stages)
+
+    def extract(
+        self, image_bytes: bytes, filename: str = "", on_event=None, cancel=None, corners=None
+    ) -> Dict[str, Any]:
+        """Submit a request to the first stage and block until it finishes."""
+        future: Future = Future()
+        job = ExtractionJob(image_bytes, filename, on_event=on_event, cancel=cancel, corners=corners)
+        self._queues[self.stages[0]].put((job, future))
+        return future.result()
+
+    def _work(self, stage: str) -> None:
+        inbox = self._queues[stage]
+        index = self.stages.index(stage)
+        outbox = self._queues[self.stages[index + 1]] if index + 1 < len(self.stages) else None
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                return
+            job, future = item
+            with self._lock:
+                self._busy[stage] += 1
+            try:
+                self.orchestrator.run_stage(stage, job)
+            except BaseException as exc:  # run_stage handles pipeline errors itself
+                future.set_exception(exc)
+                continue
+            finally:
+                with self._lock:
+                    self._busy[stage] -= 1
+                    self._processed[stage] += 1
+            if job.result is not None or outbox is None:
+                future.set_result(job.result)
+            else:
+                outbox.put((job, future))
+
+    def stage_stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                stage: {
+                    "workers": self.workers[stage],
+                    "busy": self._busy[stage],
+                    "queue_depth": self._queues[stage].qsize(),
+                    "queue_size": self.queue_size,
+                    "processed": self._processed[stage],
+                }
+                for stage in self.stages
+            }
+
+    def shutdown(self) -> None:
+        for stage in self.stages:
+            for _ in range(self.workers[stage]):
+                self._queues[stage].put(_STOP)
@@ -0,0 +1,96 @@
+"""Thread and session tuning for the inference runtimes.
+
+The DB detector runs on ONNX Runtime, the recognizer on torch and most of
+preprocessing/layout on OpenCV; each keeps its own thread pool sized to every
+core by default. With several concurrent requests (OCR_WORKERS, stage
+pipeline, process pool) those pools oversubscribe the CPU. ``RuntimeTuning``
+collects the knobs in one place; ``benchmarks/autotune_runtime.py`` sweeps
+them on the test images.
+"""
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+EXECUTION_MODES = ("sequential", "parallel")
+GRAPH_OPTIMIZATIONS = ("disable", "basic", "extended", "all")
+
+
+@dataclass
+class RuntimeTuning:
+    """ORT session options plus process-wide OpenCV/torch thread counts.
+
+    ORT thread counts of 0 and ``None`` for OpenCV/torch keep library defaults.
+    """
+    intra_op_threads: int = 0
+    inter_op_threads: int = 0
+    execution_mode: str = "sequential"
+    graph_optimization: str = "all"
+    enable_mem_arena: bool = True
+    enable_mem_pattern: bool = True
+    opencv_threads: Optional[int] = None
+    torch_threads: Optional[int] = None
+
+    def __post_init__(self):
+        if self.execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown ORT execution mode: {self.execution_mode}")
+        if self.graph_optimization not in GRAPH_OPTIMIZATIONS:
+            raise ValueError(f"Unknown ORT graph optimization level: {self.graph_optimization}")
+
+    @classmethod
+    def from_settings(cls, settings) -> "RuntimeTuning":
+        return cls(
+            intra_op_threads=settings.ORT_INTRA_OP_THREADS,
+            inter_op_threads=settings.ORT_INTER_OP_THREADS,
+            execution_mode=settings.ORT_EXECUTION_MODE,
+            graph_optimization=settings.ORT_GRAPH_OPTIMIZATION,
+            enable_mem_arena=settings.ORT_ENABLE_MEM_ARENA,
+            enable_mem_pattern=settings.ORT_ENABLE_MEM_PATTERN,
+            opencv_threads=settings.OPENCV_THREADS,
+            torch_threads=settings.TORCH_THREADS,
+        )
+
+    def session_options(self):
+        """Build ``onnxruntime.SessionOptions`` for the detector session."""
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = self.intra_op_threads
+        opts.inter_op_num_threads = self.inter_op_threads
+        opts.execution_mode = (
+            ort.ExecutionMode.ORT_PARALLEL if self.execution_mode == "parallel"
+            else ort.ExecutionMode.ORT_SEQUENTIAL
+        )
+        opts.graph_optimization_level = {
+            "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+            "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+            "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+            "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+        }[self.graph_optimization]
+        opts.enable_cpu_mem_arena = self.enable_mem_arena
+        opts.enable_mem_pattern = self.enable_mem_pattern
+        return opts
+
+    def apply_process_threads(self) -> None:
+        """Size OpenCV's and torch's process-wide thread pools."""
+        if self.opencv_threads is not None:
+            import cv2
+            cv2.setNumThreads(self.opencv_threads)
+        if self.torch_threads is not None:
+            try:
+                import torch
+                torch.set_num_threads(max(1, self.torch_threads))
+            except ImportError:
+                pass
+
+    def as_settings(self) -> Dict[str, Any]:
+        """Map back to the ``Settings`` field names (for printing a .env)."""
+        names = {
+            "intra_op_threads": "ORT_INTRA_OP_THREADS",
+            "inter_op_threads": "ORT_INTER_OP_THREADS",
+            "execution_mode": "ORT_EXECUTION_MODE",
+            "graph_optimization": "ORT_GRAPH_OPTIMIZATION",
+            "enable_mem_arena": "ORT_ENABLE_MEM_ARENA",
+            "enable_mem_pattern": "ORT_ENABLE_MEM_PATTERN",
+            "opencv_threads": "OPENCV_THREADS",
+            "torch_threads": "TORCH_THREADS",
+        }
+        return {names[k]: v for k, v in asdict(self).items()}
@@ -0,0 +1,93 @@
+"""Forked OCR worker pool that shares one loaded model copy-on-write.
+
+The parent process loads the Kiri recognizer weights once, freezes the GC
+heap and forks ``processes`` workers. Tensor storage is never written after
+loading, so the pages stay shared between all workers. ONNX Runtime sessions
+and OpenMP thread pools are not fork-safe, so each worker creates its own
+detector session (from the cached, page-shared ``detector.onnx``) and warms
+up in its initializer.
+
+``OrchestratorProcessPool.extract`` has the same signature as
+``PipelineOrchestrator.extract``, so the HTTP layer dispatches to it
+unchanged. Run a single uvicorn worker per node when pool mode is enabled.
+"""
+import gc
+import logging
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+from app.runtime.cancellation import CancelToken
+
+logger = logging.getLogger(__name__)
+
+# Set in the parent before forking; inherited copy-on-write by every worker.
+_orchestrator = None
+
+
+def _init_worker(threads_per_worker: int) -> None:
+    try:
+        import cv2
+        cv2.setNumThreads(threads_per_worker)
+    except ImportError:
+        pass
+    try:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+    except ImportError:
+        pass
+    engine = getattr(_orchestrator, "engine", None)
+    if engine is not None and hasattr(engine, "_warmup"):
+        engine._warmup()
+    logger.info("OCR worker %d ready (%d threads)", os.getpid(), threads_per_worker)
+
+
+def _extract(
+    image_bytes: bytes, filename: str, deadline: Optional[float] = None, corners=None
+) -> Dict[str, Any]:
+    cancel = CancelToken(deadline) if deadline is not None else None
+    return _orchestrator.extract(image_bytes, filename=filename, cancel=cancel, corners=corners)
+
+
+class OrchestratorProcessPool:
+    """Dispatch ``extract`` calls to forked workers holding a shared orchestrator."""
+
+    def __init__(self, orchestrator, processes: int, threads_per_worker: int = 1):
+        global _orchestrator
+        _orchestrator = orchestrator
+        self.engine = getattr(orchestrator, "engine", None)
+        self.processes = processes
+
+        # Move everything allocated so far out of the collector's reach so
+        # that GC passes in the workers do not dirty (and copy) shared pages.
+        gc.collect()
+        gc.freeze()
+
+        self._pool: Optional[ProcessPoolExecutor] = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=mp.get_context("fork"),
+            initializer=_init_worker,
+            initargs=(threads_per_worker,),
+        )
+        # With the fork start method every worker is spawned on the first
+        # submit; do it now, before request-handling threads exist.
+        self._pool.submit(os.getpid).result()
+        logger.info("Started %d OCR worker processes", processes)
+
+    def extract(
+        self, image_bytes: bytes, filename: str = "", on_event=None, cancel=None, corners=None
+    ) -> Dict[str, Any]:
+        # Stage events and disconnects cannot cross the process boundary:
+        # streaming clients get only the final result, and workers stop
+        # early on the deadline alone
+        if cancel is not None:
+            cancel.check("preprocess")
+        deadline = cancel.deadline if cancel is not None else None
+        return self._pool.submit(_extract, image_bytes, filename, deadline, corners).result()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        gc.unfreeze()
@@ -0,0 +1 @@
+"""Benchmarks for the Kiri-OCR service."""
@@ -0,0 +1,145 @@
+"""Sweep ORT session / OpenCV / torch thread options for the best throughput.
+
+Coordinate descent: starting from the current ``Settings``, each option is
+varied in turn over its candidate values (the others held at the best found
+so far) and the value with the highest images/s at ``--concurrency`` is kept.
+Prints the winning configuration as ``.env`` lines for ``ocr/app/config.py``.
+
+``--engine stub`` skips the ONNX Runtime options and tunes only the OpenCV
+pool used by preprocessing and layout.
+
+Usage (from ``ocr/``):
+    python -m benchmarks.autotune_runtime --concurrency 4 --json tune.json
+"""
+import argparse
+import json
+import os
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.config import settings
+from app.pipeline.orchestrator import PipelineOrchestrator
+from app.runtime.tuning import RuntimeTuning
+from benchmarks.bench_pipeline import measure_throughput
+from benchmarks.common import IMAGE_DIR, StubEngine, git_revision, host_info, load_inputs
+
+
+def candidate_values(cpus: int, concurrency: int, engine: str) -> Dict[str, List[Any]]:
+    per_request = max(1, cpus // concurrency)
+    threads = sorted({1, 2, per_request, cpus})
+    candidates: Dict[str, List[Any]] = {"opencv_threads": [None, 0] + threads}
+    if engine == "kiri":
+        candidates.update({
+            "intra_op_threads": [0] + threads,
+            "inter_op_threads": [0, 1],
+            "execution_mode": ["sequential", "parallel"],
+            "graph_optimization": ["extended", "all"],
+            "enable_mem_arena": [True, False],
+            "enable_mem_pattern": [True, False],
+            "torch_threads": [None] + threads,
+        })
+    return candidates
+
+
+def _build(engine_name: str, tuning: RuntimeTuning) -> Tuple[Any, PipelineOrchestrator]:
+    if engine_name == "stub":
+        tuning.apply_process_threads()
+        engine = StubEngine()
+    else:
+        from app.pipeline.ocr_engine import KiriOCREngine
+        engine = KiriOCREngine(tuning=tuning)
+    return engine, PipelineOrchestrator(
+        engine, max_dimension=settings.PREPROCESS_MAX_DIMENSION, preprocess_profile=settings.PREPROCESS_PROFILE,
+    )
+
+
+def _default_thread_counts() -> Callable[[], None]:
+    """Capture OpenCV's and torch's pool sizes; the returned callable restores them.
+
+    ``apply_process_threads`` leaves a pool alone when its option is ``None``,
+    so without this a ``None`` trial would inherit the previous trial's size.
+    """
+    import cv2
+    opencv_threads = cv2.getNumThreads()
+    try:
+        import torch
+        torch_threads = torch.get_num_threads()
+    except ImportError:
+        torch = None
+
+    def restore() -> None:
+        cv2.setNumThreads(opencv_threads)
+        if torch is not None:
+            torch.set_num_threads(torch_threads)
+
+    return restore
+
+
+def sweep(engine_name: str, inputs, repeat: int, concurrency: int) -> Dict[str, Any]:
+    restore_threads = _default_thread_counts()
+    best = RuntimeTuning.from_settings(settings)
+    engine, orchestrator = _build(engine_name, best)
+    trials: List[Dict[str, Any]] = []
+
+    def score(tuning: RuntimeTuning) -> float:
+        restore_threads()
+        if engine_name == "stub":
+            tuning.apply_process_threads()
+        else:
+            engine.apply_tuning(tuning)
+        row = measure_throughput(orchestrator, inputs, repeat, concurrency)
+        trials.append({"tuning": tuning.as_settings(), "images_per_s": row["images_per_s"],
+                       "p95_ms": row["latency_ms"]["p95"]})
+        print(f"  {row['images_per_s']:7.2f} img/s  p95={row['latency_ms']['p95']:9.1f}ms  {tuning}")
+        return row["images_per_s"]
+
+    best_score = score(best)
+    for option, values in candidate_values(os.cpu_count() or 1, concurrency, engine_name).items():
+        print(f"Sweeping {option}: {values}")
+        for value in values:
+            if getattr(best, option) == value:
+                continue
+            candidate = replace(best, **{option: value})
+            result = score(candidate)
+            if result > best_score:
+                best, best_score = candidate, result
+    return {"best": best.as_settings(), "best_images_per_s": best_score, "trials": trials}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engine", choices=("stub", "kiri"), default="kiri")
+    parser.add_argument("--images", type=Path, default=IMAGE_DIR)
+    parser.add_argument("--megapixels", type=float, nargs="*", default=[],
+                        help="synthetic rescaled variants to add per image")
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=settings.OCR_WORKERS)
+    parser.add_argument("--json", type=Path, default=None, help="write results as JSON")
+    args = parser.parse_args()
+
+    inputs = load_inputs(args.images, args.megapixels)
+    print(f"Auto-tuning runtime options ({len(inputs)} inputs × {args.repeat}, "
+          f"concurrency {args.concurrency}, {os.cpu_count()} CPUs, engine={args.engine})")
+    result = sweep(args.engine, inputs, args.repeat, args.concurrency)
+
+    print(f"\nBest: {result['best_images_per_s']:.2f} img/s")
+    for name, value in result["best"].items():
+        if value is not None:
+            print(f"{name}={value}")
+
+    if args.json:
+        report = {
+            "benchmark": "autotune_runtime",
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "host": host_info(),
+            "config": {"engine": args.engine, "repeat": args.repeat, "concurrency": args.concurrency},
+            **result,
+        }
+        args.json.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compare the in-memory and temp-JPEG inference paths of KiriOCREngine.
+
+Every test image is preprocessed once (exactly as the orchestrator does) and
+the resulting ``PreprocessResult.color`` array is fed to the engine in both
+modes. The model is loaded once; only ``engine.inference_mode`` is toggled.
+
+Usage (from ``ocr/``):
+    python -m benchmarks.bench_inference_io --repeat 5 --json bench_io.json
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from app.config import settings
+from app.pipeline.ocr_engine import KiriOCREngine
+from app.pipeline.preprocessor import preprocess
+from benchmarks.common import IMAGE_DIR, list_images
+
+
+def _time_mode(engine: KiriOCREngine, mode: str, img, repeat: int) -> Dict[str, float]:
+    engine.inference_mode = mode
+    samples: List[float] = []
+    lines = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _, line_results = engine.extract_from_numpy(img)
+        samples.append((time.perf_counter() - start) * 1000)
+        lines = len(line_results)
+    return {"median_ms": statistics.median(samples), "min_ms": min(samples), "lines": lines}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=Path, default=IMAGE_DIR)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", type=Path, default=None, help="write results as JSON")
+    args = parser.parse_args()
+
+    paths = list_images(args.images)
+    engine = KiriOCREngine(inference_mode="memory")
+    rows = []
+    for path in paths:
+        prep = preprocess(path.read_bytes(), max_dimension=settings.PREPROCESS_MAX_DIMENSION)
+        file_stats = _time_mode(engine, "file", prep.color, args.repeat)
+        mem_stats = _time_mode(engine, "memory", prep.color, args.repeat)
+        saving = file_stats["median_ms"] - mem_stats["median_ms"]
+        rows.append({
+            "image": path.name,
+            "size": list(prep.quality.processed_size),
+            "file": file_stats,
+            "memory": mem_stats,
+            "saving_ms": saving,
+        })
+        print(
+            f"{path.name:24s} {prep.quality.processed_size[0]}x{prep.quality.processed_size[1]:<5d} "
+            f"file={file_stats['median_ms']:8.1f}ms memory={mem_stats['median_ms']:8.1f}ms "
+            f"saving={saving:7.1f}ms lines={file_stats['lines']}/{mem_stats['lines']}"
+        )
+
+    mean_saving = statistics.mean(r["saving_ms"] for r in rows)
+    print(f"Mean per-request saving: {mean_saving:.1f}ms over {len(rows)} images")
+
+    if args.json:
+        args.json.write_text(json.dumps({"images": rows, "mean_saving_ms": mean_saving}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
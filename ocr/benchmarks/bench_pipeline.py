@@ -0,0 +1,170 @@
+"""Throughput and latency benchmark for PipelineOrchestrator.
+
+Runs the full pipeline over ``images_for_test`` plus synthetic rescaled
+variants and reports per-stage p50/p95/p99 latency, throughput at each
+requested concurrency and peak RSS. ``--engine stub`` replaces the Kiri model
+with a fixed-output engine to isolate preprocessing, layout and parsing cost.
+``--staged`` runs throughput through a StagePipeline and prints per-stage
+queue occupancy to locate the bottleneck stage.
+
+Usage (from ``ocr/``):
+    python -m benchmarks.bench_pipeline --engine stub --megapixels 2 4 8 16 \\
+        --concurrency 1 2 4 --json bench.json
+    python -m benchmarks.compare baseline.json bench.json
+"""
+import argparse
+import json
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from app.config import settings
+from app.pipeline.orchestrator import PipelineOrchestrator
+from app.runtime.stage_pipeline import StagePipeline
+from benchmarks.common import (
+    IMAGE_DIR,
+    StubEngine,
+    git_revision,
+    host_info,
+    load_inputs,
+    peak_rss_mb,
+    percentiles,
+)
+
+
+def _build_orchestrator(engine_name: str) -> PipelineOrchestrator:
+    if engine_name == "stub":
+        engine = StubEngine()
+    else:
+        from app.pipeline.ocr_engine import KiriOCREngine
+        engine = KiriOCREngine()
+    return PipelineOrchestrator(engine, max_dimension=settings.PREPROCESS_MAX_DIMENSION)
+
+
+def _run_one(orchestrator: PipelineOrchestrator, name: str, data: bytes) -> Dict[str, Any]:
+    start = time.perf_counter()
+    result = orchestrator.extract(data, filename=name)
+    wall_ms = (time.perf_counter() - start) * 1000
+    if not result.get("success"):
+        raise RuntimeError(f"{name}: {result.get('message')}")
+    return {"wall_ms": wall_ms, "stages": result["pipeline_metadata"].get("stage_timings_ms", {})}
+
+
+def measure_latency(orchestrator, inputs: List[Tuple[str, bytes]], repeat: int) -> Dict[str, Any]:
+    """Sequential runs: per-stage and per-input latency distributions."""
+    totals: List[float] = []
+    stages: Dict[str, List[float]] = defaultdict(list)
+    per_input: Dict[str, List[float]] = defaultdict(list)
+    for name, data in inputs:
+        for _ in range(repeat):
+            run = _run_one(orchestrator, name, data)
+            totals.append(run["wall_ms"])
+            per_input[name].append(run["wall_ms"])
+            for stage, ms in run["stages"].items():
+                stages[stage].append(ms)
+        print(f"  {name:28s} p50={percentiles(per_input[name])['p50']:9.1f}ms")
+    return {
+        "total_ms": percentiles(totals),
+        "stages_ms": {stage: percentiles(v) for stage, v in stages.items()},
+        "per_input_ms": {name: percentiles(v) for name, v in per_input.items()},
+    }
+
+
+def _sample_occupancy(pipeline: StagePipeline, done: threading.Event, samples: Dict[str, List[int]]) -> None:
+    while not done.wait(0.05):
+        for stage, stats in pipeline.stage_stats().items():
+            samples[stage].append(stats["queue_depth"])
+
+
+def measure_throughput(orchestrator, inputs: List[Tuple[str, bytes]], repeat: int, concurrency: int) -> Dict[str, Any]:
+    """All inputs × repeat submitted at once to ``concurrency`` threads."""
+    jobs = [item for item in inputs for _ in range(repeat)]
+    occupancy: Dict[str, List[int]] = defaultdict(list)
+    done = threading.Event()
+    sampler = None
+    if isinstance(orchestrator, StagePipeline):
+        sampler = threading.Thread(target=_sample_occupancy, args=(orchestrator, done, occupancy), daemon=True)
+        sampler.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        runs = list(pool.map(lambda item: _run_one(orchestrator, *item), jobs))
+    wall_s = time.perf_counter() - start
+    done.set()
+    if sampler is not None:
+        sampler.join()
+    row: Dict[str, Any] = {
+        "concurrency": concurrency,
+        "images": len(jobs),
+        "wall_s": round(wall_s, 3),
+        "images_per_s": round(len(jobs) / wall_s, 3),
+        "latency_ms": percentiles([r["wall_ms"] for r in runs]),
+    }
+    if occupancy:
+        row["mean_queue_depth"] = {stage: round(sum(v) / len(v), 2) for stage, v in occupancy.items()}
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engine", choices=("stub", "kiri"), default="stub")
+    parser.add_argument("--images", type=Path, default=IMAGE_DIR)
+    parser.add_argument("--megapixels", type=float, nargs="*", default=[2, 4, 8, 16],
+                        help="synthetic rescaled variants to add per image")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, nargs="*", default=[1, 2, 4])
+    parser.add_argument("--staged", action="store_true", help="measure throughput through a StagePipeline")
+    parser.add_argument("--json", type=Path, default=None, help="write results as JSON")
+    args = parser.parse_args()
+
+    inputs = load_inputs(args.images, args.megapixels)
+    orchestrator = _build_orchestrator(args.engine)
+    _run_one(orchestrator, *inputs[0])  # warm caches/thread pools outside the measurements
+
+    print(f"Latency ({len(inputs)} inputs × {args.repeat}, engine={args.engine})")
+    latency = measure_latency(orchestrator, inputs, args.repeat)
+    for stage, pct in latency["stages_ms"].items():
+        print(f"  stage {stage:12s} p50={pct['p50']:9.1f} p95={pct['p95']:9.1f} p99={pct['p99']:9.1f} ms")
+
+    runner = orchestrator
+    if args.staged:
+        runner = StagePipeline(orchestrator, workers={
+            "preprocess": settings.PIPELINE_PREPROCESS_WORKERS,
+            "ocr": settings.PIPELINE_OCR_WORKERS,
+            "parse": settings.PIPELINE_PARSE_WORKERS,
+        }, queue_size=settings.PIPELINE_HANDOFF_QUEUE)
+    throughput = []
+    for c in args.concurrency:
+        row = measure_throughput(runner, inputs, args.repeat, c)
+        throughput.append(row)
+        print(f"Concurrency {c:2d}: {row['images_per_s']:7.2f} img/s  p95={row['latency_ms']['p95']:.1f}ms")
+        if "mean_queue_depth" in row:
+            print(f"  mean queue depth: {row['mean_queue_depth']}")
+    if args.staged:
+        runner.shutdown()
+
+    report = {
+        "benchmark": "pipeline",
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "host": host_info(),
+        "config": {
+            "engine": args.engine,
+            "megapixels": args.megapixels,
+            "repeat": args.repeat,
+            "preprocess_max_dimension": settings.PREPROCESS_MAX_DIMENSION,
+            "staged": args.staged,
+        },
+        "latency": latency,
+        "throughput": throughput,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print(f"Peak RSS: {report['peak_rss_mb']} MB")
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
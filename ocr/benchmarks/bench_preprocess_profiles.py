@@ -0,0 +1,135 @@
+"""Latency vs extraction-accuracy trade-off of the ``fast`` preprocessing profile.
+
+For each input, ``preprocess()`` runs with the ``full`` profile (current
+order: denoise at decode resolution, resize last) and the ``fast`` profile.
+Reported per input:
+- preprocessing latency of both profiles
+- PSNR of the fast grayscale against the full one (model-free fidelity proxy)
+- with ``--engine kiri``: character agreement of the OCR text and the
+  medication names parsed from it, using the full profile as reference
+
+``--noise`` adds Gaussian sensor noise variants so the adaptive denoising
+branches are exercised, not just the clean-image skip.
+
+Usage (from ``ocr/``):
+    python -m benchmarks.bench_preprocess_profiles --megapixels 4 12 --noise 6 --engine kiri --json pp.json
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.config import settings
+from app.pipeline.preprocessor import preprocess
+from app.pipeline.text_parser import parse_prescription
+from benchmarks.common import (
+    IMAGE_DIR,
+    git_revision,
+    host_info,
+    load_inputs,
+    medication_agreement,
+    percentiles,
+    text_agreement,
+)
+
+
+def _add_noise(inputs: List[Tuple[str, bytes]], sigma: float) -> List[Tuple[str, bytes]]:
+    rng = np.random.default_rng(0)
+    noisy = []
+    for name, data in inputs:
+        img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR).astype(np.float32)
+        img = np.clip(img + rng.normal(0, sigma, img.shape), 0, 255).astype(np.uint8)
+        noisy.append((f"{name}+noise{sigma:g}", cv2.imencode(".png", img)[1].tobytes()))
+    return noisy
+
+
+def _psnr(ref: np.ndarray, other: np.ndarray) -> float:
+    if ref.shape != other.shape:
+        other = cv2.resize(other, (ref.shape[1], ref.shape[0]), interpolation=cv2.INTER_AREA)
+    return float(cv2.PSNR(ref, other))
+
+
+def _ocr_agreement(engine, ref_color: np.ndarray, fast_color: np.ndarray) -> Dict[str, float]:
+    ref_text, ref_lines = engine.extract_from_numpy(ref_color)
+    fast_text, fast_lines = engine.extract_from_numpy(fast_color)
+    ref_meds = {m.name_full for m in parse_prescription(ref_text, ref_lines).medications}
+    fast_meds = {m.name_full for m in parse_prescription(fast_text, fast_lines).medications}
+    return {
+        "char_agreement": text_agreement(ref_text, fast_text),
+        "medication_agreement": medication_agreement(ref_meds, fast_meds),
+    }
+
+
+def _time_profile(data: bytes, profile: str, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        prep = preprocess(data, max_dimension=settings.PREPROCESS_MAX_DIMENSION, profile=profile)
+        samples.append((time.perf_counter() - start) * 1000)
+    return prep, min(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=Path, default=IMAGE_DIR)
+    parser.add_argument("--megapixels", type=float, nargs="*", default=[4, 12])
+    parser.add_argument("--noise", type=float, nargs="*", default=[6.0], help="Gaussian sigma variants")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--engine", choices=("none", "kiri"), default="none")
+    parser.add_argument("--json", type=Path, default=None)
+    args = parser.parse_args()
+
+    inputs = load_inputs(args.images, args.megapixels)
+    base = list(inputs)
+    for sigma in args.noise:
+        inputs += _add_noise(base, sigma)
+
+    engine: Optional[Any] = None
+    if args.engine == "kiri":
+        from app.pipeline.ocr_engine import KiriOCREngine
+        engine = KiriOCREngine()
+
+    rows = []
+    for name, data in inputs:
+        full, full_ms = _time_profile(data, "full", args.repeat)
+        fast, fast_ms = _time_profile(data, "fast", args.repeat)
+        row: Dict[str, Any] = {
+            "input": name,
+            "full_ms": round(full_ms, 1),
+            "fast_ms": round(fast_ms, 1),
+            "speedup": round(full_ms / fast_ms, 2) if fast_ms else None,
+            "psnr_db": round(_psnr(full.gray, fast.gray), 2),
+            "fast_steps": fast.quality.preprocessing_applied,
+        }
+        if engine is not None:
+            row.update(_ocr_agreement(engine, full.color, fast.color))
+        rows.append(row)
+        extra = "".join(f" {k}={row[k]}" for k in ("char_agreement", "medication_agreement") if k in row)
+        print(f"{name:32s} full={full_ms:8.1f}ms fast={fast_ms:7.1f}ms x{row['speedup']:<6} "
+              f"psnr={row['psnr_db']:5.1f}dB{extra}  {row['fast_steps']}")
+
+    summary = {
+        "full_ms": percentiles([r["full_ms"] for r in rows]),
+        "fast_ms": percentiles([r["fast_ms"] for r in rows]),
+    }
+    if engine is not None:
+        summary["mean_char_agreement"] = round(float(np.mean([r["char_agreement"] for r in rows])), 4)
+        summary["mean_medication_agreement"] = round(float(np.mean([r["medication_agreement"] for r in rows])), 4)
+    print(json.dumps(summary))
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "benchmark": "preprocess_profiles",
+            "revision": git_revision(),
+            "host": host_info(),
+            "inputs": rows,
+            "summary": summary,
+        }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Recognizer batch size / width bucket sweep.
+
+Every test image is preprocessed once; the engine then recognises each page
+per line (batch size 1, kiri's fixed 640px input) and with each requested
+batch size over ``--buckets``. Reported per batch size:
+- recognition throughput (lines/s) and median page latency
+- padding waste: share of the encoded batch area that is padding
+- character agreement of the OCR text with the per-line reference
+and, for the largest batch size, the same for ``extract_batch`` over all
+pages at once (lines pooled across pages).
+
+Usage (from ``ocr/``):
+    python -m benchmarks.bench_recognizer_batching --batch-sizes 4 8 16 --buckets 160,320,480,640
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from app.config import settings
+from app.pipeline.line_batching import BatchStats, parse_buckets
+from app.pipeline.ocr_engine import KiriOCREngine
+from app.pipeline.preprocessor import preprocess
+from benchmarks.common import IMAGE_DIR, git_revision, host_info, list_images, text_agreement
+
+
+def _run(engine: KiriOCREngine, pages, repeat: int) -> Dict[str, Any]:
+    """Recognise every page ``repeat`` times; return texts and batching stats."""
+    engine._batch_stats = BatchStats()
+    texts, samples = [], []
+    for color in pages:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            text, _ = engine.extract_from_numpy(color)
+            samples.append((time.perf_counter() - start) * 1000)
+        texts.append(text)
+    return {"texts": texts, "page_ms_p50": round(statistics.median(samples), 1), **engine.recognition_stats()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=Path, default=IMAGE_DIR)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--buckets", default=settings.OCR_RECOGNIZER_WIDTH_BUCKETS)
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--json", type=Path, default=None, help="write results as JSON")
+    args = parser.parse_args()
+
+    pages = [
+        preprocess(path.read_bytes(), max_dimension=settings.PREPROCESS_MAX_DIMENSION,
+                   profile=settings.PREPROCESS_PROFILE).color
+        for path in list_images(args.images)
+    ]
+    engine = KiriOCREngine(inference_mode="memory", recognizer_batch_size=1)
+    engine.width_buckets = parse_buckets(args.buckets, engine._ocr.cfg.IMG_W)
+
+    reference = _run(engine, pages, args.repeat)
+    print(f"per-line        p50 {reference['page_ms_p50']:8.1f}ms/page")
+    rows: List[Dict[str, Any]] = []
+    for batch_size in args.batch_sizes:
+        engine.recognizer_batch_size = batch_size
+        out = _run(engine, pages, args.repeat)
+        agreement = statistics.mean(text_agreement(r, t) for r, t in zip(reference["texts"], out["texts"]))
+        row = {"batch_size": batch_size, "page_ms_p50": out["page_ms_p50"], "batches": out["batches"],
+               "lines_per_s": out["lines_per_s"], "padding_waste": out["padding_waste"],
+               "char_agreement": round(agreement, 4)}
+        rows.append(row)
+        print(f"batch {batch_size:<3d}       p50 {row['page_ms_p50']:8.1f}ms/page  {row['lines_per_s']} lines/s  "
+              f"padding {row['padding_waste']:.1%}  agreement {agreement:.4f}")
+
+    engine.recognizer_batch_size = max(args.batch_sizes)
+    engine._batch_stats = BatchStats()
+    start = time.perf_counter()
+    pooled_texts = [text for text, _ in engine.extract_batch(pages)]
+    pooled = {"batch_size": engine.recognizer_batch_size,
+              "total_ms": round((time.perf_counter() - start) * 1000, 1), **engine.recognition_stats(),
+              "char_agreement": round(statistics.mean(
+                  text_agreement(r, t) for r, t in zip(reference["texts"], pooled_texts)), 4)}
+    print(f"pooled {pooled['batch_size']:<3d}     {pooled['total_ms']:8.1f}ms/{len(pages)} pages  "
+          f"{pooled['batches']} batches  {pooled['lines_per_s']} lines/s  padding {pooled['padding_waste']:.1%}")
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "benchmark": "bench_recognizer_batching",
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "host": host_info(),
+            "config": {"buckets": list(engine.width_buckets), "repeat": args.repeat},
+            "per_line_page_ms_p50": reference["page_ms_p50"],
+            "batched": rows,
+            "pooled": pooled,
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
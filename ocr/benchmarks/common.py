@@ -0,0 +1,118 @@
+"""Shared helpers for the OCR benchmarks: inputs, stub engine, statistics."""
+import difflib
+import platform
+import resource
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from app.pipeline.ocr_engine import LineResult
+
+IMAGE_DIR = Path(__file__).resolve().parents[1] / "images_for_test"
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp"}
+
+
+def list_images(directory: Path = IMAGE_DIR) -> List[Path]:
+    paths = sorted(p for p in directory.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    if not paths:
+        raise SystemExit(f"No images found in {directory}")
+    return paths
+
+
+def load_inputs(directory: Path = IMAGE_DIR, megapixels: Sequence[float] = ()) -> List[Tuple[str, bytes]]:
+    """Test images as-is plus JPEG variants rescaled to each target megapixel count."""
+    inputs = []
+    for path in list_images(directory):
+        data = path.read_bytes()
+        inputs.append((path.name, data))
+        img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        h, w = img.shape[:2]
+        for mp in megapixels:
+            scale = (mp * 1e6 / (w * h)) ** 0.5
+            size = (int(w * scale), int(h * scale))
+            resized = cv2.resize(img, size, interpolation=cv2.INTER_CUBIC if scale > 1 else cv2.INTER_AREA)
+            ok, buf = cv2.imencode(".jpg", resized, [cv2.IMWRITE_JPEG_QUALITY, 90])
+            inputs.append((f"{path.stem}@{mp:g}MP.jpg", buf.tobytes()))
+    return inputs
+
+
+class StubEngine:
+    """Engine stand-in with no model: returns a fixed prescription layout.
+
+    Lines are placed proportionally to the image size so region assignment,
+    table reconstruction and parsing see realistic input, which isolates
+    preprocessing/layout/parsing cost from model inference.
+    """
+
+    _LINES = [
+        (0.05, "Calmette Hospital"),
+        (0.18, "Name: Sok Dara Age: 42 Sex: M ID: AB1234"),
+        (0.25, "Diagnosis: gastritis"),
+        (0.32, "ល.រ ឈ្មោះឱសថ ចំនួន ព្រឹក ថ្ងៃ ល្ងាច យប់"),
+        (0.40, "1 | Omeprazole 20mg | 14គ្រាប់ | 1 | 0 | 1 | 0"),
+        (0.48, "2 | Paracetamol 500mg | 21គ្រាប់ | 1 | 1 | 1 | 0"),
+        (0.56, "3 | Amoxicillin 500mg | 14គ្រាប់ | 1 | 0 | 1 | 0"),
+        (0.64, "4 | Multivitamine | 7គ្រាប់ | 1 | 0 | 0 | 0"),
+        (0.80, "រាជធានីភ្នំពេញ ថ្ងៃទី 22/06/2025 14:20"),
+        (0.88, "Dr. Heng Kimang"),
+    ]
+
+    def extract_from_numpy(self, img: np.ndarray, escalate_regions=None, cancel=None, select_lines=None):
+        h, w = img.shape[:2]
+        lines = []
+        for i, (fy, text) in enumerate(self._LINES, 1):
+            cells = text.split(" | ")
+            cell_w = int(w * 0.9 / len(cells))
+            for j, cell in enumerate(cells):
+                bbox = [int(w * 0.05) + j * cell_w, int(h * fy), cell_w - 4, max(12, int(h * 0.025))]
+                lines.append(LineResult(text=cell, confidence=0.9, bbox=bbox, line_number=i))
+        return "\n".join(text.replace(" | ", " ") for _, text in self._LINES), lines
+
+    def extract(self, image_bytes: bytes):
+        img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        return self.extract_from_numpy(img)
+
+
+def text_agreement(reference: str, text: str) -> float:
+    """Character-level similarity of ``text`` to ``reference`` (0..1)."""
+    return round(difflib.SequenceMatcher(None, reference, text).ratio(), 4)
+
+
+def medication_agreement(reference: set, names: set) -> float:
+    """Jaccard overlap of parsed medication names (1.0 when both are empty)."""
+    union = reference | names
+    return round(len(reference & names) / len(union), 4) if union else 1.0
+
+
+def percentiles(samples: Sequence[float], points: Sequence[int] = (50, 95, 99)) -> Dict[str, float]:
+    if not samples:
+        return {f"p{p}": 0.0 for p in points}
+    arr = np.asarray(samples, dtype=np.float64)
+    return {f"p{p}": round(float(np.percentile(arr, p)), 2) for p in points}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (Linux reports KiB)."""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=IMAGE_DIR, stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def host_info() -> Dict[str, str]:
+    import os
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": str(os.cpu_count()),
+        "opencv": cv2.__version__,
+    }
@@ -0,0 +1,57 @@
+"""Compare two bench_pipeline JSON reports and flag regressions.
+
+Usage (from ``ocr/``):
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+
+Exits with status 1 when any stage p50/p95 latency grows, or any throughput
+figure drops, by more than ``--threshold`` percent. Latency changes smaller
+than ``--min-delta-ms`` are ignored so sub-millisecond stages do not flap.
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import Iterator, Tuple
+
+
+def _rows(base: dict, cand: dict) -> Iterator[Tuple[str, float, float, bool]]:
+    """Yield (metric, baseline, candidate, higher_is_better)."""
+    for key in ("p50", "p95"):
+        yield f"total {key} ms", base["latency"]["total_ms"][key], cand["latency"]["total_ms"][key], False
+    for stage, pct in base["latency"]["stages_ms"].items():
+        if stage in cand["latency"]["stages_ms"]:
+            for key in ("p50", "p95"):
+                yield f"{stage} {key} ms", pct[key], cand["latency"]["stages_ms"][stage][key], False
+    cand_tp = {row["concurrency"]: row for row in cand["throughput"]}
+    for row in base["throughput"]:
+        if row["concurrency"] in cand_tp:
+            yield (f"c={row['concurrency']} img/s", row["images_per_s"],
+                   cand_tp[row["concurrency"]]["images_per_s"], True)
+    yield "peak RSS MB", base["peak_rss_mb"], cand["peak_rss_mb"], False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression in percent")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore smaller latency changes")
+    args = parser.parse_args()
+
+    base = json.loads(args.baseline.read_text())
+    cand = json.loads(args.candidate.read_text())
+    print(f"{'metric':24s} {base.get('revision', '?'):>10s} {cand.get('revision', '?'):>10s}   delta")
+
+    regressions = 0
+    for metric, b, c, higher_is_better in _rows(base, cand):
+        delta = (c - b) / b * 100 if b else 0.0
+        worse = -delta if higher_is_better else delta
+        negligible = metric.endswith(" ms") and abs(c - b) < args.min_delta_ms
+        flag = "  REGRESSION" if worse > args.threshold and not negligible else ""
+        regressions += bool(flag)
+        print(f"{metric:24s} {b:10.2f} {c:10.2f} {delta:+7.1f}%{flag}")
+
+    raise SystemExit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Accuracy gate for INT8 model variants against the fp32 models.
+
+Runs the full pipeline over a fixed image set twice — fp32 detector and
+recognizer, then the requested variant — and compares per image:
+- character accuracy: similarity of the variant's OCR text to fp32's
+- medication accuracy: overlap of the parsed medication names
+plus median pipeline latency of each variant.
+
+Exits non-zero (variant REFUSED) when the mean of either accuracy falls
+below its threshold, so it can gate a deployment or CI job.
+
+Usage (from ``ocr/``):
+    OCR_DETECTOR_INT8_PATH=models/detector.int8.onnx \\
+        python -m benchmarks.eval_quantized --detector int8 --recognizer int8 --json q.json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from app.config import settings
+from app.pipeline.orchestrator import PipelineOrchestrator
+from benchmarks.common import (
+    IMAGE_DIR,
+    git_revision,
+    host_info,
+    load_inputs,
+    medication_agreement,
+    percentiles,
+    text_agreement,
+)
+
+
+def _orchestrator(detector: str, recognizer: str) -> PipelineOrchestrator:
+    from app.pipeline.ocr_engine import KiriOCREngine
+
+    engine = KiriOCREngine(detector_precision=detector, recognizer_precision=recognizer)
+    return PipelineOrchestrator(
+        engine, max_dimension=settings.PREPROCESS_MAX_DIMENSION, preprocess_profile=settings.PREPROCESS_PROFILE,
+    )
+
+
+def _run(orchestrator: PipelineOrchestrator, inputs: List[Tuple[str, bytes]], repeat: int) -> Dict[str, Any]:
+    outputs: Dict[str, Any] = {}
+    for name, data in inputs:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = orchestrator.extract(data, filename=name)
+            samples.append((time.perf_counter() - start) * 1000)
+        if not result.get("success"):
+            raise RuntimeError(f"{name}: {result.get('message')}")
+        outputs[name] = {
+            "text": result["full_text"],
+            "medications": {m.name_full for m in result["parsed"].medications},
+            "latency_ms": min(samples),
+        }
+    return outputs
+
+
+def evaluate(reference: Dict[str, Any], variant: Dict[str, Any]) -> Dict[str, Any]:
+    per_image = {}
+    for name, ref in reference.items():
+        out = variant[name]
+        per_image[name] = {
+            "char_accuracy": text_agreement(ref["text"], out["text"]),
+            "medication_accuracy": medication_agreement(ref["medications"], out["medications"]),
+            "fp32_ms": round(ref["latency_ms"], 1),
+            "variant_ms": round(out["latency_ms"], 1),
+        }
+    n = len(per_image)
+    return {
+        "per_image": per_image,
+        "char_accuracy": round(sum(r["char_accuracy"] for r in per_image.values()) / n, 4),
+        "medication_accuracy": round(sum(r["medication_accuracy"] for r in per_image.values()) / n, 4),
+        "fp32_ms": percentiles([r["fp32_ms"] for r in per_image.values()]),
+        "variant_ms": percentiles([r["variant_ms"] for r in per_image.values()]),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--detector", choices=("fp32", "int8"), default="int8")
+    parser.add_argument("--recognizer", choices=("fp32", "int8"), default="int8")
+    parser.add_argument("--images", type=Path, default=IMAGE_DIR)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--min-char-accuracy", type=float, default=0.98)
+    parser.add_argument("--min-medication-accuracy", type=float, default=0.95)
+    parser.add_argument("--json", type=Path, default=None)
+    args = parser.parse_args()
+
+    inputs = load_inputs(args.images)
+    variant_name = f"detector={args.detector} recognizer={args.recognizer}"
+    print(f"Reference fp32 over {len(inputs)} images...")
+    reference = _run(_orchestrator("fp32", "fp32"), inputs, args.repeat)
+    print(f"Variant {variant_name}...")
+    variant = _run(_orchestrator(args.detector, args.recognizer), inputs, args.repeat)
+    report = evaluate(reference, variant)
+
+    for name, row in report["per_image"].items():
+        print(f"  {name:28s} chars={row['char_accuracy']:.4f} meds={row['medication_accuracy']:.4f} "
+              f"{row['fp32_ms']:8.1f}ms -> {row['variant_ms']:8.1f}ms")
+    accepted = (report["char_accuracy"] >= args.min_char_accuracy
+                and report["medication_accuracy"] >= args.min_medication_accuracy)
+    print(f"Mean char accuracy {report['char_accuracy']:.4f} (min {args.min_char_accuracy}), "
+          f"medication accuracy {report['medication_accuracy']:.4f} (min {args.min_medication_accuracy}), "
+          f"p50 {report['fp32_ms']['p50']:.0f}ms -> {report['variant_ms']['p50']:.0f}ms")
+    print(f"{variant_name}: {'ACCEPTED' if accepted else 'REFUSED'}")
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "benchmark": "eval_quantized",
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "host": host_info(),
+            "config": {"detector": args.detector, "recognizer": args.recognizer,
+                       "detector_int8_path": settings.OCR_DETECTOR_INT8_PATH,
+                       "min_char_accuracy": args.min_char_accuracy,
+                       "min_medication_accuracy": args.min_medication_accuracy},
+            "accepted": accepted,
+            **report,
+        }, indent=2, ensure_ascii=False))
+    sys.exit(0 if accepted else 1)
+
+
+if __name__ == "__main__":
+    main()
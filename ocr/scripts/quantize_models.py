@@ -0,0 +1,112 @@
+"""Produce an INT8 version of the Kiri DB text detector.
+
+Modes:
+- ``dynamic``: weights quantized to INT8, activations quantized on the fly.
+  No calibration data needed.
+- ``static``: QDQ weights and activations; activation ranges are calibrated
+  on preprocessed images (``--calibration-images``), fed to the detector
+  exactly as the service would.
+
+The recognizer needs no file: set ``OCR_RECOGNIZER_PRECISION=int8`` and it is
+quantized dynamically at load time. Check either variant against fp32 with
+``python -m benchmarks.eval_quantized`` before deploying it.
+
+Requires the ``onnx`` package in addition to the service requirements.
+
+Usage (from ``ocr/``):
+    python -m scripts.quantize_models --out models/detector.int8.onnx --mode static
+    OCR_DETECTOR_PRECISION=int8 OCR_DETECTOR_INT8_PATH=models/detector.int8.onnx ...
+"""
+import argparse
+import logging
+import os
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.pipeline.preprocessor import preprocess
+
+IMAGE_DIR = Path(__file__).resolve().parents[1] / "images_for_test"
+DETECTOR_FILE = "detector/DB/detector.onnx"
+REPO_ID = "mrrtmob/kiri-ocr"
+
+
+def fp32_detector_path() -> str:
+    """Download (or reuse the cached) fp32 detector from HuggingFace."""
+    from huggingface_hub import hf_hub_download
+
+    if settings.HF_TOKEN:
+        os.environ.setdefault("HF_TOKEN", settings.HF_TOKEN)
+    return hf_hub_download(repo_id=REPO_ID, filename=DETECTOR_FILE)
+
+
+def calibration_tensors(model_path: str, image_dir: Path, limit: int) -> List[np.ndarray]:
+    """Detector inputs for the calibration images, prepared like the service does."""
+    from kiri_ocr.detector.db.model import DBDetector
+
+    det = DBDetector(model_path)
+    tensors = []
+    paths = sorted(p for p in image_dir.iterdir() if p.suffix.lower() in {".png", ".jpg", ".jpeg", ".webp"})
+    for path in paths[:limit]:
+        prep = preprocess(path.read_bytes(), max_dimension=settings.PREPROCESS_MAX_DIMENSION,
+                          profile=settings.PREPROCESS_PROFILE)
+        resized, _, _ = det._resize_image(prep.color)
+        tensors.append(det._normalize(resized))
+    return tensors
+
+
+class _ImageCalibrationReader:
+    """``CalibrationDataReader`` over a fixed list of detector inputs."""
+
+    def __init__(self, input_name: str, tensors: List[np.ndarray]):
+        self._feeds: Iterator = iter([{input_name: t} for t in tensors])
+
+    def get_next(self) -> Optional[dict]:
+        return next(self._feeds, None)
+
+
+def quantize_detector(src: str, dst: Path, mode: str, image_dir: Path, limit: int) -> None:
+    try:
+        from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+    except ImportError as exc:
+        raise SystemExit(f"onnxruntime.quantization needs the onnx package: pip install onnx ({exc})")
+    import onnxruntime as ort
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if mode == "dynamic":
+        quantize_dynamic(src, str(dst), weight_type=QuantType.QInt8)
+    else:
+        input_name = ort.InferenceSession(src, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+        tensors = calibration_tensors(src, image_dir, limit)
+        if not tensors:
+            raise SystemExit(f"No calibration images in {image_dir}")
+        quantize_static(
+            src, str(dst), _ImageCalibrationReader(input_name, tensors),
+            quant_format=QuantFormat.QDQ, per_channel=True,
+            activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+        )
+    src_mb = os.path.getsize(src) / 1e6
+    dst_mb = dst.stat().st_size / 1e6
+    print(f"Wrote {dst} ({mode}): {src_mb:.1f} MB -> {dst_mb:.1f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--src", default=None, help="fp32 detector.onnx (default: HuggingFace cache)")
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--mode", choices=("dynamic", "static"), default="static")
+    parser.add_argument("--calibration-images", type=Path, default=IMAGE_DIR)
+    parser.add_argument("--calibration-limit", type=int, default=32)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    src = args.src or fp32_detector_path()
+    quantize_detector(src, args.out, args.mode, args.calibration_images, args.calibration_limit)
+    print(f"Enable with OCR_DETECTOR_PRECISION=int8 OCR_DETECTOR_INT8_PATH={args.out}")
+    print("Then gate it: python -m benchmarks.eval_quantized --detector int8")
+
+
+if __name__ == "__main__":
+    main()
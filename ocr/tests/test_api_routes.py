@@ -1,3 +1,5 @@
+import json
+import time
 from io import BytesIO
 from types import SimpleNamespace
 
@@ -19,6 +21,12 @@ class StubEngine:
         return "\n".join(line.text for line in lines), lines
 
 
+class StubNumpyEngine(StubEngine):
+    """Stub engine for the orchestrator path."""
+    def extract_from_numpy(self, img, escalate_regions=None, cancel=None, select_lines=None):
+        return self.extract(b"")
+
+
 def make_png_bytes() -> bytes:
     image = Image.new("RGB", (120, 60), "white")
     buffer = BytesIO()
@@ -82,4 +90,118 @@ def test_extract_route_rejects_unsupported_format() -> None:
     teardown()
 
     assert response.status_code == 422
-    assert response.json()["detail"]["error"] == "unsupported_format"
\ No newline at end of file
+    assert response.json()["detail"]["error"] == "unsupported_format"
+
+
+def test_extract_route_rejects_oversized_image_before_decoding(monkeypatch) -> None:
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "MAX_IMAGE_DIMENSION", 100)
+    files = {"file": ("scan.png", make_png_bytes(), "image/png")}
+
+    with build_client() as client:
+        response = client.post("/api/v1/extract", files=files)
+
+    teardown()
+
+    assert response.status_code == 413
+    assert response.json()["detail"]["error"] == "image_too_large"
+
+
+def test_extract_route_rejects_invalid_corners() -> None:
+    files = {"file": ("rx.png", make_png_bytes(), "image/png")}
+
+    with build_client() as client:
+        malformed = client.post("/api/v1/extract", files=files, data={"corners": "[[0, 0], [1]]"})
+        outside = client.post("/api/v1/extract", files=files, data={"corners": "[[0, 0], [500, 0], [500, 60], [0, 60]]"})
+        ok = client.post("/api/v1/extract", files=files, data={"corners": "[[0, 0], [1, 0], [1, 1], [0, 1]]"})
+
+    teardown()
+
+    assert malformed.status_code == 422 and malformed.json()["detail"]["error"] == "invalid_corners"
+    assert outside.status_code == 422 and "120x60" in outside.json()["detail"]["message"]
+    assert ok.status_code == 200
+
+
+def test_extract_route_accepts_corners_of_exif_rotated_photo() -> None:
+    exif = Image.Exif()
+    exif[0x0112] = 6  # stored 400x300, displayed 300x400
+    buffer = BytesIO()
+    Image.new("RGB", (400, 300), "white").save(buffer, format="JPEG", exif=exif.tobytes())
+    files = {"file": ("rx.jpg", buffer.getvalue(), "image/jpeg")}
+
+    with build_client() as client:
+        response = client.post("/api/v1/extract", files=files, data={"corners": "[[10, 20], [290, 20], [290, 390], [10, 390]]"})
+
+    teardown()
+
+    assert response.status_code == 200
+    image = response.json()["data"]["prescription"]["metadata"]["extraction_info"]["image_metadata"]
+    assert (image["width"], image["height"]) == (300, 400)
+
+
+def test_metrics_route_exposes_request_and_stage_histograms() -> None:
+    files = {"file": ("prescription.png", make_png_bytes(), "image/png")}
+
+    with build_client() as client:
+        client.post("/api/v1/extract", files=files)
+        response = client.get("/api/v1/metrics")
+
+    teardown()
+
+    body = response.text
+    assert response.status_code == 200
+    assert 'ocr_requests_total{outcome="ok"}' in body
+    assert "ocr_request_duration_seconds_count" in body
+    assert "ocr_image_megapixels_bucket" in body
+    assert "# TYPE ocr_stage_duration_seconds histogram" in body
+
+
+def test_extract_stream_route_sends_stage_events_then_result() -> None:
+    from app.pipeline.orchestrator import PipelineOrchestrator
+
+    client = build_client()
+    set_orchestrator(PipelineOrchestrator(StubNumpyEngine(), stage_threads=0))
+    try:
+        response = client.post(
+            "/api/v1/extract/stream",
+            files={"file": ("rx.png", make_png_bytes(), "image/png")},
+        )
+    finally:
+        teardown()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [f for f in response.text.split("\n\n") if f]
+    names = [f.split("\n")[0].removeprefix("event: ") for f in frames]
+    stages = [json.loads(f.split("\n")[1].removeprefix("data: "))["stage"] for f in frames[:-1]]
+    assert names[-1] == "result" and set(names[:-1]) == {"stage"}
+    assert stages == ["preprocess", "layout", "ocr", "table", "parse"]
+    assert json.loads(frames[-1].split("\n")[1].removeprefix("data: "))["success"] is True
+
+
+def test_extract_route_returns_504_when_request_deadline_passes() -> None:
+    from app.pipeline.orchestrator import PipelineOrchestrator
+    from app.runtime import metrics
+
+    class SlowEngine(StubNumpyEngine):
+        def extract_from_numpy(self, img, escalate_regions=None, cancel=None, select_lines=None):
+            time.sleep(0.2)
+            return super().extract_from_numpy(img)
+
+    client = build_client()
+    set_orchestrator(PipelineOrchestrator(SlowEngine(), stage_threads=0))
+    before = metrics.CANCELLED.value(reason="deadline", stage="parse")
+    try:
+        response = client.post(
+            "/api/v1/extract",
+            files={"file": ("rx.png", make_png_bytes(), "image/png")},
+            headers={"X-Request-Deadline": "0.1"},
+        )
+    finally:
+        teardown()
+
+    assert response.status_code == 504
+    assert response.json()["detail"]["error"] == "deadline_exceeded"
+    # OCR ran past the deadline; parsing never started
+    assert metrics.CANCELLED.value(reason="deadline", stage="parse") == before + 1
@@ -0,0 +1,75 @@
+import json
+import time
+import zipfile
+from io import BytesIO
+
+from app.api.routes import set_engine
+from tests.test_api_routes import StubEngine, build_client, make_png_bytes, teardown
+
+
+class SizeTimedEngine(StubEngine):
+    """Takes longer on bigger uploads so completion order differs from upload order."""
+    def extract(self, image_bytes: bytes):
+        time.sleep(0.3 if len(image_bytes) > 1000 else 0.0)
+        return super().extract(image_bytes)
+
+
+def make_zip(members) -> bytes:
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def big_png_bytes() -> bytes:
+    import numpy as np
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.fromarray(np.random.default_rng(0).integers(0, 255, (60, 120, 3), dtype=np.uint8)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_batch_streams_ndjson_in_completion_order_with_item_errors(monkeypatch) -> None:
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "BULK_CONCURRENCY", 2)
+    archive = make_zip({"scans/b.png": make_png_bytes(), "scans/readme.txt": b"hello", "__MACOSX/._b.png": b"x"})
+    files = [
+        ("files", ("slow.png", big_png_bytes(), "image/png")),
+        ("files", ("fast.png", make_png_bytes(), "image/png")),
+        ("files", ("archive.zip", archive, "application/zip")),
+    ]
+
+    with build_client() as client:
+        set_engine(SizeTimedEngine())
+        response = client.post("/api/v1/extract/batch", files=files)
+
+    teardown()
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers["X-Batch-Items"] == "4"
+    assert sorted(l["index"] for l in lines) == [0, 1, 2, 3]
+    by_name = {l["filename"]: l for l in lines}
+    assert set(by_name) == {"slow.png", "fast.png", "scans/b.png", "scans/readme.txt"}
+    assert by_name["scans/readme.txt"]["status_code"] == 422
+    assert by_name["scans/readme.txt"]["error"] == "unsupported_format"
+    assert by_name["scans/b.png"]["success"] is True
+    assert by_name["fast.png"]["extraction_summary"]["total_medications"] == 1
+    # The slow first upload finishes after the items queued behind it
+    assert lines[-1]["filename"] == "slow.png"
+
+
+def test_batch_rejects_unreadable_archive() -> None:
+    files = [("files", ("archive.zip", b"not a zip", "application/zip"))]
+
+    with build_client() as client:
+        response = client.post("/api/v1/extract/batch", files=files)
+
+    teardown()
+
+    assert response.status_code == 422
+    assert response.json()["detail"]["error"] == "invalid_archive"
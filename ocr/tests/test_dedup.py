@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from app.pipeline.dedup import NearDuplicateIndex, perceptual_hash
+from app.pipeline.orchestrator import PipelineOrchestrator
+from tests.test_api_routes import StubEngine
+
+IMAGES = Path(__file__).resolve().parents[1] / "images_for_test"
+
+
+def load_gray(name: str) -> np.ndarray:
+    return cv2.imread(str(IMAGES / name), cv2.IMREAD_GRAYSCALE)
+
+
+def test_index_matches_reshoot_but_not_other_prescription() -> None:
+    original = load_gray("image.png")
+    h, w = original.shape
+    # Re-shot: slightly reframed and brighter
+    reshoot = cv2.resize(original[8:h - 8, 6:w - 6], (w, h))
+    reshoot = cv2.convertScaleAbs(reshoot, alpha=1.1, beta=10)
+    other = load_gray("image2.png")
+
+    index = NearDuplicateIndex(max_distance=24)
+    index.add(perceptual_hash(original), (w, h), "first")
+
+    match = index.lookup(perceptual_hash(reshoot), (w, h))
+    miss = index.lookup(perceptual_hash(other), (other.shape[1], other.shape[0]))
+
+    assert match is not None and match.payload == "first"
+    assert miss is None
+    assert index.stats()["reuse_rate"] == 0.5
+
+
+class CountingNumpyEngine(StubEngine):
+    def __init__(self):
+        self.calls = 0
+
+    def extract_from_numpy(self, img, escalate_regions=None, cancel=None, select_lines=None):
+        self.calls += 1
+        return self.extract(b"")
+
+
+def test_orchestrator_reuses_near_duplicate_extraction() -> None:
+    img = np.full((240, 320, 3), 255, dtype=np.uint8)
+    for y in range(20, 220, 30):
+        cv2.putText(img, f"Line {y} Paracetamol 500mg", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 1)
+    image_bytes = cv2.imencode(".png", img)[1].tobytes()
+
+    engine = CountingNumpyEngine()
+    orchestrator = PipelineOrchestrator(engine, near_duplicates=NearDuplicateIndex())
+    first = orchestrator.extract(image_bytes)
+    second = orchestrator.extract(image_bytes)
+
+    assert engine.calls == 1
+    assert set(first["pipeline_metadata"]["stage_timings_ms"]) == {
+        "preprocess", "dedup", "layout", "ocr", "table", "parse",
+    }
+    assert second["pipeline_metadata"]["near_duplicate"]["reused"] is True
+    assert len(second["parsed"].medications) == len(first["parsed"].medications)
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.api.routes import set_executor
+from app.runtime.executor import BoundedExecutor, QueueFullError
+from tests.test_api_routes import build_client, make_png_bytes, teardown
+
+
+def test_bounded_executor_rejects_when_full() -> None:
+    executor = BoundedExecutor(max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(QueueFullError) as info:
+            await executor.run(lambda: None)
+        stats = executor.stats()
+        release.set()
+        await blocked
+        return info.value, stats
+
+    error, stats = asyncio.run(scenario())
+    executor.shutdown()
+
+    assert error.retry_after_s >= 1
+    assert stats["in_flight"] == 1
+    assert stats["rejected"] == 1
+    assert stats["saturated"] is True
+    assert executor.stats()["completed"] == 1
+
+
+def test_extract_route_returns_503_with_retry_after_when_saturated() -> None:
+    executor = BoundedExecutor(max_workers=1, max_queue=0)
+    release = threading.Event()
+    executor._pool.submit(release.wait)
+    executor._pending = 1  # simulate one admitted job holding the only slot
+
+    with build_client() as client:
+        set_executor(executor)
+        files = {"file": ("prescription.png", make_png_bytes(), "image/png")}
+        response = client.post("/api/v1/extract", files=files)
+        health = client.get("/api/v1/health")
+        ready = client.get("/api/v1/ready")
+
+    release.set()
+    set_executor(None)
+    teardown()
+    executor.shutdown()
+
+    assert response.status_code == 503
+    assert response.json()["detail"]["error"] == "server_busy"
+    assert int(response.headers["Retry-After"]) >= 1
+    assert health.json()["status"] == "saturated"
+    assert ready.status_code == 503
+
+
+def run_in_order(executor, costs, first_cost=None):
+    """Hold the only worker with one job, queue ``costs``, release; return run order."""
+    release = threading.Event()
+    order = []
+
+    async def scenario():
+        blocked = asyncio.ensure_future(executor.run(release.wait, cost=first_cost))
+        await asyncio.sleep(0.05)
+        queued = []
+        for cost in costs:
+            queued.append(asyncio.ensure_future(executor.run(order.append, cost, cost=cost)))
+            await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(blocked, *queued)
+
+    asyncio.run(scenario())
+    executor.shutdown()
+    return order
+
+
+def test_executor_runs_cheapest_waiting_job_first() -> None:
+    executor = BoundedExecutor(max_workers=1, max_queue=8)
+    executor._ms_per_cost = 100.0  # learned: 100 ms per megapixel
+
+    assert run_in_order(executor, [16, 1, 4, 2]) == [1, 2, 4, 16]
+    assert executor.stats()["ms_per_megapixel"] > 0
+
+
+def test_ageing_and_fifo_keep_arrival_order() -> None:
+    # Each ms waited outweighs 1000 ms of estimated work: effectively FIFO
+    aged = BoundedExecutor(max_workers=1, max_queue=8, ageing=1e6)
+    aged._ms_per_cost = 0.001
+    fifo = BoundedExecutor(max_workers=1, max_queue=8, policy="fifo")
+    fifo._ms_per_cost = 100.0
+
+    assert run_in_order(aged, [16, 1, 4]) == [16, 1, 4]
+    assert run_in_order(fifo, [16, 1, 4]) == [16, 1, 4]
+
+
+def test_executor_sheds_when_projected_wait_exceeds_slo() -> None:
+    executor = BoundedExecutor(max_workers=1, max_queue=8, max_wait_ms=500)
+    executor._ms_per_cost = 100.0
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(executor.run(release.wait, cost=20))  # ~2 s of work
+        await asyncio.sleep(0.05)
+        with pytest.raises(QueueFullError) as info:
+            await executor.run(lambda: None, cost=1)
+        release.set()
+        await blocked
+        return info.value
+
+    error = asyncio.run(scenario())
+    executor.shutdown()
+
+    assert error.projected_wait_ms > 1500
+    assert error.retry_after_s >= 1
+    assert executor.stats()["shed"] == 1
@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+from contextlib import asynccontextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import process_job, router, set_engine, set_jobs
+from app.runtime.jobs import JobRunner, JobStore
+from tests.test_api_routes import StubEngine, make_png_bytes, teardown
+
+
+def test_job_store_claims_oldest_first_and_requeues_after_restart(tmp_path) -> None:
+    path = str(tmp_path / "jobs.db")
+    store = JobStore(path)
+    first = store.create(b"one", "one.png")
+    second = store.create(b"two", "two.png")
+
+    assert store.claim_next() == (first["job_id"], "one.png", b"one")
+    store.close()
+
+    # The process died while running the first job: it is queued again
+    restarted = JobStore(path)
+    assert restarted.requeue_interrupted() == 1
+    assert restarted.claim_next()[0] == first["job_id"]
+    restarted.finish(first["job_id"], 422, {"success": False, "error": "invalid_image"})
+    assert restarted.claim_next()[0] == second["job_id"]
+    assert restarted.claim_next() is None
+
+    job = restarted.get(first["job_id"])
+    assert job["status"] == "failed"
+    assert job["error"] == {"status_code": 422, "success": False, "error": "invalid_image"}
+    assert restarted.stats() == {"queued": 0, "running": 1, "succeeded": 0, "failed": 1}
+
+
+class CallbackHandler(BaseHTTPRequestHandler):
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        CallbackHandler.received.append(json.loads(body))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def test_job_api_runs_job_and_notifies_callback(tmp_path) -> None:
+    server = HTTPServer(("127.0.0.1", 0), CallbackHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    callback_url = f"http://127.0.0.1:{server.server_port}/done"
+
+    @asynccontextmanager
+    async def lifespan(app):
+        runner = JobRunner(JobStore(str(tmp_path / "jobs.db")), process_job, poll_s=0.05)
+        set_jobs(runner.store, runner)
+        runner.start()
+        yield
+        await runner.stop()
+        set_jobs(None, None)
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(router)
+    set_engine(StubEngine())
+    files = {"file": ("prescription.png", make_png_bytes(), "image/png")}
+
+    with TestClient(app) as client:
+        submitted = client.post("/api/v1/jobs", files=files, data={"callback_url": callback_url})
+        job_url = submitted.headers["Location"]
+        for _ in range(100):
+            job = client.get(job_url).json()
+            if job["status"] == "succeeded" and job["callback_status"]:
+                break
+            time.sleep(0.05)
+        missing = client.get("/api/v1/jobs/unknown")
+        health = client.get("/api/v1/health")
+
+    server.shutdown()
+    teardown()
+
+    assert submitted.status_code == 202
+    assert submitted.json()["status"] == "queued"
+    assert job["status"] == "succeeded"
+    assert job["result"]["extraction_summary"]["total_medications"] == 1
+    assert job["callback_status"] == "delivered"
+    assert CallbackHandler.received[0]["job_id"] == submitted.json()["job_id"]
+    assert CallbackHandler.received[0]["status"] == "succeeded"
+    assert missing.status_code == 404
+    assert health.json()["jobs"]["succeeded"] == 1
+
+
+def test_runner_resends_callbacks_interrupted_by_restart(tmp_path) -> None:
+    import asyncio
+
+    server = HTTPServer(("127.0.0.1", 0), CallbackHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    store = JobStore(str(tmp_path / "jobs.db"))
+    # Finished, but the process died before the callback was delivered
+    job = store.create(b"img", "rx.png", f"http://127.0.0.1:{server.server_port}/done")
+    store.claim_next()
+    store.finish(job["job_id"], 200, {"success": True})
+    assert store.pending_callbacks() == [job["job_id"]]
+    CallbackHandler.received.clear()
+
+    async def run() -> None:
+        runner = JobRunner(store, process_job, poll_s=0.05)
+        runner.start()
+        for _ in range(100):
+            if store.get(job["job_id"])["callback_status"]:
+                break
+            await asyncio.sleep(0.05)
+        await runner.stop()
+
+    asyncio.run(run())
+    server.shutdown()
+
+    assert store.get(job["job_id"])["callback_status"] == "delivered"
+    assert [body["job_id"] for body in CallbackHandler.received] == [job["job_id"]]
+    assert store.pending_callbacks() == []
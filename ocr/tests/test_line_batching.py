@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from app.pipeline.line_batching import BatchStats, LineCrop, crop_line, parse_buckets, plan_batches, to_tensor
+
+
+def make_crop(key, width):
+    return LineCrop(key=key, pixels=np.zeros((48, width), dtype=np.uint8))
+
+
+def test_parse_buckets_always_ends_at_model_width() -> None:
+    assert parse_buckets("480, 160,320", 640) == (160, 320, 480, 640)
+    assert parse_buckets("800", 640) == (640,)
+    with pytest.raises(ValueError):
+        parse_buckets("0,320", 640)
+
+
+def test_batches_pad_only_to_widest_member() -> None:
+    crops = [make_crop(i, w) for i, w in enumerate([300, 120, 150, 620, 310])]
+    stats = BatchStats()
+
+    batches = plan_batches(crops, (160, 320, 640), batch_size=2)
+    tensors = [to_tensor(b, stats) for b in batches]
+
+    assert [[c.key for c in b.crops] for b in batches] == [[1, 2], [0, 4], [3]]
+    assert [t.shape[-1] for t in tensors] == [150, 310, 620]
+    assert stats.lines == 5 and stats.batches == 3
+    assert stats.padded_pixels == (30 + 10) * 48
+    # Fixed 640px inputs would be 1 - 1500 / 3200 = 53% padding
+    assert stats.padding_waste == pytest.approx(40 / 1540)
+
+
+def test_crop_line_keeps_aspect_ratio_and_inverts_dark_lines() -> None:
+    gray = np.zeros((100, 400), dtype=np.uint8)
+    gray[20:44, 10:110] = 40
+
+    crop = crop_line(gray, (10, 20, 100, 24), height=48, max_width=640, extra_padding=0)
+
+    assert crop.shape == (48, 200)
+    assert crop.min() == 255 - 40
@@ -0,0 +1,317 @@
+from types import SimpleNamespace
+
+import numpy as np
+import onnxruntime as ort
+import pytest
+
+from app.pipeline.ocr_engine import KiriOCREngine
+from app.runtime.tuning import RuntimeTuning
+
+
+class StubKiri:
+    """Stub kiri_ocr.OCR exposing only the detector/recognizer hooks."""
+    def __init__(self):
+        boxes = [
+            SimpleNamespace(bbox=(10, 10, 80, 20), confidence=0.9),
+            SimpleNamespace(bbox=(100, 12, 60, 20), confidence=0.8),
+            SimpleNamespace(bbox=(10, 60, 80, 20), confidence=0.7),
+        ]
+        self.detector = SimpleNamespace(db_detector=None, detect_lines_objects=lambda img: boxes)
+        self.crops = []
+
+    def _preprocess_region(self, gray, box, extra_padding=5):
+        self.crops.append(gray.shape)
+        return box
+
+    def recognize_region(self, tensor):
+        return f"line@{tensor[0]},{tensor[1]}", 0.9
+
+    def extract_text(self, path):
+        raise AssertionError("memory mode must not go through a file")
+
+
+def make_engine() -> KiriOCREngine:
+    engine = KiriOCREngine.__new__(KiriOCREngine)
+    engine.inference_mode = "memory"
+    engine.decode_mode = "accurate"
+    engine.escalate_confidence = 0.9
+    engine.recognizer_batch_size = 1
+    engine.detection_tile = 0
+    engine.tuning = RuntimeTuning()
+    engine._detector_tuned = False
+    engine._ocr = StubKiri()
+    return engine
+
+
+def test_memory_mode_recognizes_without_file_round_trip() -> None:
+    engine = make_engine()
+    img = np.full((100, 200, 3), 255, dtype=np.uint8)
+
+    full_text, lines = engine.extract_from_numpy(img)
+
+    assert [l.line_number for l in lines] == [1, 2, 3]
+    assert lines[0].bbox == [10, 10, 80, 20]
+    assert full_text == "line@10,10 line@100,12\nline@10,60"
+    assert engine._ocr.crops == [(100, 200)] * 3
+
+
+def test_adaptive_decoding_escalates_low_confidence_and_table_lines(monkeypatch) -> None:
+    import kiri_ocr.model
+    import torch
+
+    engine = make_engine()
+    engine._ocr._preprocess_region = lambda gray, box, extra_padding=5: torch.tensor(box)
+    engine.decode_mode = "adaptive"
+    # The "encoder output" is the box; the CTC head is confident except on the second line
+    engine._ocr.device = "cpu"
+    engine._ocr.cfg = SimpleNamespace(USE_CTC=True, BEAM=3)
+    engine._ocr.tokenizer = None
+    engine._ocr.model = SimpleNamespace(
+        encode=lambda t: t, ctc_head=lambda mem: mem, mem_proj=lambda mem: mem,
+    )
+    monkeypatch.setattr(
+        kiri_ocr.model, "compute_ctc_confidence",
+        lambda logits, tok: (0.5 if logits[0] == 100 else 0.95, f"ctc@{int(logits[0])}", 0),
+    )
+    beams = []
+
+    def fake_decoder(model, mem_proj, tok, cfg, ctc_logits_1=None):
+        beams.append(cfg.BEAM)
+        return f"attn@{int(mem_proj[0])}", 0.97
+
+    monkeypatch.setattr(kiri_ocr.model, "beam_decode_one_batched", fake_decoder)
+    img = np.full((100, 200, 3), 255, dtype=np.uint8)
+    table = (0, 50, 200, 100)
+
+    _, lines = engine.extract_from_numpy(img, escalate_regions=[table])
+
+    assert [l.text for l in lines] == ["ctc@10", "attn@100", "attn@10"]
+    assert [l.escalated for l in lines] == [False, True, True]
+    assert beams == [1, 1]
+    assert engine._ocr.cfg.BEAM == 3  # shared config untouched
+
+    engine.decode_mode = "fast"
+    _, lines = engine.extract_from_numpy(img, escalate_regions=[table])
+    assert not any(l.escalated for l in lines)
+
+
+def test_runtime_tuning_builds_session_options() -> None:
+    tuning = RuntimeTuning(
+        intra_op_threads=2, inter_op_threads=1, execution_mode="parallel",
+        graph_optimization="extended", enable_mem_arena=False,
+    )
+
+    opts = tuning.session_options()
+
+    assert opts.intra_op_num_threads == 2
+    assert opts.execution_mode == ort.ExecutionMode.ORT_PARALLEL
+    assert opts.graph_optimization_level == ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    assert opts.enable_cpu_mem_arena is False
+    assert tuning.as_settings()["ORT_INTRA_OP_THREADS"] == 2
+    with pytest.raises(ValueError):
+        RuntimeTuning(execution_mode="turbo")
+
+
+def test_int8_detector_requires_converted_model_path() -> None:
+    with pytest.raises(ValueError, match="OCR_DETECTOR_INT8_PATH"):
+        KiriOCREngine(detector_precision="int8", warmup=False)
+
+
+def test_int8_recognizer_runs_encode_and_decode_under_inference_mode(tmp_path) -> None:
+    import json
+
+    import torch
+    from kiri_ocr.model import CFG, CharTokenizer, KiriOCR, beam_decode_one_batched
+
+    cfg = CFG(ENC_LAYERS=2, DEC_LAYERS=1, MAX_DEC_LEN=32, BEAM=2)
+    vocab = tmp_path / "vocab.json"
+    vocab.write_text(json.dumps({c: i for i, c in enumerate("abcdefgh")}))
+    tok = CharTokenizer(str(vocab), cfg)
+    torch.manual_seed(0)
+    fp32 = KiriOCR(cfg, tok).eval()
+    engine = make_engine()
+    engine._ocr.model = fp32
+    x = torch.randn(1, 1, cfg.IMG_H, 160)
+
+    engine._quantize_recognizer()
+    model = engine._ocr.model
+
+    # Heads are quantized; transformer layers (fast path) are left alone
+    assert "quantized" in type(model.mem_proj).__module__
+    assert "quantized" in type(model.ctc_head[2]).__module__
+    assert isinstance(model.enc.layers[0].linear1, torch.nn.Linear)
+    assert isinstance(fp32.mem_proj, torch.nn.Linear)  # cached fp32 model left intact
+    with torch.inference_mode():
+        mem = model.encode(x)
+        ctc_logits = model.ctc_head(mem)
+        text, confidence = beam_decode_one_batched(model, model.mem_proj(mem), tok, cfg, ctc_logits_1=ctc_logits)
+        assert torch.allclose(ctc_logits, fp32.ctc_head(fp32.encode(x)), atol=0.1)
+    assert isinstance(text, str) and 0.0 <= confidence <= 1.0
+
+
+def make_batching_engine(monkeypatch, batch_size):
+    """Engine whose crops are filled with their box's x and as wide as the box.
+
+    The stub encoder/CTC head pass pixels through, so each decoded text names
+    the line it came from; ``widths`` records the batch width of every line.
+    """
+    import kiri_ocr.model
+
+    from app.pipeline import ocr_engine
+    from app.pipeline.line_batching import BatchStats
+
+    engine = make_engine()
+    engine.decode_mode = "fast"
+    engine.recognizer_batch_size = batch_size
+    engine.width_buckets = (70, 640)
+    engine._batch_stats = BatchStats()
+    engine._stats_lock = ocr_engine.threading.Lock()
+    engine._ocr.device = "cpu"
+    engine._ocr.cfg = SimpleNamespace(USE_CTC=True, IMG_H=48, IMG_W=640)
+    engine._ocr.tokenizer = None
+    engine._ocr.model = SimpleNamespace(encode=lambda t: t, ctc_head=lambda mem: mem)
+    monkeypatch.setattr(
+        ocr_engine, "crop_line", lambda gray, box, h, w: np.full((h, box[2]), box[0], dtype=np.uint8),
+    )
+    engine.widths = []
+
+    def fake_ctc(logits, tok):
+        engine.widths.append(logits.shape[-1])
+        return 0.95, f"x={round((float(logits[0, 0, 0, 0]) * 0.5 + 0.5) * 255)}", 0
+
+    monkeypatch.setattr(kiri_ocr.model, "compute_ctc_confidence", fake_ctc)
+    return engine
+
+
+def test_batched_recognition_buckets_crops_and_keeps_line_order(monkeypatch) -> None:
+    engine = make_batching_engine(monkeypatch, batch_size=2)
+    img = np.full((100, 200, 3), 255, dtype=np.uint8)
+
+    full_text, lines = engine.extract_from_numpy(img)
+
+    assert [(l.line_number, l.text) for l in lines] == [(1, "x=10"), (2, "x=100"), (3, "x=10")]
+    assert full_text == "x=10 x=100\nx=10"
+    # widths 80, 60, 80: the 60px line has its own bucket, the 80px pair shares a batch
+    assert sorted(engine.widths) == [60, 80, 80]
+    stats = engine.recognition_stats()
+    assert stats["lines"] == 3 and stats["batches"] == 2
+    assert stats["padding_waste"] == 0.0
+
+
+def test_extract_batch_pools_lines_across_images(monkeypatch) -> None:
+    engine = make_batching_engine(monkeypatch, batch_size=8)
+    # Page boxes depend on the image width so results can be traced to their page
+    engine._ocr.detector = SimpleNamespace(db_detector=None, detect_lines_objects=lambda img: [
+        SimpleNamespace(bbox=(img.shape[1] // 10, 10 + 30 * i, 50 + 10 * i, 20), confidence=0.9)
+        for i in range(2)
+    ])
+    images = [np.full((100, w, 3), 255, dtype=np.uint8) for w in (200, 300, 400)]
+
+    outputs = engine.extract_batch(images)
+
+    assert [[(l.line_number, l.text) for l in lines] for _, lines in outputs] == [
+        [(1, "x=20"), (2, "x=20")], [(1, "x=30"), (2, "x=30")], [(1, "x=40"), (2, "x=40")],
+    ]
+    assert [text for text, _ in outputs] == ["x=20\nx=20", "x=30\nx=30", "x=40\nx=40"]
+    # Six lines from three pages share one recognizer batch
+    assert engine.recognition_stats()["batches"] == 1
+    # Per-image regions must match the images, on the pooled and per-image paths
+    for batch_size in (8, 1):
+        engine.recognizer_batch_size = batch_size
+        with pytest.raises(ValueError):
+            engine.extract_batch(images, escalate_regions=[None, None])
+
+
+def test_batched_recognition_stops_between_batches_when_cancelled(monkeypatch) -> None:
+    from app.runtime.cancellation import CancelToken, ExtractionCancelled
+
+    engine = make_batching_engine(monkeypatch, batch_size=2)
+    cancel = CancelToken()
+    encoded = []
+
+    def encode(t):
+        encoded.append(t.shape[0])
+        cancel.cancel()
+        return t
+
+    engine._ocr.model.encode = encode
+    img = np.full((100, 200, 3), 255, dtype=np.uint8)
+
+    with pytest.raises(ExtractionCancelled) as exc_info:
+        engine.extract_from_numpy(img, cancel=cancel)
+
+    assert exc_info.value.reason == "disconnected" and exc_info.value.stage == "ocr"
+    assert len(encoded) == 1  # the second batch never reached the encoder
+
+
+def test_tiled_detection_merges_lines_across_tile_seams() -> None:
+    import cv2
+
+    from app.pipeline import ocr_engine
+
+    from kiri_ocr.detector.db.model import DBDetector
+
+    class ContourDB(DBDetector):
+        """DB stand-in: one box per dark blob, at most 400px input like a tile.
+
+        Padding and reading-order sorting are kiri's own; OpenCV 4.x rejects
+        their ``boundingRect``/``minAreaRect`` calls on int64 points.
+        """
+        def __init__(self):
+            self.inputs = []
+            self.padding_pct, self.padding_px, self.padding_y_pct, self.padding_y_px = 0.01, 5, 0.05, 5
+            self.dtypes = set()
+
+        def detect(self, img, return_scores=False):
+            self.inputs.append(img.shape[:2])
+            mask = (cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) < 128).astype(np.uint8)
+            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            polys = [cv2.boxPoints(cv2.minAreaRect(c)).astype(np.int32) for c in contours]
+            return polys, [0.9] * len(polys)
+
+        def _apply_smart_padding(self, polys):
+            self.dtypes.update(np.asarray(p).dtype for p in polys)
+            return super()._apply_smart_padding(polys)
+
+    db = ContourDB()
+    engine = make_engine()
+    engine.detection_tile, engine.detection_tile_overlap, engine.detection_tile_threads = 400, 100, 2
+    engine._tile_pool, engine._tile_pool_pid = None, None
+    engine._tile_pool_lock = ocr_engine.threading.Lock()
+    engine._ocr.detector = SimpleNamespace(
+        db_detector=db,
+        _process_boxes_objects=lambda detected, merge, skip_sort: [
+            SimpleNamespace(bbox=tuple(int(v) for v in cv2.boundingRect(p)), confidence=s) for p, s in detected
+        ],
+    )
+    img = np.full((600, 1000, 3), 255, dtype=np.uint8)
+    img[100:130, 50:950] = 0  # crosses both vertical seams
+    img[280:310, 100:300] = 0  # inside the horizontal overlap band
+    img[450:480, 450:550] = 0  # seen by a single tile, never merged
+
+    boxes = engine._detect(img)
+
+    assert len(db.inputs) == 6 and max(max(shape) for shape in db.inputs) <= 400
+    assert db.dtypes == {np.dtype(np.int32)}
+    # One (padded) box per line, in reading order
+    expected = [(50, 100, 900, 30), (100, 280, 200, 30), (450, 450, 100, 30)]
+    assert len(boxes) == 3
+    for (x, y, w, h), (ex, ey, ew, eh) in zip([box for box, _ in boxes], expected):
+        assert x <= ex and y <= ey and x + w >= ex + ew and y + h >= ey + eh
+        assert w <= ew + 40 and h <= eh + 10
+
+
+def test_select_lines_skips_recognition_but_keeps_line_numbers() -> None:
+    engine = make_engine()
+    img = np.full((100, 200, 3), 255, dtype=np.uint8)
+    seen = []
+
+    def select(boxes):
+        seen.extend(boxes)
+        return [0, 2]
+
+    _, lines = engine.extract_from_numpy(img, select_lines=select)
+
+    assert seen == [(10, 10, 80, 20), (100, 12, 60, 20), (10, 60, 80, 20)]
+    assert [l.line_number for l in lines] == [1, 3]
+    assert len(engine._ocr.crops) == 2
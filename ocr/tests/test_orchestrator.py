@@ -0,0 +1,125 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from app.pipeline import orchestrator as orchestrator_module
+from app.pipeline.orchestrator import PipelineOrchestrator
+from tests.test_api_routes import StubEngine
+
+
+def make_image_bytes() -> bytes:
+    img = np.full((240, 320, 3), 255, dtype=np.uint8)
+    cv2.putText(img, "Paracetamol 500mg", (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 1)
+    return cv2.imencode(".png", img)[1].tobytes()
+
+
+class SlowNumpyEngine(StubEngine):
+    def extract_from_numpy(self, img, escalate_regions=None, cancel=None, select_lines=None):
+        time.sleep(0.2)
+        return self.extract(b"")
+
+
+def test_layout_runs_alongside_ocr(monkeypatch) -> None:
+    layout_threads = []
+    real_analyze = orchestrator_module.analyze_layout
+
+    def slow_layout(gray, pyramid=None):
+        layout_threads.append(threading.current_thread().name)
+        time.sleep(0.2)
+        return real_analyze(gray, pyramid)
+
+    monkeypatch.setattr(orchestrator_module, "analyze_layout", slow_layout)
+    orchestrator = PipelineOrchestrator(SlowNumpyEngine(), stage_threads=2)
+
+    result = orchestrator.extract(make_image_bytes())
+
+    timings = result["pipeline_metadata"]["stage_timings_ms"]
+    assert result["success"] is True
+    assert layout_threads[0].startswith("ocr-stage")
+    assert timings["layout"] >= 200 and timings["ocr"] >= 200
+    # Both 200 ms stages overlap instead of adding up
+    assert result["processing_time_ms"] - timings["preprocess"] < 380
+
+
+def test_sequential_stages_when_stage_threads_disabled() -> None:
+    orchestrator = PipelineOrchestrator(SlowNumpyEngine(), stage_threads=0)
+
+    result = orchestrator.extract(make_image_bytes())
+
+    assert result["success"] is True
+    assert orchestrator._stage_pool is None
+    assert set(result["pipeline_metadata"]["stage_timings_ms"]) == {"preprocess", "layout", "ocr", "table", "parse"}
+
+
+def test_extract_reports_each_stage_with_partial_header() -> None:
+    events = []
+    orchestrator = PipelineOrchestrator(SlowNumpyEngine(), stage_threads=0)
+
+    result = orchestrator.extract(make_image_bytes(), on_event=events.append)
+
+    assert result["success"] is True
+    assert [e["stage"] for e in events] == ["preprocess", "layout", "ocr", "table", "parse"]
+    assert events[0]["stage_timings_ms"].keys() == {"preprocess"}
+    assert events[-1]["stage_timings_ms"] == result["pipeline_metadata"]["stage_timings_ms"]
+    assert events[2]["lines"] == 3
+    assert events[2]["partial"]["patient"]
+
+
+def test_partial_header_is_only_parsed_for_a_listener(monkeypatch) -> None:
+    calls = []
+    parse = orchestrator_module.parse_patient_header
+    monkeypatch.setattr(orchestrator_module, "parse_patient_header", lambda *a: calls.append(1) or parse(*a))
+    orchestrator = PipelineOrchestrator(SlowNumpyEngine(), stage_threads=0)
+
+    assert orchestrator.extract(make_image_bytes())["success"] is True
+    assert calls == []
+    orchestrator.extract(make_image_bytes(), on_event=lambda event: None)
+    assert calls == [1]
+
+
+def test_cancelled_extraction_stops_before_next_stage() -> None:
+    from app.runtime.cancellation import CancelToken, ExtractionCancelled
+
+    cancel = CancelToken()
+    stages = []
+
+    def on_event(event):
+        stages.append(event["stage"])
+        if event["stage"] == "preprocess":
+            cancel.cancel()
+
+    orchestrator = PipelineOrchestrator(SlowNumpyEngine(), stage_threads=0)
+    with pytest.raises(ExtractionCancelled) as exc_info:
+        orchestrator.extract(make_image_bytes(), on_event=on_event, cancel=cancel)
+
+    assert stages == ["preprocess"]
+    assert exc_info.value.stage == "ocr" and exc_info.value.elapsed_ms > 0
+    with pytest.raises(ExtractionCancelled) as exc_info:
+        orchestrator.extract(make_image_bytes(), cancel=CancelToken.after(1e-9))
+    assert exc_info.value.reason == "deadline" and exc_info.value.stage == "preprocess"
+
+
+def test_roi_mode_reports_skipped_lines() -> None:
+    class SelectingEngine(StubEngine):
+        def extract_from_numpy(self, img, escalate_regions=None, cancel=None, select_lines=None):
+            _, lines = self.extract(b"")
+            h = img.shape[0]
+            # One line per band: header, patient, table, footer
+            for line, y in zip(lines, (0.02, 0.2, 0.5)):
+                line.bbox = [0, int(h * y), 10, 10]
+            keep = select_lines([tuple(l.bbox) for l in lines] + [(0, h - 12, 10, 10)])
+            lines = [lines[i] for i in keep if i < len(lines)]
+            return "\n".join(l.text for l in lines), lines
+
+    orchestrator = PipelineOrchestrator(
+        SelectingEngine(), stage_threads=0, roi_regions=("patient", "table"), roi_budget=0,
+    )
+
+    result = orchestrator.extract(make_image_bytes())
+
+    roi = result["pipeline_metadata"]["roi"]
+    assert roi["detected"] == 4 and roi["recognised"] == 2 and roi["skipped_share"] == 0.5
+    assert [l.text.split()[0] for l in result["line_results"]] == ["Paracetamol", "Dr."]
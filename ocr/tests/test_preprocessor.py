@@ -0,0 +1,158 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.pipeline.page import detect_page_quad, validate_corners
+from app.pipeline.preprocessor import (
+    ImageProbe,
+    ImageTooLargeError,
+    _deskew,
+    _detect_skew,
+    estimate_noise,
+    plan_decode,
+    preprocess,
+    probe_image,
+)
+from app.pipeline.pyramid import SKEW_SIDE, ImagePyramid
+
+
+def make_page(noise_sigma: float = 0.0, size=(1200, 1600), ext: str = ".png") -> bytes:
+    img = np.full((size[1], size[0], 3), 200, dtype=np.uint8)
+    for y in range(100, size[1] - 100, 60):
+        cv2.putText(img, "Paracetamol 500mg 1-0-1", (80, y), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (20, 20, 20), 2)
+    if noise_sigma:
+        rng = np.random.default_rng(0)
+        img = np.clip(img + rng.normal(0, noise_sigma, img.shape), 0, 255).astype(np.uint8)
+    return cv2.imencode(ext, img)[1].tobytes()
+
+
+PHOTO_CORNERS = np.float32([[250, 200], [1150, 300], [1100, 1450], [200, 1350]])
+
+
+def make_photo() -> np.ndarray:
+    """A page photographed in perspective on a darker, textured table."""
+    page = np.full((1100, 800, 3), 235, dtype=np.uint8)
+    for y in range(150, 950, 50):
+        cv2.putText(page, "Paracetamol 500mg 1-0-1", (120, y), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (20, 20, 20), 2)
+    rng = np.random.default_rng(0)
+    photo = np.clip(np.full((1600, 1400, 3), (60, 90, 120)) + rng.normal(0, 8, (1600, 1400, 3)), 0, 255).astype(np.uint8)
+    matrix = cv2.getPerspectiveTransform(np.float32([[0, 0], [799, 0], [799, 1099], [0, 1099]]), PHOTO_CORNERS)
+    mask = cv2.warpPerspective(np.full((1100, 800), 255, np.uint8), matrix, (1400, 1600)) > 0
+    photo[mask] = cv2.warpPerspective(page, matrix, (1400, 1600))[mask]
+    return photo
+
+
+def test_fast_profile_resizes_first_and_skips_denoise_on_clean_image() -> None:
+    result = preprocess(make_page(), max_dimension=800, profile="fast")
+    applied = result.quality.preprocessing_applied
+
+    assert applied[0] == "resize"
+    assert applied[1].startswith("denoise_skipped")
+    assert max(result.quality.processed_size) == 800
+    assert result.gray.shape == (800, 600)
+
+
+def test_fast_profile_denoises_noisy_image_and_estimate_tracks_sigma() -> None:
+    noisy = preprocess(make_page(noise_sigma=10.0), max_dimension=1600, profile="fast")
+    gray = cv2.imdecode(np.frombuffer(make_page(noise_sigma=10.0), np.uint8), cv2.IMREAD_GRAYSCALE)
+
+    # Independent per-channel noise averages down to ~0.67 sigma in luma
+    assert 5.5 < estimate_noise(gray) < 8.0
+    assert any(step.startswith("denoise(") for step in noisy.quality.preprocessing_applied)
+
+
+def test_large_jpeg_is_probed_from_header_and_decoded_reduced() -> None:
+    data = make_page(size=(2400, 3200), ext=".jpg")
+    probe = probe_image(data)
+    assert (probe.width, probe.height, probe.format) == (2400, 3200, "jpeg")
+
+    result = preprocess(data, max_dimension=800, profile="fast")
+    applied = result.quality.preprocessing_applied
+
+    assert applied[0] == "reduced_decode(1/4)"
+    assert result.quality.original_size == (2400, 3200)
+    assert result.gray.shape == (800, 600)
+
+
+def test_plan_decode_enforces_dimension_limit() -> None:
+    # JPEGs can be reduced under the limit, other formats cannot
+    assert plan_decode(ImageProbe(9000, 6000, "jpeg"), 3000, 4000) == 4
+    assert plan_decode(ImageProbe(4032, 3024, "jpeg"), 3000, 8192) == 1
+    with pytest.raises(ImageTooLargeError):
+        plan_decode(ImageProbe(9000, 6000, "png"), 3000, 8192)
+
+
+def test_projection_skew_estimate_undoes_rotation_on_coarse_level() -> None:
+    page = cv2.imdecode(np.frombuffer(make_page(size=(1800, 2400)), np.uint8), cv2.IMREAD_COLOR)
+    rotated = cv2.cvtColor(_deskew(page, 4.0), cv2.COLOR_BGR2GRAY)
+    pyramid = ImagePyramid(rotated)
+    level = pyramid.level(SKEW_SIDE)
+
+    angle, needs = _detect_skew(level)
+
+    assert max(level.shape) <= SKEW_SIDE
+    assert needs and abs(angle + 4.0) <= 0.3
+    # Levels are built once and shared by later callers
+    assert pyramid.level(SKEW_SIDE) is level
+
+
+def test_page_quad_is_detected_and_rectified_before_preprocessing() -> None:
+    photo = make_photo()
+    quad = detect_page_quad(cv2.cvtColor(photo, cv2.COLOR_BGR2GRAY))
+
+    assert quad is not None and np.abs(quad - PHOTO_CORNERS).max() < 12
+    # A flat scan has no page outline to warp to
+    flat = cv2.imdecode(np.frombuffer(make_page(), np.uint8), cv2.IMREAD_GRAYSCALE)
+    assert detect_page_quad(flat) is None
+
+    data = cv2.imencode(".png", photo)[1].tobytes()
+    result = preprocess(data, max_dimension=3000, profile="fast", rectify=True)
+    applied = result.quality.preprocessing_applied
+
+    assert applied[0] == "page_warp(detected)"
+    assert applied[1].startswith("content_crop(")
+    # Only the text block of the sheet is left
+    width, height = result.quality.processed_size
+    assert width * height < 0.3 * 1400 * 1600
+    assert preprocess(data, profile="fast").quality.processed_size == (1400, 1600)
+
+
+def test_client_corners_skip_detection() -> None:
+    photo = make_photo()
+    fractions = PHOTO_CORNERS[[2, 0, 3, 1]] / np.float32([1400, 1600])  # any order, 0-1
+    corners = validate_corners(fractions.tolist(), 1400, 1600)
+    assert np.allclose(corners, PHOTO_CORNERS, atol=0.5)
+    with pytest.raises(ValueError):
+        validate_corners([[0, 0], [10, 0], [10, 10]], 1400, 1600)
+    with pytest.raises(ValueError):
+        validate_corners([[0, 0], [1500, 0], [1500, 1600], [0, 1600]], 1400, 1600)
+
+    data = cv2.imencode(".png", photo)[1].tobytes()
+    result = preprocess(data, profile="fast", corners=corners)
+
+    assert result.quality.preprocessing_applied[0] == "page_warp(client)"
+    assert not any(step.startswith("content_crop") for step in result.quality.preprocessing_applied)
+    assert abs(result.quality.processed_size[0] - 900) < 10
+
+
+def test_exif_rotated_jpeg_is_probed_in_display_orientation() -> None:
+    from io import BytesIO
+
+    from PIL import Image
+
+    # Stored landscape, tagged "rotate 90° CW": displayed (and decoded) portrait
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    buffer = BytesIO()
+    Image.new("RGB", (400, 300), "white").save(buffer, format="JPEG", exif=exif.tobytes())
+    data = buffer.getvalue()
+
+    probe = probe_image(data)
+    assert (probe.width, probe.height) == (300, 400)
+
+    # Corners of the displayed frame are inside the image and map to its axes
+    corners = validate_corners([[0.1, 0.1], [0.9, 0.1], [0.9, 0.9], [0.1, 0.9]], probe.width, probe.height)
+    assert np.allclose(corners[2], [270, 360])
+    result = preprocess(data, profile="fast", corners=corners)
+    assert result.quality.preprocessing_applied[0] == "page_warp(client)"
+    assert result.gray.shape == (320, 240)
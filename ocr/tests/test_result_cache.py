@@ -0,0 +1,54 @@
+from app.api.routes import set_engine, set_result_cache
+from app.pipeline.cache import ResultCache, pipeline_version
+from tests.test_api_routes import StubEngine, build_client, make_png_bytes, teardown
+
+
+def test_result_cache_lru_ttl_and_disk_tier(tmp_path) -> None:
+    cache = ResultCache(version="v1", max_entries=2, ttl_s=60, disk_dir=str(tmp_path))
+    keys = [cache.key_for(bytes([i])) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, {"n": i})
+
+    assert cache.get(keys[2]) == {"n": 2}
+    assert cache.stats()["evictions"] == 1
+
+    # A fresh instance (service restart) still finds entries on disk
+    restarted = ResultCache(version="v1", max_entries=2, ttl_s=60, disk_dir=str(tmp_path))
+    assert restarted.get(keys[0]) == {"n": 0}
+    assert restarted.stats()["hits_disk"] == 1
+
+    expired = ResultCache(version="v1", ttl_s=-1, disk_dir=str(tmp_path))
+    assert expired.get(keys[1]) is None
+    assert ResultCache(version="v2").key_for(b"x") != ResultCache(version="v1").key_for(b"x")
+
+    # The decode limit decides which images are reduced, so it versions results
+    from app.config import settings
+    assert pipeline_version(settings) != pipeline_version(settings.model_copy(update={"MAX_IMAGE_DIMENSION": 4000}))
+
+
+class CountingEngine(StubEngine):
+    calls = 0
+
+    def extract(self, image_bytes: bytes):
+        CountingEngine.calls += 1
+        return super().extract(image_bytes)
+
+
+def test_extract_route_serves_identical_upload_from_cache() -> None:
+    cache = ResultCache(version="test")
+    files = {"file": ("prescription.png", make_png_bytes(), "image/png")}
+
+    with build_client() as client:
+        set_engine(CountingEngine())
+        set_result_cache(cache)
+        first = client.post("/api/v1/extract", files=files)
+        second = client.post("/api/v1/extract", files=files)
+
+    set_result_cache(None)
+    teardown()
+
+    assert CountingEngine.calls == 1
+    assert first.headers["X-Cache"] == "miss"
+    assert second.headers["X-Cache"] == "hit"
+    assert second.json() == first.json()
+    assert cache.stats()["hits_memory"] == 1
@@ -0,0 +1,21 @@
+from app.pipeline.layout import estimate_regions
+from app.pipeline.roi import RegionSelector
+
+
+def test_selector_keeps_consumed_regions_and_spends_budget_top_and_bottom() -> None:
+    layout = estimate_regions(1000, 1000)
+    # (x, y, w, h) boxes; centres at y = 20, 60, 200, 500, 700, 900, 960
+    boxes = [(0, 10, 400, 20), (0, 50, 400, 20), (0, 190, 400, 20), (0, 490, 400, 20),
+             (0, 690, 400, 20), (0, 890, 400, 20), (0, 950, 400, 20)]
+    selector = RegionSelector(layout, ["patient", "table"], budget=2)
+
+    keep = selector(boxes)
+    selector.finished()
+    report = selector.report()
+
+    # patient (200) and table (500, 700) lines, plus the topmost and bottommost others
+    assert keep == [0, 2, 3, 4, 6]
+    assert report["detected"] == 7 and report["recognised"] == 5 and report["skipped"] == 2
+    assert report["skipped_share"] == round(2 / 7, 4) and report["budget_used"] == 2
+    assert report["by_region"]["header"] == {"detected": 2, "recognised": 1}
+    assert report["by_region"]["footer"] == {"detected": 2, "recognised": 1}
@@ -0,0 +1,50 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.pipeline.orchestrator import PipelineOrchestrator
+from app.runtime.stage_pipeline import StagePipeline
+from tests.test_orchestrator import SlowNumpyEngine, make_image_bytes
+
+
+class SleepingOrchestrator:
+    STAGES = ("preprocess", "ocr", "parse")
+
+    def __init__(self):
+        self.seen = []
+        self.lock = threading.Lock()
+
+    def run_stage(self, stage, job):
+        with self.lock:
+            self.seen.append((stage, job.filename))
+        time.sleep(0.1)
+        if stage == "parse":
+            job.result = {"success": True, "filename": job.filename}
+
+
+def test_requests_overlap_across_stages() -> None:
+    pipeline = StagePipeline(SleepingOrchestrator(), queue_size=1)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda i: pipeline.extract(b"", f"img{i}"), range(4)))
+    elapsed = time.perf_counter() - t0
+    stats = pipeline.stage_stats()
+    pipeline.shutdown()
+
+    assert [r["filename"] for r in results] == ["img0", "img1", "img2", "img3"]
+    # 4 jobs x 3 stages x 100 ms serially would take 1.2 s
+    assert elapsed < 0.9
+    assert {stage: s["processed"] for stage, s in stats.items()} == {"preprocess": 4, "ocr": 4, "parse": 4}
+    assert all(s["queue_depth"] == 0 and s["busy"] == 0 for s in stats.values())
+
+
+def test_pipeline_runs_real_orchestrator_stages() -> None:
+    pipeline = StagePipeline(PipelineOrchestrator(SlowNumpyEngine()), workers={"ocr": 2})
+
+    result = pipeline.extract(make_image_bytes(), "scan.png")
+    pipeline.shutdown()
+
+    assert result["success"] is True
+    assert pipeline.capacity == 4 + 2 * 3
+    assert set(result["pipeline_metadata"]["stage_timings_ms"]) == {"preprocess", "layout", "ocr", "table", "parse"}
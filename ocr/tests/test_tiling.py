@@ -0,0 +1,51 @@
+import numpy as np
+
+from app.pipeline.tiling import merge_tile_boxes, plan_tiles
+
+
+def rect_poly(x1, y1, x2, y2):
+    return np.array([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], dtype=np.int32)
+
+
+def test_plan_tiles_covers_page_with_full_size_overlapping_tiles() -> None:
+    tiles = plan_tiles(2500, 900, tile=960, overlap=160)
+
+    assert len(tiles) == 3  # one row, three columns
+    assert tiles[0][0] == 0 and tiles[-1][2] == 2500
+    assert all(x2 - x1 == 960 and y2 - y1 == 900 for x1, y1, x2, y2 in tiles)
+    assert all(a[2] - b[0] >= 160 for a, b in zip(tiles, tiles[1:]))
+    assert plan_tiles(800, 600, tile=960, overlap=160) == [(0, 0, 800, 600)]
+
+
+def test_merge_joins_lines_split_by_seams_and_drops_duplicates() -> None:
+    tiles = [(0, 0, 600, 600), (400, 0, 1000, 600), (0, 400, 600, 1000)]
+    detections = [
+        [
+            (rect_poly(100, 100, 599, 130), 0.9),  # line cut by the vertical seam at x=600
+            (rect_poly(100, 450, 300, 480), 0.8),  # line inside the horizontal overlap band
+            (rect_poly(100, 585, 300, 599), 0.5),  # top of a line cut by the bottom edge
+        ],
+        [
+            (rect_poly(400, 102, 900, 131), 0.7),  # rest of the cut line
+            (rect_poly(700, 300, 900, 330).astype(np.int64), 0.9),  # unrelated line, right tile only
+        ],
+        [
+            (rect_poly(101, 449, 301, 481), 0.85),  # same line seen from the lower tile
+            (rect_poly(100, 585, 300, 615), 0.9),  # the full line
+        ],
+    ]
+
+    polys, scores = merge_tile_boxes(tiles, detections)
+
+    boxes = sorted(
+        (tuple(int(v) for v in (p[:, 0].min(), p[:, 1].min(), p[:, 0].max(), p[:, 1].max())), s)
+        for p, s in zip(polys, scores)
+    )
+    assert boxes == [
+        ((100, 100, 900, 131), 0.9),
+        ((100, 449, 301, 481), 0.85),
+        ((100, 585, 300, 615), 0.9),
+        ((700, 300, 900, 330), 0.9),
+    ]
+    # OpenCV 4.x only takes int32/float32 points in kiri's box helpers
+    assert {p.dtype for p in polys} == {np.dtype(np.int32)}
@@ -0,0 +1,23 @@
+import os
+
+from app.runtime.worker_pool import OrchestratorProcessPool
+
+
+class StubOrchestrator:
+    """Picklable-result orchestrator that records which process ran it."""
+    def __init__(self):
+        self.weights = bytearray(1024 * 1024)  # stands in for shared model memory
+
+    def extract(self, image_bytes: bytes, filename: str = "", on_event=None, cancel=None, corners=None):
+        return {"success": True, "pid": os.getpid(), "size": len(image_bytes), "filename": filename}
+
+
+def test_process_pool_runs_extract_in_forked_workers() -> None:
+    pool = OrchestratorProcessPool(StubOrchestrator(), processes=2)
+    try:
+        results = [pool.extract(b"abc", filename="rx.png") for _ in range(4)]
+    finally:
+        pool.shutdown()
+
+    assert all(r["success"] and r["size"] == 3 and r["filename"] == "rx.png" for r in results)
+    assert all(r["pid"] != os.getpid() for r in results)